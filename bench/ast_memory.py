@@ -0,0 +1,71 @@
+''' memory retained by the AST of a parse, per node and per character of input
+
+    python -m bench.ast_memory [file ...]
+
+parses the shipped scala fixtures, or the given files, with the `compilationUnit` rule. the parser pool is cleared
+after each parse, so that the memo cache of the parser instance is not counted. the first file is parsed once before
+measuring, so that loading the parser module is not counted either.
+
+baseline: the slotted node classes reduced the memory per node of the three fixtures from 929, 1069 and 902 bytes to
+666, 788 and 642 bytes.
+'''
+import gc
+import sys
+import tracemalloc
+from typing import Iterator, Tuple
+
+from amino import Path, List
+
+from tubbs.tatsu.scala import Parser
+from tubbs.tatsu.ast import AstElem, AstMap, AstList
+
+root = Path(__file__).parent.parent
+
+fixtures = List(
+    root / 'unit' / '_fixtures' / 'format' / 'scala' / 'file1.scala',
+    root / 'unit' / '_fixtures' / 'format' / 'scala' / 'file2.scala',
+    root / 'integration' / '_fixtures' / 'scala' / 'file1.scala',
+)
+
+
+def nodes(ast: AstElem) -> Iterator[AstElem]:
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, AstMap):
+            stack.extend(dict.values(node.data))
+        elif isinstance(node, AstList):
+            stack.extend(node.data)
+
+
+def measure(parser: Parser, path: Path) -> Tuple[int, int, int]:
+    text = path.read_text()
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    ast = parser.parse(text, 'compilationUnit').get_or_raise
+    parser.pool.clear()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    count = sum(1 for _ in nodes(ast))
+    return len(text), count, retained
+
+
+def main(args: List[str]) -> None:
+    parser = Parser()
+    parser.gen()
+    files = args / Path if args else fixtures
+    files.head.foreach(lambda a: measure(parser, a))
+    print(f'{"file":<40} {"chars":>7} {"nodes":>7} {"bytes":>10} {"b/node":>8} {"b/char":>8}')
+    for path in files:
+        chars, count, retained = measure(parser, path)
+        name = str(path.relative_to(root) if root in path.parents else path)
+        print(f'{name:<40} {chars:>7} {count:>7} {retained:>10} {retained / count:>8.1f} {retained / chars:>8.1f}')
+
+
+if __name__ == '__main__':
+    main(List.wrap(sys.argv[1:]))
+
+__all__ = ('measure', 'nodes')
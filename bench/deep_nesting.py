@@ -0,0 +1,79 @@
+''' formatting deeply nested code
+    python -m bench.deep_nesting [depth ...]
+
+generates a scala function with nested blocks of the given depths, by default 50, 200 and 1000, and measures the time
+and the peak traced memory of the builtin breaker and indenter. the parser itself is recursive, so the recursion limit
+and the thread stack size are raised while parsing; the formatters run with the default recursion limit.
+'''
+import sys
+import time
+import threading
+import tracemalloc
+from typing import Tuple, Callable
+
+from amino import List
+
+from tubbs.tatsu.scala import Parser
+from tubbs.tatsu.ast import AstElem
+from tubbs.formatter.base import Formatter
+from tubbs.formatter.scala.breaker import Breaker
+from tubbs.formatter.scala.indenter import Indenter
+
+default_depths = List(50, 200, 1000)
+parse_recursion_limit = 1000000
+stack_size = 512 * 1024 * 1024
+
+
+def nested(depth: int) -> str:
+    opening = List.range(depth).map(lambda i: f'val a{i} = {{ a.map {{ x => x }}')
+    closing = List.range(depth).map(lambda i: '}')
+    return (opening.cons('def fun = {') + List('1') + closing + List('}')).join_lines
+
+
+def parse(parser: Parser, text: str) -> AstElem:
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(parse_recursion_limit)
+    try:
+        return parser.parse(text, 'def').get_or_raise
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def run(formatter: Formatter, ast: AstElem) -> Tuple[float, int, str]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        formatter.format(ast).value.get_or_raise
+        status = 'ok'
+    except RecursionError:
+        status = 'recursion'
+    duration = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duration, peak, status
+
+
+def measure(parser: Parser, depth: int) -> List[Tuple[str, float, int, str]]:
+    text = nested(depth)
+    def formatter(name: str, create: Callable[[], Formatter]) -> Tuple[str, float, int, str]:
+        return (name,) + run(create(), parse(parser, text))
+    return List(formatter('breaker', lambda: Breaker(80)), formatter('indenter', lambda: Indenter(2)))
+
+
+def main(depths: List[int]) -> None:
+    parser = Parser()
+    parser.gen()
+    print(f'{"depth":>6} {"formatter":<10} {"ms":>10} {"peak kB":>10} {"status":>10}')
+    for depth in depths:
+        for name, duration, peak, status in measure(parser, depth):
+            print(f'{depth:>6} {name:<10} {duration * 1e3:>10.2f} {peak / 1e3:>10.1f} {status:>10}')
+
+
+if __name__ == '__main__':
+    depths = List.wrap(sys.argv[1:]) / int if len(sys.argv) > 1 else default_depths
+    threading.stack_size(stack_size)
+    thread = threading.Thread(target=main, args=(depths,))
+    thread.start()
+    thread.join()
+
+__all__ = ('measure', 'nested')
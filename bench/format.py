@@ -0,0 +1,61 @@
+''' time spent formatting a scala file with the builtin breaker and indenter
+
+    python -m bench.format [file ...]
+
+parses the whole file, or `unit/_fixtures/format/scala/file1.scala` by default, with the `compilationUnit` rule and
+runs each formatter on the parse result repeatedly. a fresh AST is used for every run, so that cached rose trees are
+not reused. the parse time is not included.
+
+baseline: comparing rose tree data by node id didn't change the formatting time measurably. over five runs each, the
+medians were 570 ms for the breaker and 511 ms for the indenter before, and 611 ms and 514 ms after, with a spread of
+more than 100 ms between runs.
+'''
+import sys
+import time
+from typing import Tuple
+
+from amino import Path, List
+
+from tubbs.tatsu.scala import Parser
+from tubbs.tatsu.ast import AstElem
+from tubbs.formatter.base import Formatter
+from tubbs.formatter.scala.breaker import Breaker
+from tubbs.formatter.scala.indenter import Indenter
+
+from bench.ast_memory import root
+
+default_file = root / 'unit' / '_fixtures' / 'format' / 'scala' / 'file1.scala'
+repeat = 10
+
+
+def run(formatter: Formatter, asts: List[AstElem]) -> float:
+    start = time.perf_counter()
+    for ast in asts:
+        formatter.format(ast).value.get_or_raise
+    return (time.perf_counter() - start) / asts.length
+
+
+def measure(parser: Parser, path: Path) -> Tuple[float, float]:
+    text = path.read_text()
+    def parse() -> AstElem:
+        return parser.parse(text, 'compilationUnit').get_or_raise
+    breaker = run(Breaker(80), List.range(repeat).map(lambda a: parse()))
+    indenter = run(Indenter(2), List.range(repeat).map(lambda a: parse()))
+    return breaker, indenter
+
+
+def main(args: List[str]) -> None:
+    parser = Parser()
+    parser.gen()
+    files = args / Path if args else List(default_file)
+    print(f'{"file":<40} {"breaker ms":>11} {"indenter ms":>12}')
+    for path in files:
+        breaker, indenter = measure(parser, path)
+        name = str(path.relative_to(root) if root in path.parents else path)
+        print(f'{name:<40} {breaker * 1e3:>11.2f} {indenter * 1e3:>12.2f}')
+
+
+if __name__ == '__main__':
+    main(List.wrap(sys.argv[1:]))
+
+__all__ = ('measure',)
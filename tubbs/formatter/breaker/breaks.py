@@ -1,12 +1,14 @@
-from typing import Any, Tuple
+from typing import Any, Tuple, Dict
 
-from ribosome.record import Record, list_field
+from ribosome.record import Record, list_field, field
 
 from amino import List, Either
 from amino.logging import indent
 
 from tubbs.formatter.breaker.cond import CondBreak
 from tubbs.formatter.breaker.strict import Break
+from tubbs.formatter.breaker.state import BreakState
+from tubbs.formatter.breaker.index import BreakIndex
 from tubbs.util.string import yellow
 
 
@@ -14,9 +16,53 @@ def debug_candidates(breaks: List[Break]) -> List[str]:
     return indent(breaks, 2).map(yellow).cons('Candidates:').cons('')
 
 
+class BreakCache:
+    ''' results of `CondBreak.brk` during one formatter run.
+    a condition that did not access the applied breaks is evaluated only once. the results of all others are keyed by
+    the applied breaks, so they are only evaluated again after a break was applied.
+    the applied breaks are identified by object identity, which is stable because all breaks originate from cached
+    results. the `BreakIndex` of each list of applied breaks is shared by all conditions evaluated against it.
+    '''
+
+    def __init__(self) -> None:
+        self.static = dict()  # type: Dict[int, Either[str, List[Break]]]
+        self.dynamic = dict()  # type: Dict[Tuple[int, Tuple[int, ...]], Either[str, List[Break]]]
+        self.indexes = dict()  # type: Dict[Tuple[int, ...], BreakIndex]
+        self.multi_line_bodies = dict()  # type: Dict[int, bool]
+        self.hits = 0
+        self.misses = 0
+
+    def brk(self, cond: CondBreak, applied: List[Break], start: int, end: int) -> Either[str, List[Break]]:
+        ident = id(cond)
+        result = self.static.get(ident)
+        if result is None:
+            applied_key = tuple(map(id, applied))
+            key = ident, applied_key
+            result = self.dynamic.get(key)
+            if result is None:
+                self.misses += 1
+                state = BreakState(cond.node, applied, self.indexes.get(applied_key), self.multi_line_bodies)
+                result = cond.evaluate(state, start, end)
+                if state.breaks_read:
+                    self.dynamic[key] = result
+                    if state.built_index is not None:
+                        self.indexes[applied_key] = state.built_index
+                else:
+                    self.static[ident] = result
+                return result
+        self.hits += 1
+        return result
+
+    @property
+    def stats(self) -> str:
+        return (f'{self.hits} of {self.hits + self.misses} break conditions cached, {len(self.static)} independent of '
+                f'applied breaks')
+
+
 class Breaks(Record):
     applied = list_field(Break)
     conds = list_field(CondBreak)
+    cache = field(BreakCache, initial=BreakCache)
 
     def range(self, start: int, end: int) -> Either[str, Tuple['Breaks', List[Break]]]:
         def break_match(b: Break) -> bool:
@@ -31,7 +77,7 @@ class Breaks(Record):
             sub = self.set(conds=qual_cond, applied=self.applied)
             return sub, qualified
         qual_cond = self.conds.filter(cond_match)
-        return qual_cond.flat_traverse(lambda a: a.brk(self.applied, start, end), Either) / cons
+        return qual_cond.flat_traverse(lambda a: self.cache.brk(a, self.applied, start, end), Either) / cons
 
     @property
     def _str_extra(self) -> List[Any]:
@@ -0,0 +1,131 @@
+''' compilation of break conditions to closures.
+a condition tree is first translated to a decision graph, whose inner nodes test the predicates of `PredCond` leaves
+and whose leaves are the `BreakInfo` values that the interpreter would return for each outcome. since `prio` and `pos`
+only transform the result of their subcondition, they are folded into the leaves at compile time, as are the
+short-circuiting `|` and `&`, by substituting the right operand for the leaves of the left operand that are invalid
+or valid, respectively. the predicates are tested in the same order as by the interpreter.
+'''
+import abc
+from typing import Callable, Optional, Tuple, Dict, Any, List as TList
+
+from amino import List
+
+from tubbs.formatter.breaker.info import BreakInfo, Skip, BreakSide
+from tubbs.formatter.breaker.state import BreakState
+
+Result = Optional[Tuple[float, BreakSide]]
+Compiled = Callable[[BreakState], Optional[TList[Tuple[float, BreakSide]]]]
+skip = ()  # type: tuple
+
+
+class Decision:
+
+    @abc.abstractmethod
+    def _substitute(self, f: Callable[[BreakInfo], 'Decision'], memo: Dict[int, 'Decision']) -> 'Decision':
+        ...
+
+    def substitute(self, f: Callable[[BreakInfo], 'Decision']) -> 'Decision':
+        ''' replace each leaf with the graph returned by `f`, preserving shared subgraphs
+        '''
+        return self._substitute(f, dict())
+
+    def map(self, f: Callable[[BreakInfo], BreakInfo]) -> 'Decision':
+        return self.substitute(lambda a: Const(f(a)))
+
+    def or_else(self, other: 'Decision') -> 'Decision':
+        return self.substitute(lambda a: Const(a) if a else other)
+
+    def and_then(self, other: 'Decision') -> 'Decision':
+        return self.substitute(lambda a: other if a else Const(a))
+
+
+class Const(Decision):
+
+    def __init__(self, info: BreakInfo) -> None:
+        self.info = info
+
+    def _substitute(self, f: Callable[[BreakInfo], Decision], memo: Dict[int, Decision]) -> Decision:
+        key = id(self)
+        result = memo.get(key)
+        if result is None:
+            result = memo[key] = f(self.info)
+        return result
+
+    def __str__(self) -> str:
+        return f'Const({self.info})'
+
+
+class Test(Decision):
+
+    def __init__(self, pred: Callable[[BreakState], Any], then: Decision, otherwise: Decision) -> None:
+        self.pred = pred
+        self.then = then
+        self.otherwise = otherwise
+
+    def _substitute(self, f: Callable[[BreakInfo], Decision], memo: Dict[int, Decision]) -> Decision:
+        key = id(self)
+        result = memo.get(key)
+        if result is None:
+            then = self.then._substitute(f, memo)
+            otherwise = self.otherwise._substitute(f, memo)
+            result = memo[key] = then if then is otherwise else Test(self.pred, then, otherwise)
+        return result
+
+    def __str__(self) -> str:
+        return f'Test({self.pred}, {self.then}, {self.otherwise})'
+
+
+def result(info: BreakInfo) -> Result:
+    ''' the break parameters of a complete info, `skip` for `Skip` and None for incomplete or invalid infos
+    '''
+    return skip if isinstance(info, Skip) else info.info | None
+
+
+def closure(decision: Decision, memo: Dict[int, Callable[[BreakState], Result]]=None
+            ) -> Callable[[BreakState], Result]:
+    memo = dict() if memo is None else memo
+    key = id(decision)
+    f = memo.get(key)
+    if f is None:
+        if isinstance(decision, Const):
+            value = result(decision.info)
+            def f(state: BreakState) -> Result:
+                return value
+        else:
+            pred = decision.pred
+            then, otherwise = decision.then, decision.otherwise
+            if isinstance(then, Const) and isinstance(otherwise, Const):
+                then_value, otherwise_value = result(then.info), result(otherwise.info)
+                def f(state: BreakState) -> Result:
+                    return then_value if pred(state) else otherwise_value
+            else:
+                then_f, otherwise_f = closure(then, memo), closure(otherwise, memo)
+                def f(state: BreakState) -> Result:
+                    return then_f(state) if pred(state) else otherwise_f(state)
+        memo[key] = f
+    return f
+
+
+def compile_decisions(decisions: List[Decision]) -> Compiled:
+    ''' a function returning the break parameters of all conditions in a set, without skipped ones, or None if any of
+    them is incomplete or invalid.
+    '''
+    fs = decisions.map(closure)
+    if fs.length == 1:
+        single = fs[0]
+        def run_single(state: BreakState) -> Optional[TList[Tuple[float, BreakSide]]]:
+            value = single(state)
+            return None if value is None else [value] if value else []
+        return run_single
+    def run(state: BreakState) -> Optional[TList[Tuple[float, BreakSide]]]:
+        out = []
+        for f in fs:
+            value = f(state)
+            if value is None:
+                return None
+            if value:
+                out.append(value)
+        return out
+    return run
+
+__all__ = ('Decision', 'Const', 'Test', 'closure', 'compile_decisions', 'skip')
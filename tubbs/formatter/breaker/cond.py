@@ -1,8 +1,9 @@
 import abc
 from typing import Callable, Any
 
-from amino import List, Either, __
+from amino import List, Either, __, Left, Right, _
 from amino.tree import indent
+from amino.lazy import lazy
 from amino.util.string import ToStr
 
 from tubbs.tatsu.ast import RoseAstTree
@@ -10,6 +11,7 @@ from tubbs.formatter.breaker.strict import Break
 from tubbs.formatter.breaker.state import BreakState
 from tubbs.formatter.breaker.info import BreakInfo, before, after, BreakSide
 from tubbs.formatter.breaker import info
+from tubbs.formatter.breaker.compile import Decision, Const, Test, Compiled, compile_decisions
 from tubbs.logging import Logging
 from tubbs.util.string import yellow, blue
 
@@ -61,12 +63,33 @@ class BreakCond(ToStr, Logging):
     def _arg_desc(self) -> List[str]:
         return List(self._desc)
 
+    @property
+    def decision(self) -> Either[str, Decision]:
+        ''' the decision graph equivalent to `info`
+        '''
+        return Left(f'{self.__class__.__name__} cannot be compiled')
+
+    @abc.abstractproperty
+    def decisions(self) -> Either[str, List[Decision]]:
+        ...
+
+    @lazy
+    def compiled(self) -> Either[str, Compiled]:
+        ''' a closure equivalent to `infos`, returning the prio and side of the non-skipped infos or None if any of them
+        is incomplete or invalid
+        '''
+        return self.decisions / compile_decisions
+
 
 class SingleBreakCond(BreakCond):
 
     def infos(self, state: BreakState) -> List[BreakInfo]:
         return List(self.info(state))
 
+    @property
+    def decisions(self) -> Either[str, List[Decision]]:
+        return self.decision / List
+
     def __add__(self, other: BreakCond) -> BreakCond:
         return BreakCondSet(List(self, other))
 
@@ -79,6 +102,10 @@ class BreakCondNest(SingleBreakCond):
     def info(self, state: BreakState) -> BreakInfo:
         return self.cond.info(state)
 
+    @property
+    def decision(self) -> Either[str, Decision]:
+        return self.cond.decision
+
 
 class BreakCondAlg(SingleBreakCond):
 
@@ -107,6 +134,10 @@ class BreakCondOr(BreakCondAlg):
     def info(self, state: BreakState) -> BreakInfo:
         return self.left.info(state) or self.right.info(state)
 
+    @property
+    def decision(self) -> Either[str, Decision]:
+        return (self.left.decision & self.right.decision).map2(lambda l, r: l.or_else(r))
+
     @property
     def _op(self) -> str:
         return '|'
@@ -121,6 +152,10 @@ class BreakCondAnd(BreakCondAlg):
     def info(self, state: BreakState) -> BreakInfo:
         return self.left.info(state) and self.right.info(state)
 
+    @property
+    def decision(self) -> Either[str, Decision]:
+        return (self.left.decision & self.right.decision).map2(lambda l, r: l.and_then(r))
+
 
 class BreakCondPrio(BreakCondNest):
 
@@ -131,6 +166,10 @@ class BreakCondPrio(BreakCondNest):
     def info(self, state: BreakState) -> BreakInfo:
         return self.cond.info(state).prio(self._prio)
 
+    @property
+    def decision(self) -> Either[str, Decision]:
+        return self.cond.decision / __.map(__.prio(self._prio))
+
     @property
     def _desc(self) -> str:
         return f'{self.cond._desc}, {self._prio}'
@@ -152,6 +191,10 @@ class BreakCondPos(BreakCondNest):
     def info(self, state: BreakState) -> BreakInfo:
         return self.cond.info(state).pos(self.side)
 
+    @property
+    def decision(self) -> Either[str, Decision]:
+        return self.cond.decision / __.map(__.pos(self.side))
+
     @property
     def _desc(self) -> str:
         return f'{self.cond._desc}, {self.side}'
@@ -169,6 +212,10 @@ class Invariant(SingleBreakCond):
     def info(self, state: BreakState) -> BreakInfo:
         return info.Empty()
 
+    @property
+    def decision(self) -> Either[str, Decision]:
+        return Right(Const(info.Empty()))
+
     def describe(self, state: BreakState) -> List[str]:
         return List(self._desc)
 
@@ -182,6 +229,10 @@ class NoBreak(SingleBreakCond):
     def info(self, state: BreakState) -> BreakInfo:
         return info.Skip(self._desc)
 
+    @property
+    def decision(self) -> Either[str, Decision]:
+        return Right(Const(info.Skip(self._desc)))
+
     def describe(self, state: BreakState) -> List[str]:
         return List(self._desc)
 
@@ -208,6 +259,14 @@ class BreakCondSet(BreakCond):
     def infos(self, state: BreakState) -> List[BreakInfo]:
         return self.conds / __.info(state)
 
+    @property
+    def decision(self) -> Either[str, Decision]:
+        return Right(Const(info.Invalid('BreakCondSet cannot be nested')))
+
+    @property
+    def decisions(self) -> Either[str, List[Decision]]:
+        return self.conds.traverse(_.decision, Either)
+
     def __add__(self, other: BreakCond) -> BreakCond:
         return BreakCondSet(self.conds.cat(other))
 
@@ -225,6 +284,10 @@ class PredCond(SingleBreakCond):
     def info(self, state: BreakState) -> BreakInfo:
         return info.Empty() if self.f(state) else info.Invalid(f'{self._desc} failed')
 
+    @property
+    def decision(self) -> Either[str, Decision]:
+        return Right(Test(self.f, Const(info.Empty()), Const(info.Invalid(f'{self._desc} failed'))))
+
     def describe(self, state: BreakState) -> List[str]:
         return List(f'({self.info(state)}: {self.desc})')
 
@@ -274,11 +337,26 @@ class CondBreak(ToStr, Logging):
         return self.node.endpos
 
     def brk(self, breaks: List[Break], start: int, end: int) -> Either[str, List[Break]]:
+        return self.evaluate(BreakState(self.node, breaks), start, end)
+
+    def evaluate(self, state: BreakState, start: int, end: int) -> Either[str, List[Break]]:
         def cons(prio: float, side: BreakSide) -> Break:
             return mk_break(prio, self.node, side)
-        state = BreakState(self.node, breaks)
         if not isinstance(self.cond, NoBreak):
             self.log.ddebug(debug_infos, self.node, self.cond, state, start, end)
+        compiled = self.cond.compiled.map(lambda f: f(state)) | None
+        return (
+            Right(List.wrap(compiled).map2(cons))
+            if compiled is not None else
+            self.interpret(state)
+        )
+
+    def interpret(self, state: BreakState) -> Either[str, List[Break]]:
+        ''' evaluate the condition tree, which is used for conditions that cannot be compiled and to produce the error
+        message when a compiled condition does not match.
+        '''
+        def cons(prio: float, side: BreakSide) -> Break:
+            return mk_break(prio, self.node, side)
         return (
             self.cond.infos(state)
             .filter_not(lambda a: isinstance(a, info.Skip))
@@ -17,8 +17,34 @@ def nel(ast: AstElem) -> bool:
     return isinstance(ast, AstList) and ast.data.length > 0
 
 
+def multi_line_body(state: BreakState, n: RoseAstTree) -> bool:
+    ''' whether `n` or any of its descendants has a body with more than one element.
+    this doesn't depend on the applied breaks, so the result for each subtree is stored in `state.multi_line_bodies`,
+    which is shared by all states of a formatter run.
+    '''
+    memo = state.multi_line_bodies
+    stack = [(n, False)]
+    while stack:
+        node, visited = stack.pop()
+        key = node.ident
+        if key in memo:
+            continue
+        if visited:
+            memo[key] = node.sub.exists(lambda a: memo[a.ident])
+        elif node.s.body.tail.e.exists(nel):
+            memo[key] = True
+        else:
+            stack.append((node, True))
+            stack.extend((a, False) for a in node.sub)
+    return memo[n.ident]
+
+
 def multi_line_node(state: BreakState, n: RoseAstTree) -> Boolean:
-    return n.s.body.tail.e.exists(nel) or n.sub.exists(L(multi_line_node)(state, _)) or state.sub_breaks(n).nonempty
+    ''' whether `n` or any of its descendants has a multi-element body or applied breaks.
+    the applied breaks are only read if the bodies are single-line, and are looked up in the index shared by all
+    states with the same applied breaks.
+    '''
+    return Boolean(multi_line_body(state, n) or state.has_descendant_breaks(n))
 
 
 @pred_cond('multi line block sibling')
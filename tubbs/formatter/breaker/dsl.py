@@ -1,6 +1,6 @@
 from typing import Callable, Any
 
-from amino import Either, List, Map, _
+from amino import Either, List, Map, _, Try
 from amino.lazy import lazy
 from amino.func import dispatch
 
@@ -60,7 +60,6 @@ class Builder:
 
 
 def parse_break_expr(parser: Parser, expr: str, conds: Map[str, Any]) -> Either[str, BreakCond]:
-    ast = parser.parse(expr, 'top')
-    return Builder(conds).build(ast.value)
+    return parser.parse(expr, 'top').lmap(str) // (lambda ast: Try(Builder(conds).build, ast).lmap(str))
 
 __all__ = ('parse_break_expr',)
@@ -0,0 +1,101 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Tuple, Iterable, Set, Optional, List as TList
+
+from amino import List
+
+from tubbs.tatsu.ast import RoseAstTree, Line
+from tubbs.formatter.breaker.strict import Break
+
+LineKey = Tuple[int, int, int]
+
+
+def line_key(line: Line) -> LineKey:
+    ''' identifies a line of one parse. the pseudo line of the end of the text has the same number as the last line,
+    but a different range.
+    '''
+    return line.lnum, line.start, line.end
+
+
+def ancestors(node: RoseAstTree, count: int) -> TList[RoseAstTree]:
+    result = []
+    cur = node
+    for _ in range(count):
+        parent = cur.parent
+        if parent is cur:
+            break
+        result.append(parent)
+        cur = parent
+    return result
+
+
+class BreakIndex:
+    ''' applied breaks indexed by line and position, and by their nodes' nearest three ancestors.
+    query results are in the order of the applied breaks.
+    '''
+
+    def __init__(self, breaks: List[Break]) -> None:
+        self.breaks = breaks
+        lines = dict()  # type: Dict[LineKey, TList[Tuple[int, int]]]
+        self.by_ancestor = (dict(), dict(), dict())  # type: Tuple[Dict[int, TList[int]], ...]
+        for index, brk in enumerate(breaks):
+            lines.setdefault(line_key(brk.line), []).append((brk.position, index))
+            for level, node in enumerate(ancestors(brk.node, 3)):
+                self.by_ancestor[level].setdefault(id(node), []).append(index)
+        self._break_ancestors = None  # type: Optional[Set[int]]
+        self.lines = dict()  # type: Dict[LineKey, Tuple[TList[int], TList[int]]]
+        for key, entries in lines.items():
+            entries.sort()
+            self.lines[key] = [a[0] for a in entries], [a[1] for a in entries]
+
+    def _select(self, indexes: Iterable[int]) -> List[Break]:
+        return List.wrap(self.breaks[i] for i in sorted(set(indexes)))
+
+    def after(self, line: Line, pos: int) -> List[Break]:
+        ''' breaks on `line` with a position greater than `pos`
+        '''
+        positions, indexes = self.lines.get(line_key(line), ([], []))
+        return self._select(indexes[bisect_right(positions, pos):])
+
+    def before(self, line: Line, pos: int) -> List[Break]:
+        ''' breaks on `line` with a position less than `pos`
+        '''
+        positions, indexes = self.lines.get(line_key(line), ([], []))
+        return self._select(indexes[:bisect_left(positions, pos)])
+
+    def _with_ancestor(self, node: RoseAstTree, levels: range) -> Iterable[int]:
+        key = id(node)
+        for level in levels:
+            yield from self.by_ancestor[level].get(key, [])
+
+    def children_and_grandchildren(self, node: RoseAstTree) -> List[Break]:
+        ''' breaks at the children of `node` and at their children
+        '''
+        return self._select(self._with_ancestor(node, range(2)))
+
+    def descendants(self, node: RoseAstTree, depth: int=3) -> List[Break]:
+        ''' breaks at the descendants of `node` up to `depth` levels below it
+        '''
+        return self._select(self._with_ancestor(node, range(min(depth, 3))))
+
+    @property
+    def break_ancestors(self) -> Set[int]:
+        ''' ids of all nodes that have a break at one of their descendants, computed on first access.
+        the walk from a break's node stops at the first ancestor that was already visited.
+        '''
+        if self._break_ancestors is None:
+            visited = set()  # type: Set[int]
+            for brk in self.breaks:
+                cur = brk.node
+                while True:
+                    parent = cur.parent
+                    if parent is cur or id(parent) in visited:
+                        break
+                    visited.add(id(parent))
+                    cur = parent
+            self._break_ancestors = visited
+        return self._break_ancestors
+
+    def has_descendant_breaks(self, node: RoseAstTree) -> bool:
+        return id(node) in self.break_ancestors
+
+__all__ = ('BreakIndex',)
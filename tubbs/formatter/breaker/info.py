@@ -146,6 +146,10 @@ class BreakPos(HasPos, Incomplete):
     def prio(self, prio: float) -> BreakInfo:
         return BreakPrioPos(prio, self._pos)
 
+    @property
+    def _arg_desc(self) -> List[str]:
+        return List(self._pos)
+
 
 class BreakPrioPos(HasPos, HasPrio, BreakInfo):
 
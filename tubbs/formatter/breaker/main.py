@@ -1,6 +1,6 @@
 import abc
 import math
-from typing import Callable, Tuple, Any
+from typing import Callable, Tuple, Any, Dict, Optional, List as TList
 
 from hues import huestr
 
@@ -13,14 +13,16 @@ from ribosome.nvim import NvimFacade
 from ribosome.util.callback import VimCallback
 
 from tubbs.tatsu.ast import AstElem, RoseData, ast_rose_tree, RoseAstTree
-from tubbs.formatter.base import Formatter, VimFormatterMeta
+from tubbs.formatter.base import Formatter, VimFormatterMeta, compile_rules, HandlerMemo, shared_handler_memo
 from tubbs.formatter.breaker.strict import Break
 from tubbs.formatter.breaker.breaks import Breaks
 from tubbs.formatter.breaker.rules import BreakRules
 from tubbs.formatter.breaker.cond import BreakCond, CondBreak, NoBreak
 from tubbs.tatsu.breaker_dsl import Parser
 from tubbs.formatter.breaker.dsl import parse_break_expr
+from tubbs.formatter.breaker.optimal import CostWeights, optimal_breaks
 from tubbs.util.string import yellow
+from tubbs.logging import tubbs_logger
 
 
 def hl(data: str) -> str:
@@ -35,13 +37,30 @@ def only_ws(data: str) -> Boolean:
 
 Handler = Callable[[], BreakCond]
 Z = Tuple[Breaks, List[str]]
+engines = List('greedy', 'optimal')
+log = tubbs_logger('breaker')
+
+
+def vim_break_engine(vim: NvimFacade) -> str:
+    ''' the engine configured in `g:tubbs_break_engine`, falling back to the greedy one for unknown values
+    '''
+    engine = vim.vars.ps('break_engine') | 'greedy'
+    if engine not in engines:
+        log.error(f'invalid break engine `{engine}`, must be one of {engines.join_comma}')
+        return 'greedy'
+    return engine
 
 
 class BreakerBase(Formatter[BreakCond]):
 
-    def __init__(self, textwidth: int, split_weight_variance: float=0.25) -> None:
+    def __init__(self, textwidth: int, split_weight_variance: float=0.25, engine: str='greedy',
+                 weights: CostWeights=CostWeights()) -> None:
+        if engine not in engines:
+            raise ValueError(f'invalid break engine `{engine}`, must be one of {engines.join_comma}')
         self.textwidth = textwidth
         self.split_weight_variance = split_weight_variance
+        self.engine = engine
+        self.weights = weights
 
     @abc.abstractproperty
     def default_handler(self) -> Handler:
@@ -62,25 +81,88 @@ class BreakerBase(Formatter[BreakCond]):
             return state1.reset(state0), lines0 + lines1
         def trim(lines: List[str]) -> List[str]:
             return lines.detach_head.map2(lambda h, t: t.map(__.strip()).cons(h.rstrip())) | lines
-        return trim(
+        lines = trim(
             ast.lines
             .zip(ast.bols)
             .fold_left((breaks, List()))(folder)[1]
         )
+        self.log.debug(breaks.cache.stats)
+        return lines
 
-    def analyze_line(self, breaks: Breaks, line: str, start: int) -> Z:
+    def qualified_breaks(self, breaks: Breaks, line: str, start: int) -> Tuple[Breaks, List[Break]]:
         def log_error(err: str) -> None:
             self.log.error(f'error in break conditions: {err}')
         end = start + len(line)
-        sub_breaks, qualified = breaks.range(start, end).leffect(log_error) | (breaks, List())
+        return breaks.range(start, end).leffect(log_error) | (breaks, List())
+
+    def analyze_line(self, breaks: Breaks, line: str, start: int) -> Z:
+        ''' break `line` at the best break, then break the left and right parts in order until no part qualifies.
+        instead of recursing into both parts, the right parts are pushed on an explicit stack, so that the depth is
+        not limited by the number of breaks in a line. the right part of a break sees the breaks applied in its left
+        part.
+        '''
+        if self.engine == 'optimal':
+            return self.optimal_line(breaks, line, start)
+        lines = []  # type: TList[str]
+        pending = []  # type: TList[Tuple[Breaks, str, int]]
+        current, data, pos, part = breaks, line, start, False
+        while True:
+            split = None if part and only_ws(data) else self.split_line(current, data, pos)
+            if split is None:
+                lines.append(data)
+                if not pending:
+                    return current, List.wrap(lines)
+                applied, data, pos = pending.pop()
+                current = applied.update(current)
+            else:
+                current, brk = split
+                local_pos = brk.position - pos
+                self.log.ddebug('breaking: {}, {}'.format, brk, local_pos)
+                left, right = data[:local_pos], data[local_pos:]
+                self.log.ddebug(lambda: 'broke line into\n{}\n{}'.format(hl(left), hl(right)))
+                pending.append((current, right, brk.position))
+                data = left
+            part = True
+
+    def split_line(self, breaks: Breaks, line: str, start: int) -> Optional[Tuple[Breaks, Break]]:
+        ''' the best break for `line` and the breaks with it applied, or None if the line should not be broken
+        '''
+        sub_breaks, qualified = self.qualified_breaks(breaks, line, start)
         return (
             self
             .best_break(qualified, line, start)
-            .flat_map(L(self.break_line)(sub_breaks, _, line, start))
+            .flat_map(L(self.check_break)(_, line))
             .leffect(self.log.ddebug)
-            .get_or_else((breaks, List(line)))
+            .map(lambda a: (sub_breaks.apply(a), a))
+            | None
         )
 
+    def optimal_line(self, breaks: Breaks, line: str, start: int) -> Z:
+        ''' apply the cheapest set of breaks as determined by `optimal_breaks`, then break each resulting part again
+        with the breaks applied so far, until no part has a new candidate.
+        like in the greedy engine, conditions that depend on applied breaks, like a closing brace following a broken
+        opening brace, are evaluated again for each part, and the parts are processed in order on an explicit stack.
+        a part that fits has no cheaper layout than itself unless it contains forced breaks, so the iteration ends
+        when the remaining parts either fit or have no candidates.
+        '''
+        lines = []  # type: TList[str]
+        pending = [(breaks, line, start)]  # type: TList[Tuple[Breaks, str, int]]
+        current = breaks
+        while pending:
+            scope, data, pos = pending.pop()
+            current = scope.set(applied=current.applied)
+            sub_breaks, qualified = self.qualified_breaks(current, data, pos)
+            chosen = optimal_breaks(qualified, data, pos, self.textwidth, self.weights)
+            if chosen.empty:
+                lines.append(data)
+            else:
+                self.log.ddebug('optimal breaks: {}'.format, chosen)
+                current = chosen.fold_left(sub_breaks)(lambda z, a: z.apply(a))
+                bounds = chosen.map(lambda a: a.position - pos).cons(0) + List(len(data))
+                parts = bounds.zip(bounds.tail | List()).map2(lambda a, b: (current, data[a:b], pos + a))
+                pending.extend(parts.reversed)
+        return current, List.wrap(lines)
+
     def best_break(self, breaks: List[Break], line: str, start: int) -> Either[str, Break]:
         '''select the break with the highest prio.
         if any forced breaks (>= 1.0) exist, use the highest one unconditionally.
@@ -111,64 +193,58 @@ class BreakerBase(Formatter[BreakCond]):
     def _split_coeff(self) -> float:
         return 2 * self.split_weight_variance
 
-    def break_line(self, breaks: Breaks, brk: Break, line: str, start: int) -> Either[str, Z]:
-        def rec2(sub: Breaks, data: str, pos: int) -> Z:
-            return (
-                (sub, List(data))
-                if only_ws(data) else
-                self.analyze_line(sub, data, pos)
-            )
-        def rec1(brk: Break) -> List[str]:
-            pos = brk.position
-            local_pos = pos - start
-            self.log.ddebug('breaking: {}, {}'.format, brk, local_pos)
-            left = line[:local_pos]
-            right = line[local_pos:]
-            self.log.ddebug(lambda: 'broke line into\n{}\n{}'.format(hl(left), hl(right)))
-            breaks1 = breaks.apply(brk)
-            breaks_l, lines_l = rec2(breaks1, left, start)
-            breaks_r, lines_r = rec2(breaks1.update(breaks_l), right, pos)
-            return breaks_r, (lines_l + lines_r)
+    def check_break(self, brk: Break, line: str) -> Either[str, Break]:
         return (
-            Right(rec1(brk))
+            Right(brk)
             if len(line) > self.textwidth or brk.prio >= 1.0 else
             Left(f'line did not exceed tw: {line}')
         )
 
+    @lazy
+    def handler_conds(self) -> Dict[Handler, BreakCond]:
+        return dict()
+
     def handle(self, node: RoseAstTree, breaks: List[Break]) -> Either[str, List[CondBreak]]:
+        ''' the condition returned by a handler is reused for all nodes, so that it is compiled only once
+        '''
         handler = self.lookup_handler(node.data)
-        result = handler()
+        result = self.handler_conds.get(handler)
+        if result is None:
+            result = self.handler_conds[handler] = handler()
         return Right(List(CondBreak(node, result)))
 
     def _handler_names(self, node: RoseData, names: List[str]) -> List[str]:
         return names
 
     def brk(self, node: RoseAstTree, breaks: List[Break]) -> Eval[Either[str, List[CondBreak]]]:
-        handler = self.break_node if node.data.is_token else self.break_inode
-        return handler(node, breaks)
-
-    def sub_breaks(self, node: RoseAstTree, breaks: List[Break]) -> Eval[Either[str, List[CondBreak]]]:
-        return (
-            node.sub.drain.traverse(L(self.brk)(_, breaks), Eval) /
-            __.flat_sequence(Either).map(breaks.add)
-        )
-
-    def break_inode(self, node: RoseAstTree, breaks: List[Break]) -> Eval[Either[str, List[CondBreak]]]:
-        return (
-            self.break_node(node, breaks) //
-            __.flat_traverse(L(self.sub_breaks)(node, _), Eval)
-        )
-
-    def break_node(self, node: RoseAstTree, breaks: List[Break]) -> Eval[Either[str, List[CondBreak]]]:
-        return Eval.later(self.handle, node, breaks)
+        return Eval.later(self.collect_breaks, node, breaks)
 
+    def collect_breaks(self, node: RoseAstTree, breaks: List[Break]) -> Either[str, List[CondBreak]]:
+        ''' the conditions of `node` and its descendants in pre-order.
+        the tree is traversed with an explicit stack, so deeply nested code does not exhaust the recursion limit.
+        '''
+        result = []  # type: TList[CondBreak]
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            conds = self.handle(current, breaks)
+            if conds.is_left:
+                return conds
+            result.extend(conds.value)
+            if not current.data.is_token:
+                stack.extend(current.sub.drain.reversed)
+        return Right(List.wrap(result))
 
 class Breaker(BreakerBase):
 
-    def __init__(self, rules: BreakRules, textwidth: int) -> None:
-        super().__init__(textwidth)
+    def __init__(self, rules: BreakRules, textwidth: int, engine: str='greedy') -> None:
+        super().__init__(textwidth, engine=engine)
         self.rules = rules
 
+    @lazy
+    def handler_memo(self) -> HandlerMemo:
+        return shared_handler_memo(type(self), type(self.rules))
+
     def handler(self, attr: str) -> Maybe[Handler]:
         return Maybe.check(getattr(self.rules, attr, None))
 
@@ -179,14 +255,21 @@ class Breaker(BreakerBase):
 
 class DictBreaker(BreakerBase):
 
-    def __init__(self, parser: Parser, rules: Map, conds: Map[str, Callable], textwidth: int) -> None:
-        super().__init__(textwidth)
+    def __init__(self, parser: Parser, rules: Map, conds: Map[str, Callable], textwidth: int, engine: str='greedy'
+                 ) -> None:
+        super().__init__(textwidth, engine=engine)
         self.parser = parser
         self.rules = rules
         self.conds = conds
+        self.compiled, self._handler_memo = compile_rules(parse_break_expr, BreakCond, parser, rules, conds)
+        self.handlers = self.compiled.map(__.valmap(lambda a: lambda: a)) | Map()
+
+    @property
+    def handler_memo(self) -> HandlerMemo:
+        return self._handler_memo
 
     def handler(self, attr: str) -> Maybe[Handler]:
-        return self.rules.lift(attr) / L(parse_break_expr)(self.parser, _, self.conds) / (lambda a: lambda: a)
+        return self.handlers.lift(attr)
 
     @property
     def default_handler(self) -> Handler:
@@ -207,11 +290,11 @@ class VimDictBreaker(DictBreaker, VimCallback, metaclass=VimFormatterMeta):
 
     def __init__(self, vim: NvimFacade, parser: Parser, rules: Map, conds: Map[str, Callable]) -> None:
         tw = vim.buffer.options('textwidth') | 120
-        super().__init__(parser, rules, conds, tw)
+        super().__init__(parser, rules, conds, tw, vim_break_engine(vim))
 
 
 def debug_weights(data: List[Tuple[Break, Tuple[float, float]]]) -> List[str]:
     lines = data.map2(lambda b, sw: yellow(f'{b}: {sw[0]:.3}/{sw[1]:.3}'))
     return indent(lines, 2).cons('Weighted breaks:').cons('')
 
-__all__ = ('Breaker', 'DictBreaker', 'VimDictBreaker')
+__all__ = ('Breaker', 'DictBreaker', 'VimDictBreaker', 'vim_break_engine')
@@ -0,0 +1,107 @@
+''' line breaking by dynamic programming over the candidate break positions of a line.
+instead of choosing one break and recursing into both halves, all candidates of a line are scored together and the
+subset minimising the total cost is selected. the cost of a layout is the sum of, for each resulting line:
+* `overflow` per column exceeding the text width
+* `balance` times the squared relative slack of each line but the last, penalising ragged splits
+and, for each break:
+* `line` for the additional line
+* `prio` times `1 - prio`, so that breaks with low priority are only used when they are needed
+forced breaks (prio >= 1.0) are always used, since the greedy engine applies them unconditionally.
+
+the lookback of each position is bounded by `window` candidates, so the running time for a line with `n` candidates
+and `m` characters is O(m + n * window), and the memory O(m + n). for `window >= n` the result is optimal; otherwise,
+segments spanning more than `window` candidates are not considered, which only excludes lines that would be far wider
+than any text width for the candidate densities that grammars produce.
+'''
+from typing import Tuple, Iterable, List as TList
+
+from amino import List
+
+from tubbs.formatter.breaker.strict import Break
+
+
+class CostWeights:
+
+    def __init__(self, overflow: float=100.0, line: float=10.0, prio: float=20.0, balance: float=5.0,
+                 window: int=64) -> None:
+        if window < 1:
+            raise ValueError(f'invalid lookback window `{window}`, must be at least 1')
+        self.overflow = overflow
+        self.line = line
+        self.prio = prio
+        self.balance = balance
+        self.window = window
+
+
+def _nonblank_bounds(line: str) -> Tuple[TList[int], TList[int]]:
+    ''' for each index, the first non-whitespace index at or after it and the end of the last non-whitespace
+    character before it
+    '''
+    length = len(line)
+    first = [length] * (length + 1)
+    for i in range(length - 1, -1, -1):
+        first[i] = i if not line[i].isspace() else first[i + 1]
+    last = [0] * (length + 1)
+    for i in range(1, length + 1):
+        last[i] = i if not line[i - 1].isspace() else last[i - 1]
+    return first, last
+
+
+def optimal_positions(line: str, candidates: Iterable[Tuple[int, float]], textwidth: int,
+                      weights: CostWeights=CostWeights()) -> TList[int]:
+    ''' the subset of the local candidate positions in `line`, given with their prios, that splits it at minimal cost.
+    lines after a break are measured without leading whitespace and all lines without trailing whitespace, like
+    the breaker trims them. the first line keeps its indentation.
+    '''
+    length = len(line)
+    best_prio = dict()  # type: dict
+    for pos, prio in candidates:
+        if 0 < pos < length and prio > best_prio.get(pos, -1.0):
+            best_prio[pos] = prio
+    positions = [0] + sorted(best_prio) + [length]
+    count = len(positions)
+    forced = [False] + [best_prio[p] >= 1.0 for p in positions[1:-1]] + [False]
+    first, last = _nonblank_bounds(line)
+    tw = max(textwidth, 1)
+    def segment(i: int, j: int) -> float:
+        start = 0 if i == 0 else first[positions[i]]
+        width = max(0, last[positions[j]] - start)
+        overflow = weights.overflow * max(0, width - tw)
+        slack = (tw - width) / tw if j < count - 1 and width <= tw else 0.0
+        return overflow + weights.balance * slack * slack
+    def break_cost(j: int) -> float:
+        return weights.line + weights.prio * (1.0 - min(best_prio[positions[j]], 1.0))
+    cost = [0.0] + [float('inf')] * (count - 1)
+    prev = [0] * count
+    for j in range(1, count):
+        own = break_cost(j) if j < count - 1 else 0.0
+        for i in range(j - 1, max(-1, j - 1 - weights.window), -1):
+            total = cost[i] + segment(i, j) + own
+            if total < cost[j]:
+                cost[j] = total
+                prev[j] = i
+            if forced[i]:
+                break
+    result = []
+    j = prev[count - 1]
+    while j > 0:
+        result.append(positions[j])
+        j = prev[j]
+    return result[::-1]
+
+
+def optimal_breaks(breaks: List[Break], line: str, start: int, textwidth: int, weights: CostWeights=CostWeights()
+                   ) -> List[Break]:
+    ''' the breaks selected by `optimal_positions` for the qualified candidates of a line starting at `start`, in
+    order of position. of multiple candidates at one position, the one with the highest prio is used.
+    '''
+    by_pos = dict()  # type: dict
+    for brk in breaks:
+        pos = brk.position - start
+        current = by_pos.get(pos)
+        if current is None or brk.prio > current.prio:
+            by_pos[pos] = brk
+    positions = optimal_positions(line, ((p, b.prio) for p, b in by_pos.items()), textwidth, weights)
+    return List.wrap(by_pos[p] for p in positions)
+
+__all__ = ('CostWeights', 'optimal_positions', 'optimal_breaks')
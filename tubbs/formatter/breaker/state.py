@@ -1,18 +1,45 @@
-from typing import Callable, Sized, Any
+from typing import Callable, Sized, Any, Optional, Dict
 
-from amino import List, L, Boolean, _, __
+from amino import List, Boolean, __
 from amino.lazy import lazy
 from amino.tree import SubTree
 
 from tubbs.tatsu.ast import RoseData, RoseAstTree
 from tubbs.formatter.breaker.strict import Break
+from tubbs.formatter.breaker.index import BreakIndex
 
 
 class BreakState:
 
-    def __init__(self, node: RoseAstTree, breaks: List[Break]) -> None:
+    def __init__(self, node: RoseAstTree, breaks: List[Break], index: BreakIndex=None,
+                 multi_line_bodies: Dict[int, bool]=None) -> None:
         self.node = node
-        self.breaks = breaks
+        self._breaks = breaks
+        self._index = index
+        # results of `conds.multi_line_body` by node ident, shared between the states of a formatter run
+        self.multi_line_bodies = dict() if multi_line_bodies is None else multi_line_bodies
+        self.breaks_read = False
+
+    @property
+    def breaks(self) -> List[Break]:
+        ''' the applied breaks. accessing them is recorded in `breaks_read`, so that results of conditions that don't
+        depend on them can be cached.
+        '''
+        self.breaks_read = True
+        return self._breaks
+
+    @property
+    def index(self) -> BreakIndex:
+        ''' the applied breaks indexed for the queries of conditions, shared between states via `BreakCache`
+        '''
+        self.breaks_read = True
+        if self._index is None:
+            self._index = BreakIndex(self._breaks)
+        return self._index
+
+    @property
+    def built_index(self) -> Optional[BreakIndex]:
+        return self._index
 
     @property
     def data(self) -> RoseData:
@@ -29,22 +56,14 @@ class BreakState:
 
     @lazy
     def after_breaks(self) -> List[Break]:
-        return (
-            self.breaks
-            .filter(_.line == self.data.line)
-            .filter(_.position > self.data.pos)
-        )
+        return self.index.after(self.data.line, self.data.pos)
 
     def after(self, name: str) -> Boolean:
         return self.after_breaks.exists(__.match_name(name))
 
     @lazy
     def before_breaks(self) -> List[Break]:
-        return (
-            self.breaks
-            .filter(_.line == self.data.line)
-            .filter(_.position < self.data.pos)
-        )
+        return self.index.before(self.data.line, self.data.pos)
 
     def before(self, name: str) -> Boolean:
         return self.before_breaks.exists(__.match_name(name))
@@ -55,19 +74,17 @@ class BreakState:
 
     @lazy
     def parent_breaks(self) -> List[Break]:
-        siblings = self.parent_inode.sub
-        def match(node: RoseAstTree, break_node: RoseAstTree) -> bool:
-            return node == break_node or node.ast.contains(break_node.ast)
-        return (
-            self.breaks
-            .filter(lambda a: siblings.exists(L(match)(_, a.node)))
-        )
+        ''' breaks at the children of the parent inode and at their direct children
+        '''
+        return self.index.children_and_grandchildren(self.parent_inode)
 
     def sub_breaks(self, node: RoseAstTree) -> List[Break]:
-        def loop(n: int, cur: RoseAstTree, acc: List) -> List[Break]:
-            return acc if n == 0 else cur.sub.fold_left(acc + cur.sub.drain)(lambda z, a: loop(n - 1, a, z))
-        subs = loop(3, node, List())
-        return self.breaks.filter(lambda b: subs.exists(lambda n: b.data == n.data))
+        return self.index.descendants(node, 3)
+
+    def has_descendant_breaks(self, node: RoseAstTree) -> bool:
+        ''' whether a break is applied at any descendant of `node`, answered by the shared index of the applied breaks
+        '''
+        return self.index.has_descendant_breaks(node)
 
     def sibling(self, f: Callable[[SubTree], SubTree]) -> Boolean:
         target = f(self.parent.s).e
@@ -78,7 +95,7 @@ class BreakState:
         return self.node.rule
 
     def __str__(self) -> str:
-        return f'BreakState({self.node}, {self.breaks})'
+        return f'BreakState({self.node}, {self._breaks})'
 
 
 def is_break_tuple(a: Any) -> bool:
@@ -34,6 +34,20 @@ class Break(Record):
     def key(self) -> str:
         return self.data.key
 
+    def __eq__(self, other: Any) -> bool:
+        return (
+            isinstance(other, Break) and
+            self.node.ident == other.node.ident and
+            self.prio == other.prio and
+            type(self.side) is type(other.side)
+        )
+
+    def __ne__(self, other: Any) -> bool:
+        return not self.__eq__(other)
+
+    def __hash__(self) -> int:
+        return hash((self.node.ident, self.prio, type(self.side)))
+
     def match_name(self, name: str) -> bool:
         return name == self.rule
 
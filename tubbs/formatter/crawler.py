@@ -1,13 +1,16 @@
-from typing import Tuple, Any
+from typing import Tuple, Any, Hashable, Optional, Callable
 
 from ribosome.record import Record, field, str_field
 
 from tubbs.tatsu.base import ParserBase
 from tubbs.hints.base import HintsBase, HintMatch
 from tubbs.logging import Logging
-from tubbs.tatsu.ast import AstMap
+from tubbs.tatsu.ast import AstMap, AstElem
+from tubbs.tatsu.flat import FlatNode
+from tubbs.tatsu.interval import IntervalIndex
+from tubbs.tatsu.budget import ParseAborted
 
-from amino import Maybe, __, L, _, List, Map, Either
+from amino import Maybe, __, L, _, List, Map, Either, Just, Nothing, Left, Right
 from amino.regex import Match
 
 
@@ -63,16 +66,31 @@ class StartMatch(Record):
 
 
 class Crawler(Logging):
-
-    def __init__(self, content: List[str], line: int, parser: ParserBase, hints: Maybe[HintsBase]) -> None:
+    ''' `window` is the number of lines that are parsed in the first attempt, unless the hint match provides an end
+    line. if the rule fails to parse or the match reaches into the last line of the window, the window is doubled until
+    it covers the rest of the buffer.
+    a `window` of 0 always parses the rest of the buffer.
+    if a `key` identifying the buffer is given, the windows are parsed incrementally, keyed by it, their start line and
+    their size.
+    a window whose parse exhausted the parser's budget or was cancelled is not extended.
+    '''
+
+    def __init__(self, content: List[str], line: int, parser: ParserBase, hints: Maybe[HintsBase], window: int=16,
+                 key: Hashable=None, cancelled: Callable[[], bool]=None) -> None:
         self.content = content
         self.line = line
         self.parser = parser
         self.hints = hints.to_either('no hints specified')
+        self.window = window
+        self.key = key
+        self.cancelled = cancelled
 
-    def find_and_parse(self, ident: str, linewise: bool=True) -> Either:
+    def find_and_parse(self, ident: str, linewise: bool=True, index: Maybe[IntervalIndex]=Nothing) -> Either:
+        ''' if an interval index of a previous parse of the unchanged buffer is given, the node is looked up instead of
+        parsing.
+        '''
         line = self.find(ident, linewise)
-        return self._parse(ident, line)
+        return (index // L(self._indexed)(ident, line, _)) / Right | (lambda: self._parse(ident, line))
 
     def find(self, ident: str, linewise: bool=True) -> Either:
         self.log.debug('crawling for {}'.format(ident))
@@ -96,12 +114,57 @@ class Crawler(Logging):
     def _default_start(self, ident: str) -> Either:
         return HintMatch(line=self.line, rules=List(ident))
 
+    def windows(self, match: Match) -> List[int]:
+        ''' line counts of the successive parse attempts, the last one covering the rest of the buffer
+        '''
+        rest = len(self.content) - match.line
+        initial = match.end_line / (lambda a: a - match.line + 1) | self.window
+        def loop(size: int, acc: List[int]) -> List[int]:
+            return acc.cat(rest) if size >= rest else loop(size * 2, acc.cat(size))
+        return List(rest) if self.window <= 0 else loop(max(initial, 1), List())
+
+    def _complete(self, ast: AstElem, text: str) -> bool:
+        ''' a match that ends before the last line of the window cannot be extended by more text, since the parser
+        had the following line available and did not consume it.
+        '''
+        return 0 <= ast.endpos <= text.rfind('\n')
+
+    def _parse_window(self, rule: str, match: Match) -> Either[str, AstElem]:
+        rest = len(self.content) - match.line
+        def attempt(size: int) -> Maybe[Either[str, AstElem]]:
+            text = self.content[match.line:match.line + size].join_lines
+            key = self._parse_key(match.line, size if size < rest else None)
+            result = self.parser.parse(text, rule, key, self.cancelled)
+            exhausted = result.is_left and isinstance(result.value, ParseAborted)
+            done = size >= rest or exhausted or result.exists(L(self._complete)(_, text))
+            self.log.ddebug(lambda: f'parse window of {size} lines for `{rule}`: {result.is_right}, {done}')
+            return Just(result) if done else Nothing
+        return self.windows(match).find_map(attempt) | (lambda: Left(f'no parse window for `{rule}`'))
+
+    def _parse_key(self, line: int, size: Optional[int]) -> Hashable:
+        ''' each window size is kept separately, since the windows of one match replace each other's text otherwise.
+        the window covering the rest of the buffer has the size `None`, so that it is found again after lines were
+        added or removed.
+        '''
+        return None if self.key is None else ('crawl', self.key, line, size)
+
+    def _indexed(self, ident: str, match: Match, index: IntervalIndex) -> Maybe[StartMatch]:
+        ''' the innermost node with one of the hint's rules that contains the first non-blank character of the cursor
+        line. it is only used if it starts in the line of the hint, where parsing would have started as well.
+        '''
+        def start_match(node: FlatNode) -> StartMatch:
+            hint = HintMatch(line=index.line, rules=List(node.rule))
+            return StartMatch(ast=node.ast, rule=node.rule, ident=ident, hint=hint)
+        return (
+            index.line_offset(self.line) //
+            L(index.innermost)(match.rules, _)
+        ).filter(lambda a: isinstance(a.ast, AstMap) and a.ast.start_line.lnum + index.line == match.line) / start_match
+
     def _parse(self, ident: str, match: Match) -> Either:
         self.log.debug('parsing {} for {}'.format(match, ident))
-        text = self.content[match.line:].join_lines
         def match_rule(rule: str) -> Either:
             return (
-                self.parser.parse(text, rule) /
+                self._parse_window(rule, match) /
                 L(StartMatch.from_attr('ast'))(_, rule=rule, ident=ident, hint=match)
             )
         return (
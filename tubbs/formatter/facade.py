@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import Tuple, Hashable, Callable
 
 from amino import List, Either, L, _, Maybe, Eval, Right, __
 
@@ -19,15 +19,22 @@ class Formatted:
 
 
 class FormattingFacade(Logging):
+    ''' `key` identifies the buffer for incremental parsing.
+    `cancelled` is checked before each formatter, the remaining ones being skipped once it returns `True`, and passed
+    to the parser, which aborts a running parse.
+    '''
 
-    def __init__(self, parser: ParserBase, formatters: List[Formatter], hints: Maybe[HintsBase]) -> None:
+    def __init__(self, parser: ParserBase, formatters: List[Formatter], hints: Maybe[HintsBase], key: Hashable=None,
+                 cancelled: Callable[[], bool]=None) -> None:
         self.parser = parser
         self.formatters = formatters
         self.hints = hints
+        self.key = key
+        self.cancelled = (lambda: False) if cancelled is None else cancelled
 
     def parsable_range(self, context: List[str], rng: Range) -> Either[str, Tuple[str, Range]]:
         start, end = rng
-        crawler = Crawler(context, start, self.parser, self.hints)
+        crawler = Crawler(context, start, self.parser, self.hints, key=self.key, cancelled=self.cancelled)
         result = crawler.parsable_range
         return result.map(_.rule).zip(result.map(_.range))
 
@@ -41,14 +48,25 @@ class FormattingFacade(Logging):
 
     def format_range(self, rule: str, context: List[str], rng: Range) -> Eval[Formatted]:
         lines = context.slice(*rng)
-        format_with = L(self.format_with)(rule, _, _)
+        format_with = L(self.format_with)(rule, _, _, rng[0])
         return self.formatters.fold_m(Eval.now(lines))(format_with) / L(Formatted)(_, rng)
 
-    def format_with(self, rule: str, lines: List[str], formatter: Formatter) -> Eval[List[str]]:
+    def format_with(self, rule: str, lines: List[str], formatter: Formatter, line: int=0) -> Eval[List[str]]:
+        def log_memo(result: List[str]) -> List[str]:
+            self.log.debug(f'{formatter.__class__.__name__}: {formatter.handler_memo.stats}')
+            return result
+        if self.cancelled():
+            return Eval.now(lines)
         return (
-            self.parser.parse(lines.join_lines, rule) //
+            self.parser.parse(lines.join_lines, rule, self._parse_key(formatter, line), self.cancelled) //
             formatter.format /
-            (_ | lines)
+            (_ | lines) /
+            log_memo
         )
 
+    def _parse_key(self, formatter: Formatter, line: int) -> Hashable:
+        ''' each formatter parses the output of the previous one, so their texts are kept separately
+        '''
+        return None if self.key is None else ('format', self.key, line, formatter.__class__.__name__)
+
 __all__ = ('FormattingFacade',)
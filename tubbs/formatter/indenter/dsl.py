@@ -1,6 +1,6 @@
 from typing import Callable, Any
 
-from amino import Either, List, Map, _
+from amino import Either, List, Map, _, Try
 from amino.lazy import lazy
 from amino.func import dispatch
 
@@ -76,7 +76,6 @@ class Builder:
 
 
 def parse_indent_expr(parser: Parser, expr: str, conds: Map[str, Any]) -> Either[str, IndentCond]:
-    ast = parser.parse(expr, 'top')
-    return Builder(conds).build(ast.value)
+    return parser.parse(expr, 'top').lmap(str) // (lambda ast: Try(Builder(conds).build, ast).lmap(str))
 
 __all__ = ('parse_indent_expr',)
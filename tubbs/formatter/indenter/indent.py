@@ -18,6 +18,21 @@ class Indent(Record):
     def data(self) -> RoseData:
         return self.node.data
 
+    def __eq__(self, other: Any) -> bool:
+        return (
+            isinstance(other, Indent) and
+            self.node.ident == other.node.ident and
+            self.amount == other.amount and
+            self.range is other.range and
+            self.absolute == other.absolute
+        )
+
+    def __ne__(self, other: Any) -> bool:
+        return not self.__eq__(other)
+
+    def __hash__(self) -> int:
+        return hash((self.node.ident, self.amount, self.range, self.absolute))
+
     @property
     def line(self) -> int:
         return self.node.line
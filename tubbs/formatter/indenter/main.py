@@ -1,13 +1,14 @@
 import abc
-from typing import Callable, Union
+from typing import Callable, Union, Tuple, Optional, List as TList
 
 from amino import List, L, Right, Map, Either, __, _, Maybe, Eval, Boolean
 from amino.list import Lists
+from amino.lazy import lazy
 
 from ribosome.nvim import NvimFacade
 from ribosome.util.callback import VimCallback
 
-from tubbs.formatter.base import Formatter, VimFormatterMeta
+from tubbs.formatter.base import Formatter, VimFormatterMeta, compile_rules, HandlerMemo, shared_handler_memo
 from tubbs.tatsu.ast import AstElem, ast_rose_tree, RoseAstTree, Line, RoseData
 from tubbs.formatter.indenter.indent import Indent
 from tubbs.formatter.indenter.state import IndentState
@@ -38,12 +39,26 @@ class IndenterBase(Formatter[IndentCond]):
         return Eval.now(self.collect_indents(rt) / _.indents / L(self.apply_indents)(ast, _))
 
     def collect_indents(self, ast: RoseAstTree) -> Either[str, IndentState]:
-        def run(z: IndentState, n: RoseAstTree) -> Either[str, IndentState]:
-            def descend(i: Indent) -> Either[str, IndentState]:
-                z1 = z.push_sub(i)
-                return n.sub.fold_m(Right(z1))(run).map(__.pop(i)).map(__.push_after(i))
-            return self.node_indent(z.set(node=n)) // descend
-        return run(IndentState(node=ast, current=0), ast)
+        ''' visit the nodes in pre-order, pushing each node's indent before its children and popping it after them.
+        the traversal uses an explicit stack and a single mutable state, so the cost is linear in the number of nodes.
+        '''
+        state = IndentState(ast)
+        stack = [(ast, None)]  # type: TList[Tuple[RoseAstTree, Optional[Indent]]]
+        while stack:
+            node, indent = stack.pop()
+            if indent is not None:
+                state.pop(indent)
+                state.push_after(indent)
+                continue
+            state.node = node
+            result = self.node_indent(state)
+            if result.is_left:
+                return result
+            indent = result.value
+            state.push_sub(indent)
+            stack.append((node, indent))
+            stack.extend((a, None) for a in node.sub.drain.reversed)
+        return Right(state)
 
     def apply_indents(self, ast: AstElem, indents: List[Indent]) -> List[str]:
         return (
@@ -60,6 +75,9 @@ class IndenterBase(Formatter[IndentCond]):
         ws = ' ' * ((shifts * self.shiftwidth) + baseline)
         return f'{ws}{line.trim}'
 
+    def _handler_key(self, node: RoseData) -> Tuple:
+        return super()._handler_key(node) + (bool(node.bol), bool(node.eol))
+
     def _handler_names(self, node: RoseData, names: List[str]) -> List[str]:
         def boundary(cond: Boolean, suf: str) -> List[str]:
             return Lists.iff_l(cond)(lambda: names.map(lambda a: f'{a}_{suf}'))
@@ -82,6 +100,10 @@ class Indenter(IndenterBase):
         super().__init__(shiftwidth)
         self.rules = rules
 
+    @lazy
+    def handler_memo(self) -> HandlerMemo:
+        return shared_handler_memo(type(self), type(self.rules))
+
     def handler(self, name: str) -> Maybe[Handler]:
         return Maybe.getattr(self.rules, name)
 
@@ -97,9 +119,15 @@ class DictIndenter(IndenterBase):
         self.parser = parser
         self.rules = rules
         self.conds = conds
+        self.compiled, self._handler_memo = compile_rules(parse_indent_expr, IndentCond, parser, rules, conds)
+        self.handlers = self.compiled.map(__.valmap(lambda a: lambda: a)) | Map()
+
+    @property
+    def handler_memo(self) -> HandlerMemo:
+        return self._handler_memo
 
     def handler(self, attr: str) -> Maybe[Handler]:
-        return self.rules.lift(attr) / L(parse_indent_expr)(self.parser, _, self.conds) / (lambda a: lambda: a)
+        return self.handlers.lift(attr)
 
     @property
     def default_handler(self) -> Handler:
@@ -1,53 +1,66 @@
-from typing import Any
+from typing import Dict, List as TList
 
-from amino import List, _, Boolean
-from amino.lazy import lazy
-
-from ribosome.record import Record, int_field, list_field, field
+from amino import List, Boolean
 
+from tubbs.logging import Logging
 from tubbs.formatter.indenter.indent import Indent
 from tubbs.tatsu.ast import RoseAstTree, RoseData
 from tubbs.formatter.indenter.info import Children, FromHere, Here, After
 
 
-class IndentState(Record):
-    node = field(RoseAstTree)
-    current = int_field()
-    indents = list_field(Indent)
-    stack = list_field(Indent)
-    incs = list_field(Indent)
+class IndentState(Logging):
+    ''' mutable state of a single indent collection run.
+    all operations are O(1) amortized: indents and the stack are appended to in place, the increments are indexed by
+    the identity of their node's parent for `sibling_indents`, and `pop` scans the stack from the end, which only
+    visits the entries it removes.
+    '''
+
+    def __init__(self, node: RoseAstTree, current: int=0) -> None:
+        self.node = node
+        self.current = current
+        self.indents = List()  # type: List[Indent]
+        self.stack = []  # type: TList[Indent]
+        self.incs = dict()  # type: Dict[int, TList[Indent]]
 
-    def push_here(self, new: Indent) -> 'IndentState':
+    def push_here(self, new: Indent) -> None:
         add = new.inc(self.current)
         self.log.ddebug(lambda: f'indent for {add.node}: {add.amount}')
-        return self.append1.indents(add)
+        self.indents.append(add)
 
-    def update_current(self, update: Indent) -> 'IndentState':
-        current = update.amount if update.absolute else self.current + update.amount
-        self.log.ddebug(lambda: f'push current: {update} {current}')
-        return self.set(current=current).append1.stack(update)
+    def update_current(self, update: Indent) -> None:
+        self.current = update.amount if update.absolute else self.current + update.amount
+        self.log.ddebug(lambda: f'push current: {update} {self.current}')
+        self.stack.append(update)
 
-    def push_sub(self, new: Indent) -> 'IndentState':
+    def push_sub(self, new: Indent) -> None:
         keep = Indent(node=new.node, amount=0, range=Here)
         add_stack = new if new.range in (Children, FromHere) else keep
         add_indents = new if new.range in (Here, FromHere) else keep
-        s1 = self if new.amount == 0 else self.append1.incs(new)
-        return s1.push_here(add_indents).update_current(add_stack)
-
-    def push_after(self, new: Indent) -> 'IndentState':
-        return self.update_current(new) if new.range in (After, FromHere) else self
-
-    def pop(self, start: Indent) -> 'IndentState':
-        index = self.stack.index_where(lambda a: a.node == start.node) | -1
-        before = self.stack[:index]
-        after = self.stack[index:]
-        dec = sum(after.map(_.amount))
+        if new.amount != 0:
+            self.incs.setdefault(id(new.node.parent), []).append(new)
+        self.push_here(add_indents)
+        self.update_current(add_stack)
+
+    def push_after(self, new: Indent) -> None:
+        if new.range in (After, FromHere):
+            self.update_current(new)
+
+    def pop(self, start: Indent) -> None:
+        ''' remove the stack entry of `start`'s node and all later entries, or the last entry if there is none
+        '''
+        stack = self.stack
+        index = len(stack) - 1
+        while index >= 0 and stack[index].node != start.node:
+            index -= 1
+        if index < 0:
+            index = len(stack) - 1
+        dec = sum(a.amount for a in stack[index:])
         self.log.ddebug(lambda: f'pop: {start} {dec}')
-        return self.set(current=self.current - dec, stack=before)
+        del stack[index:]
+        self.current -= dec
 
-    @property
-    def _str_extra(self) -> List[Any]:
-        return List(self.current, self.indents)
+    def __str__(self) -> str:
+        return f'IndentState({self.current}, {self.indents})'
 
     @property
     def data(self) -> RoseData:
@@ -57,9 +70,9 @@ class IndentState(Record):
     def parent(self) -> RoseAstTree:
         return self.node.parent
 
-    @lazy
+    @property
     def sibling_indents(self) -> List[Indent]:
-        return self.incs.filter(lambda a: a.node.parent is self.parent)
+        return List.wrap(self.incs.get(id(self.parent), []))
 
     @property
     def sibling_indent(self) -> Boolean:
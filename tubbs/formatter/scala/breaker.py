@@ -3,7 +3,7 @@ from amino import _
 from ribosome.util.callback import VimCallback
 from ribosome.nvim import NvimFacade
 
-from tubbs.formatter.breaker.main import Breaker as BreakerBase
+from tubbs.formatter.breaker.main import Breaker as BreakerBase, vim_break_engine
 from tubbs.formatter.breaker.cond import BreakCond
 from tubbs.formatter.breaker.rules import BreakRules
 from tubbs.formatter.breaker.conds import (multi_line_block, sibling, parent_rule, sibling_rule, sibling_valid, after,
@@ -61,14 +61,14 @@ class ScalaBreakRules(BreakRules):
 
 class Breaker(BreakerBase):
 
-    def __init__(self, textwidth: int) -> None:
-        super().__init__(ScalaBreakRules(), textwidth)
+    def __init__(self, textwidth: int, engine: str='greedy') -> None:
+        super().__init__(ScalaBreakRules(), textwidth, engine)
 
 
 class VimBreaker(Breaker, VimCallback):
 
     def __init__(self, vim: NvimFacade) -> None:
         tw = vim.buffer.options('textwidth') | 120
-        super().__init__(tw)
+        super().__init__(tw, vim_break_engine(vim))
 
 __all__ = ('ScalaBreakRules', 'Breaker', 'VimBreaker')
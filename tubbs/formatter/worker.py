@@ -0,0 +1,90 @@
+import queue
+import threading
+from typing import Callable, Dict, TypeVar, Any, Tuple, Optional
+
+from amino import Either, Try, I
+
+from tubbs.logging import Logging
+
+A = TypeVar('A')
+Job = Callable[[Callable[[], bool]], Either[str, A]]
+Done = Callable[[int, Either[str, A]], None]
+
+
+class FormatWorkerStats:
+
+    def __init__(self) -> None:
+        self.submitted = 0
+        self.done = 0
+        self.skipped = 0
+        self.dropped = 0
+
+    def __str__(self) -> str:
+        return (f'FormatWorkerStats(submitted={self.submitted}, done={self.done}, skipped={self.skipped}, ' +
+                f'dropped={self.dropped})')
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class FormatWorker(Logging):
+    ''' runs formatting jobs one after another on a daemon thread.
+    each job belongs to a buffer, and submitting a job increments the buffer's generation, making all previous jobs
+    for the buffer stale. a stale job that is still queued is skipped, a running one is passed a `cancelled` check that
+    the formatting facade consults before each formatter and the parser during each parse, and its result is dropped
+    instead of being passed to `done`.
+    '''
+
+    def __init__(self) -> None:
+        self.stats = FormatWorkerStats()
+        self._generations = dict()  # type: Dict[Any, int]
+        self._queue = queue.Queue()  # type: queue.Queue
+        self._lock = threading.Lock()
+        self._thread = None  # type: Optional[threading.Thread]
+
+    def current(self, buffer: Any, generation: int) -> bool:
+        with self._lock:
+            return self._generations.get(buffer) == generation
+
+    def submit(self, buffer: Any, job: Job, done: Done) -> int:
+        with self._lock:
+            generation = self._generations.get(buffer, 0) + 1
+            self._generations[buffer] = generation
+            self.stats.submitted += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='tubbs-format', daemon=True)
+                self._thread.start()
+        self._queue.put((buffer, generation, job, done))
+        return generation
+
+    def cancel(self, buffer: Any) -> None:
+        with self._lock:
+            if buffer in self._generations:
+                self._generations[buffer] += 1
+
+    def _run(self) -> None:
+        while True:
+            self._process(self._queue.get())
+            self._queue.task_done()
+
+    def _process(self, item: Tuple[Any, int, Job, Done]) -> None:
+        buffer, generation, job, done = item
+        def cancelled() -> bool:
+            return not self.current(buffer, generation)
+        if cancelled():
+            self.stats.skipped += 1
+            return
+        result = Try(job, cancelled).lmap(lambda err: f'formatting failed: {err}') // I
+        if cancelled():
+            self.log.debug(f'dropping stale formatting result for {buffer}')
+            self.stats.dropped += 1
+        else:
+            self.stats.done += 1
+            Try(done, generation, result).leffect(lambda err: self.log.error(f'handling formatting result: {err}'))
+
+    def join(self) -> None:
+        ''' wait until all submitted jobs have been processed
+        '''
+        self._queue.join()
+
+__all__ = ('FormatWorker', 'FormatWorkerStats')
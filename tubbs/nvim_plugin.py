@@ -3,12 +3,14 @@ import neovim
 from ribosome import command, NvimStatePlugin, msg_command, NvimFacade
 from ribosome.request import msg_function, json_msg_command
 
-from amino import List
+from amino import List, Maybe, _, __
+from amino.util.string import decode
 
 from tubbs.main import Tubbs
 from tubbs.logging import Logging
+from tubbs.buffer_mirror import BufferMirror
 from tubbs.plugins.core.message import (AObj, StageI, AObjRule, IObj, IObjRule,
-                                        FormatRange, FormatAt, FormatExpr)
+                                        FormatRange, FormatAt, FormatExpr, ShowParseProfile)
 
 
 class TubbsNvimPlugin(Logging, NvimStatePlugin):
@@ -77,4 +79,29 @@ class TubbsNvimPlugin(Logging, NvimStatePlugin):
     def tub_format_at(self) -> None:
         pass
 
+    @json_msg_command(ShowParseProfile)
+    def tubbs_parse_profile(self) -> None:
+        pass
+
+    @property
+    def mirror(self) -> Maybe[BufferMirror]:
+        return Maybe(self.tubbs) // (lambda a: Maybe(a.data)) / _.mirror
+
+    @neovim.rpc_export('nvim_buf_lines_event')
+    def buf_lines_event(self, buffer: neovim.api.Buffer, changedtick: int, first: int, last: int, data: list,
+                        more: bool) -> None:
+        ''' `more` is ignored: nvim reserves it for multipart changes, whose parts each replace `first` to `last` in
+        the lines that result from the previous part, so applying every event in order yields the same mirror. nvim
+        currently never sets it.
+        '''
+        self.mirror % __.lines_event(buffer.number, changedtick, first, last, decode(data))
+
+    @neovim.rpc_export('nvim_buf_changedtick_event')
+    def buf_changedtick_event(self, buffer: neovim.api.Buffer, changedtick: int) -> None:
+        self.mirror % __.changedtick_event(buffer.number, changedtick)
+
+    @neovim.rpc_export('nvim_buf_detach_event')
+    def buf_detach_event(self, buffer: neovim.api.Buffer) -> None:
+        self.mirror % __.detach_event(buffer.number)
+
 __all__ = ('TubbsNvimPlugin',)
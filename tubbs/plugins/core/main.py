@@ -1,32 +1,51 @@
 from typing import Callable, Tuple
 
-from ribosome.machine import may_handle, handle, Message
+from ribosome.machine import may_handle, handle, Message, Nop
 from ribosome.machine.base import io, UnitTask
-from ribosome.machine.transition import Fatal
+from ribosome.machine.transition import Fatal, NothingToDo
 from ribosome.request.base import parse_int
 
-from amino import __, L, _, Task, Either, Maybe, Right, List, Map, Eval, Left
+from amino import __, L, _, Task, Either, Maybe, Right, List, Map, Eval, Left, Path, Try
 from amino.util.string import snake_case
 from amino.state import EvalState
 
 from tubbs.state import TubbsComponent, TubbsTransitions
 
-from tubbs.plugins.core.message import StageI, AObj, Select, Format, FormatRange, FormatAt, FormatExpr
+from tubbs.plugins.core.message import (StageI, AObj, Select, Format, FormatRange, FormatAt, FormatExpr, Warmup,
+                                        WarmedUp, FormatDone, ShowParseProfile)
 from tubbs.tatsu.base import ParserBase
 from tubbs.formatter.facade import FormattingFacade, Formatted, Range
 from tubbs.formatter.base import Formatter, VimFormatterMeta
 from tubbs.hints.base import HintsBase
 from tubbs.env import Env
-from tubbs.formatter.crawler import Crawler, Match
+from tubbs.formatter.crawler import Crawler, Match, StartMatch
+from tubbs.tatsu.interval import IntervalIndex
+from tubbs.tatsu.warmup import ParserWarmup, dsl_parsers
+from tubbs.buffer_mirror import NvimMirrorSource
+from tubbs.tatsu.profile import ParseProfile, sort_keys
 
 formatters_pkg = 'tubbs.formatter'
+mirrored_langs = List('scala')
 
 
 class CoreTransitions(TubbsTransitions):
 
     @may_handle(StageI)
-    def stage_i(self) -> Message:
-        return io(__.vars.set_p('started', True))
+    def stage_i(self) -> List[Message]:
+        return List(io(__.vars.set_p('started', True)), Warmup())
+
+    @may_handle(Warmup)
+    def warmup(self) -> None:
+        ''' load the parsers for the current filetype and the formatter dsls in the background, disabled by setting
+        `g:tubbs_warmup` to 0.
+        '''
+        if self.vim.vars.pi('warmup') | 1:
+            names = self.parser_name.to_list + dsl_parsers
+            ParserWarmup(names, lambda a: self.machine.bubble(WarmedUp(a))).start()
+
+    @may_handle(WarmedUp)
+    def warmed_up(self) -> Env:
+        return self.data.add_parsers(self.msg.parsers)
 
     @handle(AObj)
     def a_obj(self) -> Maybe[Message]:
@@ -75,16 +94,57 @@ class CoreTransitions(TubbsTransitions):
     def format(self) -> EvalState[Env, Either[str, Message]]:
         name = self.msg.parser
         range = self.msg.range
+        run = self.format_async if self.vim.vars.pi('async_format') | 0 else self.format_sync
         return (
             EvalState.modify(lambda a: a.load_parser(name) | a)
             .flat_map(lambda a: self.formatters(name))
             .eff(Either)
-            .flat_map(L(self._format)(name, _, range))
-            .map(L(self.update_range)(_, self.msg.range))
+            .flat_map(L(run)(name, _, range))
             .value
             .map(__.lmap(Fatal))
         )
 
+    def format_sync(self, name: str, formatters: List[Formatter], rng: Range) -> EvalState[Env, Either[str, Message]]:
+        return self._format(name, formatters, rng).eff(Either).map(L(self.update_range)(_, rng)).value
+
+    def format_async(self, name: str, formatters: List[Formatter], rng: Range) -> EvalState[Env, Either[str, Message]]:
+        ''' enabled by setting `g:tubbs_async_format` to 1.
+        the buffer's changedtick and content are read here, parsing and formatting run on the `FormatWorker`, which
+        cancels a previous job for the same buffer. the result is sent back with `FormatDone`.
+        '''
+        buffer = self.vim.buffer.id
+        tick = self.changedtick
+        content = self.content(name)
+        def submit(env: Env, parser: ParserBase, changedtick: int) -> Message:
+            configured = self.configure_parser(parser)
+            hints = self.hints(parser.name)
+            def job(cancelled: Callable[[], bool]) -> Either[str, Formatted]:
+                facade = FormattingFacade(configured, formatters, hints, buffer, cancelled)
+                return facade.format(content, rng).value
+            def done(generation: int, result: Either[str, Formatted]) -> None:
+                self.machine.bubble(FormatDone(buffer, changedtick, generation, result))
+            generation = env.worker.submit(buffer, job, done)
+            self.log.debug(f'formatting {rng} in buffer {buffer} at {changedtick} as job {generation}')
+            return Nop()
+        return EvalState.inspect(lambda env: env.parser(name).zip(tick).map2(L(submit)(env, _, _)))
+
+    @handle(FormatDone)
+    def format_done(self) -> Either[Fatal, Message]:
+        ''' the result of a stale job or for a buffer that is not current or has changed since is discarded
+        '''
+        buffer = self.msg.buffer
+        def check(formatted: Formatted) -> Either[Fatal, Message]:
+            return (
+                Left(NothingToDo(f'job {self.msg.generation} for buffer {buffer} was superseded'))
+                if not self.data.worker.current(buffer, self.msg.generation) else
+                Left(NothingToDo(f'buffer {buffer} is not current'))
+                if self.vim.buffer.id != buffer else
+                Left(NothingToDo(f'buffer {buffer} changed during formatting'))
+                if not self.changedtick.contains(self.msg.changedtick) else
+                Right(self.update_range(formatted, formatted.rng))
+            )
+        return self.msg.result.lmap(Fatal) // check
+
     @property
     def parser_name(self) -> Either[str, str]:
         return (
@@ -129,10 +189,17 @@ class CoreTransitions(TubbsTransitions):
         parser_name = f'{snake_name}_dsl'
         def load_parser(env: Env) -> Env:
             return env.load_parser(parser_name) | env
+        def compiled(formatter: Formatter) -> Either[str, Formatter]:
+            return (
+                formatter.compiled
+                .lmap(lambda err: f'invalid {snake_name} rule for {lang}: {err}')
+                .leffect(self.log.error)
+                .replace(formatter)
+            )
         def create_formatter(env: Env) -> Either[str, Formatter]:
             formatter = Either.import_name(f'{pkg}.main', f'VimDict{name}')
             parser = env.parser(parser_name)
-            return formatter.zip(parser, conds).map3(cons)
+            return formatter.zip(parser, conds).map3(cons) // compiled
         return (
             EvalState.modify(load_parser).replace(Right(None)).eff(Either) //
             (lambda a: EvalState.inspect(create_formatter))
@@ -145,10 +212,20 @@ class CoreTransitions(TubbsTransitions):
         )
 
     def with_match_msg(self, f: Callable[[ParserBase], Message]) -> Either:
-        return self.data.parser(self.msg.parser) / L(self.with_match)(_, self.msg.ident, f)
+        return self.data.parser(self.msg.parser) / self.configure_parser / L(self.with_match)(_, self.msg.ident, f)
 
     def with_match(self, parser: str, ident: str, f: Callable[[ParserBase], Either]) -> Either:
-        return self.crawler(parser) // __.find_and_parse(ident) // f
+        buffer = self.vim.buffer.id
+        tick = self.changedtick.to_maybe
+        index = tick // L(self.data.indexes.lookup)(buffer, _)
+        def store(match: StartMatch) -> None:
+            if not index.exists(__.covers(match.ast)):
+                (tick & IntervalIndex.from_ast(match.ast, match.line)).map2(L(self.data.indexes.store)(buffer, _, _))
+        return self.crawler(parser) // __.find_and_parse(ident, index=index) % store // f
+
+    @property
+    def changedtick(self) -> Either[str, int]:
+        return self.vim.buffer.vars('changedtick')
 
     def visual(self, match: Match) -> UnitTask:
         self.log.debug('attempting to select {}'.format(match))
@@ -167,11 +244,26 @@ class CoreTransitions(TubbsTransitions):
 
     def crawler(self, parser: ParserBase) -> Either[str, Crawler]:
         hints = self.hints(parser.name)
-        content = self.vim.buffer.content
-        return self.vim.window.line0 / (L(Crawler)(content, _, parser, hints))
+        content = self.content(parser.name)
+        return self.vim.window.line0 / (L(Crawler)(content, _, parser, hints, key=self.vim.buffer.id))
+
+    def content(self, lang: str) -> List[str]:
+        ''' the lines of the current buffer.
+        if `g:tubbs_buffer_mirror` is set, buffers of the languages in `mirrored_langs` are read from the buffer
+        mirror, which only fetches the whole buffer when its copy is out of step.
+        '''
+        buffer = self.vim.buffer
+        def fetch(err: str) -> List[str]:
+            self.log.debug(f'reading buffer without mirror: {err}')
+            return buffer.content
+        return (
+            self.data.mirror.lines(buffer.id, NvimMirrorSource(self.vim)).value_or(fetch)
+            if lang in mirrored_langs and self.vim.vars.pi('buffer_mirror') | 0 else
+            buffer.content
+        )
 
     def _format(self, name: str, formatters: List[Formatter], rng: Range) -> Formatted:
-        content = self.vim.buffer.content
+        content = self.content(name)
         return (
             EvalState.inspect(__.parser(name))
             .eff(Either)
@@ -181,7 +273,63 @@ class CoreTransitions(TubbsTransitions):
         )
 
     def formatting_facade(self, parser: ParserBase, formatters: List[Formatter]) -> FormattingFacade:
-        return FormattingFacade(parser, formatters, self.hints(parser.name))
+        return FormattingFacade(self.configure_parser(parser), formatters, self.hints(parser.name), self.vim.buffer.id)
+
+    def configure_parser(self, parser: ParserBase) -> ParserBase:
+        ''' the parse result cache is opt-in, enabled by setting `g:tubbs_parse_cache_entries` to a positive number.
+        incremental parsing is enabled by setting `g:tubbs_incremental_parse` to the number of texts to keep.
+        a single parse is aborted after `g:tubbs_parse_budget_ms` milliseconds or `g:tubbs_parse_budget_calls` rule
+        invocations.
+        '''
+        entries = self.vim.vars.pi('parse_cache_entries') | 0
+        max_bytes = self.vim.vars.pi('parse_cache_bytes') | 0
+        incremental = self.vim.vars.pi('incremental_parse') | 0
+        budget_ms = self.vim.vars.pi('parse_budget_ms') | 0
+        budget_calls = self.vim.vars.pi('parse_budget_calls') | 0
+        profile = self.vim.vars.pi('parse_profile') | 0
+        return (
+            parser
+            .configure_cache(entries, max_bytes)
+            .configure_incremental(incremental)
+            .configure_budget(budget_ms, budget_calls)
+            .configure_profile(profile > 0)
+        )
+
+    @handle(ShowParseProfile)
+    def parse_profile(self) -> Either[Fatal, Message]:
+        ''' show the rule profile of the current filetype's parser, sorted by the option `sort`, one of `sort_keys`,
+        and limited to `limit` rules. with the option `json`, the profile is written to that file instead.
+        if `reset` is set, the statistics are cleared afterwards.
+        '''
+        options = self.msg.options
+        key = options.get('sort') | 'own'
+        limit = parse_int(options.get('limit') | 0).lmap(lambda err: f'invalid limit for the parse profile: {err}')
+        def profile(parser: ParserBase) -> Either[str, ParseProfile]:
+            disabled = f'profiling is disabled for {parser.name}, set `g:tubbs_parse_profile`'
+            return Maybe(parser.profile).to_either(disabled)
+        def show(profile: ParseProfile, limit: int) -> Either[str, Message]:
+            lines = (
+                options.get('json') /
+                L(self.write_profile)(profile, _, key) |
+                (lambda: Right(profile.table(key, limit)))
+            )
+            if lines.is_right and options.get('reset').exists(bool):
+                profile.reset()
+            return lines / (lambda a: io(__.multi_line_info(a)))
+        return (
+            (Right(key) if key in sort_keys else Left(f'invalid sort key for the parse profile: {key}')) //
+            (lambda a: self.parser_name) //
+            self.data.parser //
+            profile //
+            (lambda a: limit // L(show)(a, _))
+        ).lmap(Fatal)
+
+    def write_profile(self, profile: ParseProfile, path: str, key: str) -> Either[str, List[str]]:
+        return (
+            Try(Path(path).expanduser().write_text, profile.json(key))
+            .lmap(lambda err: f'could not write the parse profile to {path}: {err}')
+            .replace(List(f'parse profile written to {path}'))
+        )
 
     def update_range(self, formatted: Formatted, rng: Range) -> Message:
         return io(__.buffer.set_content(formatted.lines, rng=slice(*formatted.rng)))
@@ -1,15 +1,19 @@
 from ribosome.machine import message, json_message
 
 StageI = message('StageI')
+Warmup = message('Warmup')
+WarmedUp = message('WarmedUp', 'parsers')
 AObj = message('AObj', 'ident')
 IObj = message('IObj', 'ident')
 AObjRule = message('AObj', 'rule')
 IObjRule = message('IObj', 'rule')
 Select = message('Select', 'parser', 'tpe', 'ident')
 Format = message('Format', 'parser', 'range')
+FormatDone = message('FormatDone', 'buffer', 'changedtick', 'generation', 'result')
 FormatRange = json_message('FormatRange')
 FormatAt = json_message('FormatAt', 'line')
 FormatExpr = json_message('FormatExpr', 'line', 'count')
+ShowParseProfile = json_message('ShowParseProfile')
 
-__all__ = ('StageI', 'AObj', 'IObj', 'AObjRule', 'IObjRule', 'Select', 'Format', 'FormatRange', 'FormatAt',
-           'FormatExpr')
+__all__ = ('StageI', 'Warmup', 'WarmedUp', 'AObj', 'IObj', 'AObjRule', 'IObjRule', 'Select', 'Format', 'FormatDone',
+           'FormatRange', 'FormatAt', 'FormatExpr', 'ShowParseProfile')
@@ -1,23 +1,24 @@
 import abc
-from typing import Union, TypeVar, Generic, Tuple, cast, Any, Callable
+import itertools
+from sys import intern
+from typing import Union, TypeVar, Generic, Tuple, cast, Any, Callable, List as TList
 
 from tatsu.ast import AST
-from tatsu.infos import LineInfo, ParseInfo
+from tatsu.infos import ParseInfo
 
 from hues import huestr
 
 from toolz import dissoc, valfilter
 
-from ribosome.record import Record, str_field, int_field, field
+from ribosome.record import Record, str_field, field
 
-from amino import List, _, Maybe, Map, Boolean, LazyList, L, Just, Either, Nothing
+from amino import List, _, Maybe, Map, Boolean, LazyList, Just, Either, Nothing
 from amino.tree import Node, ListNode, MapNode, LeafNode, Inode, SubTree
-from amino.list import Lists
 from amino.bi_rose_tree import RoseTree, BiRoseTree, RoseTreeRoot
-from amino.func import dispatch
 from amino.lazy_list import LazyLists
 from amino.boolean import true, false
-from amino.lazy import lazy
+
+from tubbs.tatsu.lines import Line, line_table
 
 
 def indent(strings: Union[str, List[str]]) -> List[str]:
@@ -28,43 +29,6 @@ def indent(strings: Union[str, List[str]]) -> List[str]:
     )
 
 
-class Line(Record):
-    text = str_field()
-    lnum = int_field()
-    start = int_field()
-    end = int_field()
-    length = int_field()
-    indent = int_field()
-
-    @staticmethod
-    def from_line_info(info: LineInfo) -> 'Line':
-        return Line(
-            text=info.text,
-            lnum=info.line,
-            start=info.start,
-            end=info.end,
-            length=info.end - info.start - 1,
-            indent=Lists.wrap(info.text).index_where(_ != ' ').get_or_else(0)
-        )
-
-    @property
-    def show_text(self) -> str:
-        chomped = self.text.replace('\n', '')
-        return f'"{chomped}"'
-
-    @property
-    def _str_extra(self) -> List[Any]:
-        return List(self.lnum, self.start, self.length, self.end, self.show_text)
-
-    @property
-    def trim(self) -> str:
-        return self.text.strip()
-
-    @property
-    def range(self) -> Tuple[int, int]:
-        return self.start, self.end
-
-
 Sub = TypeVar('Sub')
 
 
@@ -157,9 +121,11 @@ class AstInode(Generic[Sub], Inode[str, Sub], AstElem[Sub]):
     def with_ws(self) -> str:
         return self.text
 
-    @lazy
+    @property
     def _sub_ref(self) -> Maybe[AstElem]:
-        return self.sub_l.find(lambda a: not a.is_newline)
+        if self._ref is None:
+            self._ref = self.sub_l.find(lambda a: not a.is_newline)
+        return self._ref
 
     def _sub_ref_int(self, attr: Callable[[AstElem], Maybe[int]]) -> int:
         return self._sub_ref / attr | -1
@@ -206,11 +172,14 @@ class AstInode(Generic[Sub], Inode[str, Sub], AstElem[Sub]):
 
 
 class AstList(ListNode[str], AstInode[LazyList[Node[str, Any]]]):
+    __slots__ = ('data', '_rule', '_line', '_ref', '_rose_tree')
 
     def __init__(self, sub: List[AstElem], rule: str, line: Line) -> None:
         super().__init__(sub)
-        self._rule = rule
+        self._rule = intern(rule)
         self._line = line
+        self._ref = None
+        self._rose_tree = None
 
     @property
     def rule(self) -> str:
@@ -268,23 +237,30 @@ class AstList(ListNode[str], AstInode[LazyList[Node[str, Any]]]):
 class AstClosure(AstList):
     ''' Closures are sublists of rules and cannot be top level.
     '''
-    pass
+    __slots__ = ()
 
 
 class AstInternal(Map):
+    ''' the filtered entries of a tatsu `AST`, which itself is not retained
+    '''
+    __slots__ = ('info',)
 
-    def __init__(self, ast: AST, info: ParseInfo) -> None:
+    def __init__(self, ast: dict, info: ParseInfo) -> None:
         super().__init__(ast)
-        self.ast = ast
         self.info = info
 
 
 class AstMap(MapNode[str], AstInode[Map[str, AstElem]]):
+    __slots__ = ('data', '_text', '_with_ws', '_ref', '_sub_l', '_boundary_nodes', '_rose_tree')
 
     def __init__(self, ast: AstInternal) -> None:
         super().__init__(ast)
         self._text = None
         self._with_ws = None
+        self._ref = None
+        self._sub_l = None
+        self._boundary_nodes = None
+        self._rose_tree = None
 
     @staticmethod
     def from_ast(ast: AST) -> 'AstMap':
@@ -292,9 +268,11 @@ class AstMap(MapNode[str], AstInode[Map[str, AstElem]]):
             return a is not None and not a.empty and not a.is_newline
         return AstMap(AstInternal(valfilter(filt, dissoc(ast, 'parseinfo')), ast.parseinfo))
 
-    @lazy
+    @property
     def sub_l(self) -> LazyList[Node[AstElem, Any]]:
-        return LazyList(self.sub.v.sort_by(_.pos))
+        if self._sub_l is None:
+            self._sub_l = LazyList(self.sub.v.sort_by(_.pos))
+        return self._sub_l
 
     @property
     def ast(self) -> AstInternal:
@@ -318,11 +296,11 @@ class AstMap(MapNode[str], AstInode[Map[str, AstElem]]):
 
     @property
     def start_line(self) -> Line:
-        return Line.from_line_info(self.info.buffer.line_info(self.pos))
+        return line_table(self.info.buffer).line(self.pos)
 
     @property
     def end_line(self) -> Line:
-        return Line.from_line_info(self.info.buffer.line_info(self.endpos))
+        return line_table(self.info.buffer).line(self.endpos)
 
     def get(self, key: str, default: AstElem=None) -> Union[None, AstElem]:
         return dict.get(self, key, default)
@@ -388,7 +366,9 @@ class AstMap(MapNode[str], AstInode[Map[str, AstElem]]):
     def boundary_nodes(self) -> AstElem:
         def filt(node: Node) -> bool:
             return node.is_bol or node.is_eol
-        return self.filter_not(_.is_newline).filter(filt)
+        if self._boundary_nodes is None:
+            self._boundary_nodes = self.filter_not(_.is_newline).filter(filt)
+        return self._boundary_nodes
 
     @property
     def eols(self) -> List[int]:
@@ -411,13 +391,15 @@ class AstMap(MapNode[str], AstInode[Map[str, AstElem]]):
 
 
 class AstToken(LeafNode[str], AstElem[None]):
+    __slots__ = ('data', '_rule', '_pos', '_line', 'ws_count', '_rose_tree')
 
     def __init__(self, raw: str, pos: int, line: Line, rule: str, ws_count: int) -> None:
         super().__init__(raw)
-        self._rule = rule
+        self._rule = intern(rule)
         self._pos = pos
         self._line = line
         self.ws_count = ws_count  # whitespace between previous and this token
+        self._rose_tree = None
 
     @property
     def raw(self) -> str:
@@ -498,14 +480,30 @@ class AstToken(LeafNode[str], AstElem[None]):
 A = TypeVar('A')
 
 
+_node_ids = itertools.count()
+
+
 class RoseData(Record):
+    ''' the data of a rose tree node. `ident` is unique per constructed node and used for equality and hashing, which
+    would otherwise compare the AST and parent structurally.
+    '''
     key = str_field()
     ast = field(AstElem)
     parent = field(RoseTree)
+    ident = field(int, initial=lambda: next(_node_ids))
 
     def cons(key: str, ast: AstElem, parent: RoseTree) -> 'RoseData':
         return RoseData(key=key, ast=ast, parent=parent)
 
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, RoseData) and self.ident == other.ident
+
+    def __ne__(self, other: Any) -> bool:
+        return not self.__eq__(other)
+
+    def __hash__(self) -> int:
+        return hash(self.ident)
+
     def __str__(self) -> str:
         bol = ' bol' if self.bol else ''
         eol = ' eol' if self.eol else ''
@@ -565,6 +563,10 @@ class RoseAstTree(RoseTree[RoseData]):
     def ast(self) -> AstElem:
         return self.data.ast
 
+    @property
+    def ident(self) -> int:
+        return self.data.ident
+
     @property
     def rule(self) -> str:
         return self.data.rule
@@ -617,31 +619,47 @@ class RoseAstElem(BiRoseTree[RoseData], RoseAstTree):
     pass
 
 
-class AstRoseTreeConverter:
-
-    @staticmethod
-    def convert() -> Callable:
-        return dispatch(AstRoseTreeConverter(), List(AstMap, AstList, AstToken), 'convert_')
+def keyed_sub(elem: AstElem, key: str) -> TList[Tuple[str, AstElem]]:
+    ''' the children of `elem` in text order, paired with their keys.
+    the elements of an `AstList` inherit the key under which the list is stored in its parent.
+    '''
+    return (
+        sorted(dict.items(elem.data), key=lambda a: a[1].pos)
+        if isinstance(elem, AstMap) else
+        [(key, a) for a in elem.data]
+        if isinstance(elem, AstList) else
+        []
+    )
 
-    def rec(self, ast: AstElem) -> Callable:
-        return AstRoseTreeConverter.convert()(ast)
 
-    def convert_ast_token(self, ast: AstToken) -> Callable:
-        return lambda parent: LazyLists.empty()
+def _strict_sub(sub: TList[RoseAstTree]) -> Callable[[RoseTree], LazyList[RoseAstTree]]:
+    return lambda parent: LazyList((), List.wrap(sub))
 
-    def convert_ast_list(self, ast: AstList) -> Callable:
-        return lambda parent: ast.sub.map(
-            lambda a: RoseAstElem(RoseData.cons(parent.data.key, a, parent), parent, self.rec(a)))
 
-    def convert_ast_map(self, ast: AstMap) -> Callable:
-        def cons(key: str, node: AstElem, parent: RoseTree) -> RoseTree:
-            return RoseAstElem(RoseData.cons(key, node, parent), parent, self.rec(node))
-        return lambda parent: LazyList(ast.sub.to_list.sort_by(lambda a: a[1].pos)).map2(L(cons)(_, _, parent))
+def _build_rose_tree(ast: AstElem[Any]) -> RoseAstRoot:
+    root_sub = []  # type: TList[RoseAstTree]
+    root = RoseAstRoot(RoseData.cons('root', ast, RoseTreeRoot(ast, LazyLists.empty())), _strict_sub(root_sub))
+    stack = [(root, ast, 'root', root_sub)]
+    while stack:
+        parent, elem, key, sub = stack.pop()
+        for child_key, child in keyed_sub(elem, key):
+            child_sub = []  # type: TList[RoseAstTree]
+            node = RoseAstElem(RoseData.cons(child_key, child, parent), parent, _strict_sub(child_sub))
+            sub.append(node)
+            stack.append((node, child, child_key, child_sub))
+    return root
 
 
 def ast_rose_tree(ast: AstElem[Any]) -> RoseTree[AstElem[Any]]:
-    convert = AstRoseTreeConverter.convert()
-    return RoseAstRoot(RoseData.cons('root', ast, RoseTreeRoot(ast, LazyLists.empty())), convert(ast))
+    ''' build the rose tree of `ast` in a single iterative pass and store it in `ast`, so that all formatters working
+    on the same parse result share one tree.
+    the subtrees are filled in before the tree is returned, so the lazy `sub` of each node only wraps the finished
+    list.
+    '''
+    tree = ast._rose_tree
+    if tree is None:
+        tree = ast._rose_tree = _build_rose_tree(ast)
+    return tree
 
 __all__ = ('indent', 'Line', 'AstElem', 'AstInode', 'AstList', 'AstMap', 'AstToken', 'RoseData', 'RoseAstTree',
-           'RoseAstElem', 'ast_rose_tree')
+           'RoseAstElem', 'ast_rose_tree', 'keyed_sub')
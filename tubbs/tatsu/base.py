@@ -1,27 +1,51 @@
-import hashlib
 import abc
-from typing import Any
+import threading
+import importlib.util
+from typing import Any, Hashable, Tuple, Optional, Callable
 
 from tatsu.tool import gencode
 
-from amino import Either, Try, Map, L, Path, _, Right
+from amino import Either, Try, Map, Path, _, Right, Maybe
 from amino.util.string import camelcaseify
+from amino.lazy import lazy
+from amino.task import TaskException
 
 from ribosome.record import Record, map_field
 
 from tubbs.tatsu.parser_ext import ParserExt, DataSemantics
 from tubbs.logging import Logging
 from tubbs.tatsu.ast import AstElem
+from tubbs.tatsu.flat import FlatAst
+from tubbs.tatsu.pool import ParserPool, PoolStats
+from tubbs.tatsu.cache import ParseCache, CacheStats
+from tubbs.tatsu.incremental import IncrementalParser, IncrementalStats
+from tubbs.tatsu.budget import ParseBudget, ParseAborted, ParseCancelled, unlimited
+from tubbs.tatsu.profile import ParseProfile
+from tubbs.tatsu.gen import cache_dir, version_tag, GrammarStamp, write_atomic, load_module
+
+
+def abort_error(err: Exception) -> Exception:
+    ''' `Try` wraps exceptions in a `TaskException`; an aborted parse is unwrapped so that callers can distinguish it
+    from a failed parse.
+    '''
+    cause = err.cause if isinstance(err, TaskException) else err
+    return cause if isinstance(cause, ParseAborted) else err
 
 
 class ParserBase(Logging, abc.ABC):
+    pool_size = 4
+    cache_entries = 0
+    cache_bytes = 0
+    incremental_entries = 0
+    budget = unlimited
+    profile = None  # type: Optional[ParseProfile]
 
     @abc.abstractproperty
     def name(self) -> str:
         ...
 
     @abc.abstractproperty
-    def module_path(self) -> str:
+    def module_name(self) -> str:
         ...
 
     @abc.abstractproperty
@@ -36,10 +60,23 @@ class ParserBase(Logging, abc.ABC):
     def left_recursion(self) -> bool:
         ...
 
+    @property
+    def statement_slots(self) -> Map[Tuple[str, str], str]:
+        ''' the statement rules for incremental parsing, keyed by the rule of the parent node and the key of the
+        statement in it. statements are the units that are reparsed when only their text changed.
+        '''
+        return Map()
+
     @abc.abstractmethod
     def cons_parser(self, tpe: type) -> Either[str, ParserExt]:
         ...
 
+    def cons_type(self, tpe: type) -> type:
+        ''' hook for deriving the class that is instantiated from the generated parser class.
+        called only once per `ParserBase`.
+        '''
+        return tpe
+
     @property
     def camel_name(self) -> str:
         return camelcaseify(self.name)
@@ -52,14 +89,6 @@ class ParserBase(Logging, abc.ABC):
     def base_dir(self) -> Path:
         return Path(__file__).parent.parent
 
-    @property
-    def chksums_path(self) -> Path:
-        return self.base_dir / 'hashes'
-
-    @property
-    def chksum_path(self) -> Path:
-        return self.chksums_path / self.name
-
     @property
     def parser_args(self) -> Map[str, Any]:
         return Map(
@@ -67,52 +96,176 @@ class ParserBase(Logging, abc.ABC):
             # trace=True,
         )
 
-    @property
-    def grammar_chksum(self) -> bytes:
-        return hashlib.sha384(self.grammar_file.read_bytes()).digest()
-
-    @property
-    def checksum_invalid(self) -> bool:
-        return (not self.chksum_path.is_file() or
-                self.chksum_path.read_bytes() != self.grammar_chksum)
-
     def gen(self) -> None:
-        self.parser_path.parent.mkdir(parents=True, exist_ok=True)
-        self.chksums_path.mkdir(parents=True, exist_ok=True)
-        if not self.parser_path.is_file() or self.checksum_invalid:
-            if self.parser_path.is_file():
-                self.parser_path.unlink()
+        ''' generate the parser module if no module for the current grammar digest exists.
+        '''
+        path = self.parser_path
+        if not path.is_file():
+            self.log.debug(f'generating parser `{self.name}` in {path}')
             grammar = self.grammar_file.read_text()
             model = gencode(self.camel_name, grammar)
-            self.parser_path.write_text(model)
-            self.chksum_path.write_bytes(self.grammar_chksum)
+            write_atomic(path, model)
+            self._prune(path)
+            self.reset_parser()
+
+    def _prune(self, current: Path) -> None:
+        ''' remove modules generated from previous versions of the grammar, along with their bytecode in `__pycache__`
+        '''
+        for old in current.parent.glob(f'{self.name}_*.py'):
+            if old != current and old.stem.rsplit('_', 1)[0] == self.name:
+                for path in (old, Path(importlib.util.cache_from_source(str(old)))):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+
+    def reset_parser(self) -> None:
+        ''' drop the cached parser class and all pooled instances, e.g. after the parser module was regenerated.
+        '''
+        with self._type_lock:
+            self._parser_type = None
+        self.pool.clear()
+        self.cache.clear()
+        self.incremental.clear()
+
+    @lazy
+    def _type_lock(self) -> threading.Lock:
+        return threading.Lock()
+
+    @property
+    def parser_type(self) -> Either[str, type]:
+        ''' import the generated parser class and derive the instantiated class only once.
+        failures are not cached, so that a later `gen()` can fix them.
+        '''
+        with self._type_lock:
+            cached = getattr(self, '_parser_type', None)
+            if cached is None:
+                result = (
+                    load_module(self.parser_path, self.module_name) //
+                    (lambda m: Maybe.getattr(m, self.parser_class).to_either(f'no {self.parser_class} in {m}')) /
+                    self.cons_type
+                )
+                if result.is_right:
+                    self._parser_type = result
+                return result
+            return cached
 
     @property
     def parser(self) -> Either[str, ParserExt]:
-        return Either.import_path(self.module_path) // self.cons_parser
+        return self.parser_type // self.cons_parser
+
+    @lazy
+    def pool(self) -> ParserPool:
+        return ParserPool(lambda: self.parser, self.pool_size)
+
+    @property
+    def pool_stats(self) -> PoolStats:
+        return self.pool.stats
+
+    @lazy
+    def cache(self) -> ParseCache:
+        return ParseCache(self.cache_entries, self.cache_bytes)
+
+    @property
+    def cache_stats(self) -> CacheStats:
+        return self.cache.stats
+
+    def configure_cache(self, max_entries: int, max_bytes: int=0) -> 'ParserBase':
+        ''' enable the parse result cache by setting `max_entries` to a positive number.
+        `max_bytes` bounds the estimated memory of the cached ASTs, 0 meaning unbounded.
+        '''
+        if (max_entries, max_bytes) != (self.cache.max_entries, self.cache.max_bytes):
+            self.cache.configure(max_entries, max_bytes)
+            self.log.debug(f'configured parse cache: {self.cache}')
+        return self
+
+    @lazy
+    def incremental(self) -> IncrementalParser:
+        return IncrementalParser(self.parse, self.statement_slots, self.incremental_entries)
+
+    @property
+    def incremental_stats(self) -> IncrementalStats:
+        return self.incremental.stats
+
+    def configure_incremental(self, max_entries: int) -> 'ParserBase':
+        ''' enable incremental reparsing of the texts parsed with a `key` by setting `max_entries`, the number of
+        keys whose last result is kept, to a positive number.
+        '''
+        if max_entries != self.incremental.max_entries:
+            self.incremental.configure(max_entries)
+            self.log.debug(f'configured incremental parsing for {max_entries} keys')
+        return self
+
+    def configure_budget(self, millis: int, calls: int=0) -> 'ParserBase':
+        ''' abort parses that take longer than `millis` milliseconds or invoke more than `calls` rules, 0 meaning
+        unbounded.
+        '''
+        budget = ParseBudget(millis, calls)
+        if budget != self.budget:
+            self.budget = budget
+            self.log.debug(f'configured {budget}')
+        return self
+
+    def configure_profile(self, enabled: bool) -> 'ParserBase':
+        ''' record the rule invocations of all following parses in `profile`. disabling it drops the statistics.
+        '''
+        if enabled and self.profile is None:
+            self.profile = ParseProfile()
+            self.log.debug(f'enabled rule profiling for {self.name}')
+        elif not enabled and self.profile is not None:
+            self.profile = None
+        return self
 
     @abc.abstractproperty
     def semantics(self) -> Any:
         ...
 
-    def parse(self, text: str, rule: str) -> Either[str, AstElem]:
+    def parse(self, text: str, rule: str, key: Hashable=None, cancelled: Callable[[], bool]=None
+              ) -> Either[str, AstElem]:
+        ''' if `key` is given, e.g. a buffer number, the text is parsed incrementally based on the last result for
+        the same key and rule.
+        `cancelled` is checked periodically during the parse, which is aborted with `ParseCancelled` once it returns
+        `True`.
+        '''
         def log_error(err: str) -> None:
-            self.log.debug(f'failed to parse `{rule}`:\n{repr(err)}')
-        return (
-            self.parser //
-            L(Try)(_.parse, text, rule, semantics=self.semantics)
-        ).leffect(log_error)
+            if isinstance(err, ParseCancelled):
+                self.log.debug(f'cancelled parsing `{rule}` with {self.name}: {err}')
+            elif isinstance(err, ParseAborted):
+                self.log.warning(f'aborted parsing `{rule}` with {self.name}: {err}')
+            else:
+                self.log.debug(f'failed to parse `{rule}`:\n{repr(err)}')
+        def parse_with(parser: ParserExt) -> Either[str, AstElem]:
+            profile = self.profile
+            parser.budget = self.budget
+            parser.cancelled = cancelled
+            parser.profile = None if profile is None else ParseProfile()
+            result = Try(parser.parse, text, rule, semantics=self.semantics).lmap(abort_error)
+            if profile is not None:
+                profile.merge(parser.profile)
+            return result
+        def run() -> Either[str, AstElem]:
+            return self.pool.use(parse_with)
+        def incremental() -> Either[str, AstElem]:
+            return self.incremental.parse(key, text, rule, run, cancelled)
+        parse = incremental if key is not None and self.incremental.enabled else run
+        return self.cache.get_or_parse(text, rule, parse).leffect(log_error)
+
+    def parse_flat(self, text: str, rule: str) -> Either[str, FlatAst]:
+        return self.parse(text, rule) / FlatAst
 
 
 class BuiltinParser(ParserBase):
+    ''' generated parser modules are stored outside of the package in a per-user cache directory, in a subdirectory
+    for the tatsu and python versions and named by the digest of the grammar.
+    '''
 
     @property
     def module_base(self) -> str:
         return 'tubbs.parsers'
 
     @property
-    def module_path(self) -> str:
-        return '{}.{}.{}'.format(self.module_base, self.name, self.parser_class)
+    def module_name(self) -> str:
+        return '{}.{}'.format(self.module_base, self.name)
 
     @property
     def grammar_path(self) -> Path:
@@ -124,18 +277,24 @@ class BuiltinParser(ParserBase):
 
     @property
     def parsers_path(self) -> Path:
-        return self.base_dir / 'parsers'
+        return cache_dir() / 'parsers' / version_tag()
+
+    @property
+    def stamp(self) -> GrammarStamp:
+        return GrammarStamp(self.grammar_file, self.parsers_path / f'{self.name}.stamp')
 
     @property
     def parser_path(self) -> Path:
-        return self.parsers_path / '{}.py'.format(self.name)
+        return self.parsers_path / '{}_{}.py'.format(self.name, self.stamp.digest[:24])
 
 
 class LangParser(BuiltinParser):
 
+    def cons_type(self, tpe: type) -> type:
+        return type(self.parser_class, (ParserExt, tpe), {})
+
     def cons_parser(self, tpe: type) -> Either[str, ParserExt]:
-        cls = type(self.parser_class, (ParserExt, tpe), {})
-        return Try(lambda *a, **kw: cls(*a, **kw), **self.parser_args)
+        return Try(lambda *a, **kw: tpe(*a, **kw), **self.parser_args)
 
     @property
     def semantics(self) -> Any:
@@ -162,6 +321,11 @@ class Parsers(Record):
             update
         )
 
+    def merge(self, other: 'Parsers') -> 'Parsers':
+        ''' add the parsers from `other` whose names are not present yet
+        '''
+        return self.modder.parsers(other.parsers.merge)
+
     def parser(self, name: str) -> Either[str, ParserBase]:
         return (
             self.parsers
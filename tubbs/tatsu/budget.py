@@ -0,0 +1,78 @@
+from tubbs.tatsu.lines import Line
+
+
+class ParseBudget:
+    ''' bounds a single parse by wall-clock time in milliseconds and by the number of rule invocations, 0 meaning
+    unbounded. the clock is only read every `clock_interval` invocations, so a parse may overrun `millis` by the time
+    these take.
+    '''
+    clock_interval = 256
+
+    def __init__(self, millis: int=0, calls: int=0) -> None:
+        self.millis = millis
+        self.calls = calls
+
+    @property
+    def enabled(self) -> bool:
+        return self.millis > 0 or self.calls > 0
+
+    def deadline(self, start: float) -> float:
+        return start + self.millis / 1000 if self.millis > 0 else float('inf')
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ParseBudget) and (self.millis, self.calls) == (other.millis, other.calls)
+
+    def __str__(self) -> str:
+        return f'ParseBudget(millis={self.millis}, calls={self.calls})'
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+unlimited = ParseBudget()
+
+
+class ParseAborted(Exception):
+    ''' raised from a rule invocation to abort the parse.
+    it isn't a `FailedParse`, so tatsu neither memoizes it nor tries alternatives.
+    '''
+
+
+class BudgetExhausted(ParseAborted):
+    ''' raised from the rule invocation that exceeded the budget
+    '''
+
+    def __init__(self, budget: ParseBudget, rule: str, pos: int, line: Line, calls: int, elapsed: float) -> None:
+        self.budget = budget
+        self.rule = rule
+        self.pos = pos
+        self.line = line
+        self.calls = calls
+        self.elapsed = elapsed
+        super().__init__(str(self))
+
+    def __str__(self) -> str:
+        col = self.pos - self.line.start
+        return (f'parse budget exhausted after {self.calls} rule calls and {self.elapsed * 1000:.0f}ms in ' +
+                f'`{self.rule}` at line {self.line.lnum + 1}, column {col + 1} (offset {self.pos}): {self.budget}')
+
+
+
+class ParseCancelled(ParseAborted):
+    ''' raised from a rule invocation after the parser's `cancelled` check returned `True`, e.g. because the request
+    that started the parse was superseded
+    '''
+
+    def __init__(self, rule: str, pos: int, line: Line, calls: int) -> None:
+        self.rule = rule
+        self.pos = pos
+        self.line = line
+        self.calls = calls
+        super().__init__(str(self))
+
+    def __str__(self) -> str:
+        col = self.pos - self.line.start
+        return (f'parse cancelled after {self.calls} rule calls in `{self.rule}` at line {self.line.lnum + 1}, ' +
+                f'column {col + 1} (offset {self.pos})')
+
+__all__ = ('ParseBudget', 'ParseAborted', 'BudgetExhausted', 'ParseCancelled', 'unlimited')
@@ -0,0 +1,48 @@
+import sys
+import argparse
+import py_compile
+from typing import List as TList
+
+from amino import List, Either, Right, Left
+
+from tubbs.logging import Logging
+from tubbs.tatsu.base import Parsers, ParserBase
+
+shipped_grammars = List('scala', 'breaker_dsl', 'indenter_dsl')
+
+
+class BuildParsers(Logging):
+    ''' generate the parser modules of the shipped grammars in the cache directory and compile them to bytecode, so
+    that the first request in the editor does not have to run the tatsu code generator.
+    '''
+
+    def __init__(self, names: List[str]) -> None:
+        self.names = names
+
+    def build(self, name: str) -> Either[str, ParserBase]:
+        def compile(parser: ParserBase) -> Either[str, ParserBase]:
+            try:
+                py_compile.compile(str(parser.parser_path), doraise=True)
+            except py_compile.PyCompileError as e:
+                return Left(f'failed to compile `{name}`: {e}')
+            return Right(parser)
+        return Parsers().load(name) // (lambda a: a.parser(name)) // compile
+
+    def run(self) -> List[Either[str, ParserBase]]:
+        return self.names / self.build
+
+
+def main(argv: TList[str]=None) -> int:
+    ap = argparse.ArgumentParser(prog='tubbs-build-parsers', description=BuildParsers.__doc__)
+    ap.add_argument('names', nargs='*', help='grammar names, all shipped grammars if omitted')
+    args = ap.parse_args(argv)
+    names = List.wrap(args.names) if args.names else shipped_grammars
+    results = BuildParsers(names).run()
+    for result in results:
+        result.cata(
+            lambda err: print(err, file=sys.stderr),
+            lambda parser: print(f'{parser.name}: {parser.parser_path}'),
+        )
+    return 1 if results.exists(lambda a: a.is_left) else 0
+
+__all__ = ('BuildParsers', 'main')
@@ -0,0 +1,123 @@
+import sys
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Tuple, Callable
+
+from amino import Either, Maybe, Just, Nothing, Right
+
+from tubbs.logging import Logging
+from tubbs.tatsu.ast import AstElem
+
+Key = Tuple[bytes, str]
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class CacheStats:
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        return f'CacheStats(hits={self.hits}, misses={self.misses}, evictions={self.evictions}, ratio={self.ratio:.2})'
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class ParseCache(Logging):
+    ''' size-bounded LRU cache of successful parse results, keyed by the digest of the text and the rule name.
+    entries are evicted when either `max_entries` or `max_bytes` would be exceeded. the memory footprint of an AST is
+    not measured but estimated from the length of the parsed text, using `bytes_per_char`.
+    a cache with `max_entries == 0` is disabled and never stores anything.
+    '''
+    bytes_per_char = 160
+
+    def __init__(self, max_entries: int=0, max_bytes: int=0) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self.size = 0
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def estimate(self, text: str) -> int:
+        return sys.getsizeof(text) + len(text) * self.bytes_per_char
+
+    def key(self, text: str, rule: str) -> Key:
+        return text_digest(text), rule
+
+    def lookup(self, key: Key) -> Maybe[AstElem]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return Nothing
+            self.stats.hits += 1
+            self._entries.move_to_end(key)
+            return Just(entry[0])
+
+    def store(self, key: Key, ast: AstElem, size: int) -> None:
+        if self.max_bytes > 0 and size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self._entries[key] = (ast, size)
+            self.size += size
+            self._evict()
+
+    def _evict(self) -> None:
+        def exceeded() -> bool:
+            return (
+                len(self._entries) > self.max_entries or
+                (self.max_bytes > 0 and self.size > self.max_bytes)
+            )
+        while self._entries and exceeded():
+            key, (ast, size) = self._entries.popitem(last=False)
+            self.size -= size
+            self.stats.evictions += 1
+
+    def get_or_parse(self, text: str, rule: str, parse: Callable[[], Either[str, AstElem]]) -> Either[str, AstElem]:
+        if not self.enabled:
+            return parse()
+        key = self.key(text, rule)
+        def miss() -> Either[str, AstElem]:
+            result = parse()
+            result.foreach(lambda ast: self.store(key, ast, self.estimate(text)))
+            return result
+        return self.lookup(key) / Right | miss
+
+    def configure(self, max_entries: int, max_bytes: int) -> None:
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __str__(self) -> str:
+        return f'ParseCache({len(self)}/{self.max_entries}, {self.size}/{self.max_bytes} bytes, {self.stats})'
+
+__all__ = ('ParseCache', 'CacheStats', 'text_digest')
@@ -0,0 +1,244 @@
+from array import array
+from bisect import bisect_right
+from typing import Iterator, Iterable, List as TList, Dict
+
+from amino import List, LazyList, Boolean, Either, Maybe, Just, Nothing
+from amino.boolean import true, false
+
+from tubbs.tatsu.ast import AstElem, RoseAstTree, RoseData, Line, keyed_sub
+
+
+class FlatAst:
+    ''' struct-of-arrays representation of an AST in preorder, with the same node layout as `ast_rose_tree`.
+    every node is identified by its preorder index and described by integer columns for its rule id, text range, line,
+    depth and the indexes of its parent, first child, next sibling and nearest ancestor with the same rule.
+    since the nodes of a subtree are contiguous, `subtree_end` allows checking ancestry in constant time.
+    `node(index)` returns a `FlatNode`, which implements the `RoseAstTree` api on top of the columns.
+    '''
+
+    def __init__(self, ast: AstElem) -> None:
+        self.rules = []  # type: TList[str]
+        self._rule_ids = dict()  # type: Dict[str, int]
+        self.elems = []  # type: TList[AstElem]
+        self.keys = []  # type: TList[str]
+        self.rule_ids = array('l')
+        self.starts = array('q')
+        self.ends = array('q')
+        self.lines = array('l')
+        self.depths = array('l')
+        self.parents = array('l')
+        self.first_child = array('l')
+        self.next_sibling = array('l')
+        self.rule_parent = array('l')
+        self.by_rule = dict()  # type: Dict[int, array]
+        self._build(ast)
+        self._nodes = [None] * self.size  # type: TList[FlatNode]
+
+    def _rule_id(self, rule: str) -> int:
+        rid = self._rule_ids.get(rule)
+        if rid is None:
+            rid = self._rule_ids[rule] = len(self.rules)
+            self.rules.append(rule)
+            self.by_rule[rid] = array('l')
+        return rid
+
+    def _build(self, ast: AstElem) -> None:
+        last_child = []  # type: TList[int]
+        open_by_rule = dict()  # type: Dict[int, TList[int]]
+        path = []  # type: TList[int]
+        stack = [(ast, 'root', -1, 0)]
+        while stack:
+            elem, key, parent, depth = stack.pop()
+            index = len(self.elems)
+            del path[depth:]
+            rid = self._rule_id(elem.rule)
+            chain = open_by_rule.setdefault(rid, [])
+            while chain and not (self.depths[chain[-1]] < depth and path[self.depths[chain[-1]]] == chain[-1]):
+                chain.pop()
+            self.elems.append(elem)
+            self.keys.append(key)
+            self.rule_ids.append(rid)
+            self.starts.append(elem.pos)
+            self.ends.append(elem.endpos)
+            self.lines.append(elem.line.lnum)
+            self.depths.append(depth)
+            self.parents.append(parent)
+            self.first_child.append(-1)
+            self.next_sibling.append(-1)
+            self.rule_parent.append(chain[-1] if chain else -1)
+            self.by_rule[rid].append(index)
+            last_child.append(-1)
+            chain.append(index)
+            path.append(index)
+            if parent >= 0:
+                prev = last_child[parent]
+                if prev < 0:
+                    self.first_child[parent] = index
+                else:
+                    self.next_sibling[prev] = index
+                last_child[parent] = index
+            stack.extend((a, k, index, depth + 1) for k, a in reversed(keyed_sub(elem, key)))
+        self.subtree_end = array('l', range(1, len(self.elems) + 1))
+        for index in range(len(self.elems) - 1, -1, -1):
+            last = last_child[index]
+            if last >= 0:
+                self.subtree_end[index] = self.subtree_end[last]
+
+    @property
+    def size(self) -> int:
+        return len(self.elems)
+
+    def rule(self, index: int) -> str:
+        return self.rules[self.rule_ids[index]]
+
+    def with_rule(self, rule: str) -> array:
+        ''' the indexes of the nodes with `rule` in preorder
+        '''
+        rid = self._rule_ids.get(rule)
+        return array('l') if rid is None else self.by_rule[rid]
+
+    def is_ancestor(self, ancestor: int, index: int) -> bool:
+        return ancestor < index < self.subtree_end[ancestor]
+
+    def is_child(self, parent: int, index: int) -> bool:
+        return index > 0 and self.parents[index] == parent
+
+    def children(self, index: int) -> Iterator[int]:
+        cur = self.first_child[index]
+        while cur >= 0:
+            yield cur
+            cur = self.next_sibling[cur]
+
+    def ancestors(self, index: int) -> Iterator[int]:
+        cur = self.parents[index]
+        while cur >= 0:
+            yield cur
+            cur = self.parents[cur]
+
+    def descendants(self, index: int) -> range:
+        return range(index + 1, self.subtree_end[index])
+
+    def ancestor_with_rule(self, index: int, rules: Iterable[str]) -> int:
+        ''' the nearest proper ancestor of `index` with one of `rules`, or -1.
+        for each rule, the last node with that rule preceding `index` in preorder is found by bisection. if it is not an
+        ancestor, the nearest ancestor with the rule is on its chain of same-rule ancestors.
+        '''
+        best = -1
+        for rule in rules:
+            rid = self._rule_ids.get(rule)
+            if rid is None:
+                continue
+            indexes = self.by_rule[rid]
+            pos = bisect_right(indexes, index - 1) - 1
+            cur = indexes[pos] if pos >= 0 else -1
+            while cur > best and not self.is_ancestor(cur, index):
+                cur = self.rule_parent[cur]
+            best = max(best, cur)
+        return best
+
+    def node(self, index: int) -> 'FlatNode':
+        node = self._nodes[index]
+        if node is None:
+            node = self._nodes[index] = FlatNode(self, index)
+        return node
+
+    @property
+    def root(self) -> 'FlatNode':
+        return self.node(0)
+
+    def __str__(self) -> str:
+        return f'FlatAst({self.rule(0) if self.size else ""}, {self.size} nodes)'
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class FlatNode(RoseAstTree):
+    ''' a node of a `FlatAst`. nodes are created once per index, so they can be compared by identity like the nodes
+    of the tree built by `ast_rose_tree`.
+    '''
+
+    def __init__(self, flat: FlatAst, index: int) -> None:
+        self.flat = flat
+        self.index = index
+        self._data = None
+        self._sub = None
+
+    @property
+    def data(self) -> RoseData:
+        if self._data is None:
+            self._data = RoseData.cons(self.flat.keys[self.index], self.flat.elems[self.index], self.parent)
+        return self._data
+
+    @property
+    def ast(self) -> AstElem:
+        return self.flat.elems[self.index]
+
+    @property
+    def rule(self) -> str:
+        return self.flat.rule(self.index)
+
+    @property
+    def pos(self) -> int:
+        return self.flat.starts[self.index]
+
+    @property
+    def endpos(self) -> int:
+        return self.flat.ends[self.index]
+
+    @property
+    def lnum(self) -> int:
+        return self.flat.lines[self.index]
+
+    @property
+    def line(self) -> Line:
+        return self.ast.line
+
+    @property
+    def is_root(self) -> Boolean:
+        return true if self.index == 0 else false
+
+    @property
+    def parent(self) -> 'FlatNode':
+        parent = self.flat.parents[self.index]
+        return self if parent < 0 else self.flat.node(parent)
+
+    @property
+    def sub(self) -> LazyList['FlatNode']:
+        if self._sub is None:
+            self._sub = LazyList(List.wrap(self.flat.children(self.index)).map(self.flat.node))
+        return self._sub
+
+    @property
+    def ancestors(self) -> List['FlatNode']:
+        return List.wrap(self.flat.ancestors(self.index)).map(self.flat.node)
+
+    @property
+    def descendants(self) -> List['FlatNode']:
+        return List.wrap(self.flat.descendants(self.index)).map(self.flat.node)
+
+    def is_ancestor_of(self, node: 'FlatNode') -> bool:
+        return self.flat.is_ancestor(self.index, node.index)
+
+    def contains(self, node: 'FlatNode') -> Boolean:
+        ''' like `Node.contains`, true for direct children
+        '''
+        return Boolean(self.flat.is_child(self.index, node.index))
+
+    @property
+    def next_sibling(self) -> Maybe['FlatNode']:
+        index = self.flat.next_sibling[self.index]
+        return Nothing if index < 0 else Just(self.flat.node(index))
+
+    def parent_with_rule(self, rules: List[str], limit: int=5) -> Either[str, 'FlatNode']:
+        index = self.flat.ancestor_with_rule(self.index, rules)
+        valid = index > 0 and self.flat.depths[self.index] - self.flat.depths[index] <= limit
+        return (
+            Maybe.check(self.flat.node(index) if valid else None)
+            .to_either(lambda: f'no parent with rule in `{rules.join_comma}` for {self}')
+        )
+
+    def __repr__(self) -> str:
+        return f'FlatNode({self.index}, {self.rule}, {self.pos}, {self.endpos})'
+
+__all__ = ('FlatAst', 'FlatNode')
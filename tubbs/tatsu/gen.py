@@ -0,0 +1,97 @@
+import os
+import sys
+import hashlib
+import tempfile
+import importlib.util
+from types import ModuleType
+
+import tatsu
+
+from amino import Either, Try, Path, Maybe, Just, Nothing
+
+cache_env_var = 'TUBBS_CACHE_DIR'
+
+
+def cache_dir() -> Path:
+    ''' base directory for generated parsers, `$TUBBS_CACHE_DIR` or `$XDG_CACHE_HOME/tubbs`
+    '''
+    custom = os.environ.get(cache_env_var)
+    xdg = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(custom) if custom else Path(xdg) / 'tubbs'
+
+
+def version_tag() -> str:
+    ''' generated code depends on the tatsu runtime and the bytecode on the interpreter version
+    '''
+    major, minor = sys.version_info[:2]
+    return f'tatsu-{tatsu.__version__}-py{major}.{minor}'
+
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha384(path.read_bytes()).hexdigest()
+
+
+class GrammarStamp:
+    ''' caches the digest of a grammar file along with its mtime and size, so that hashing the grammar is only
+    necessary if the file was modified.
+    '''
+
+    def __init__(self, grammar: Path, stamp: Path) -> None:
+        self.grammar = grammar
+        self.stamp = stamp
+
+    @property
+    def stat_key(self) -> str:
+        st = self.grammar.stat()
+        return f'{st.st_mtime_ns} {st.st_size}'
+
+    @property
+    def stored(self) -> Maybe[str]:
+        try:
+            key, digest = self.stamp.read_text().rsplit(' ', 1)
+        except (OSError, ValueError):
+            return Nothing
+        return Just(digest) if key == self.stat_key else Nothing
+
+    def store(self, digest: str) -> None:
+        try:
+            write_atomic(self.stamp, f'{self.stat_key} {digest}')
+        except OSError:
+            pass
+
+    @property
+    def digest(self) -> str:
+        def compute() -> str:
+            digest = file_digest(self.grammar)
+            self.store(digest)
+            return digest
+        return self.stored | compute
+
+
+def write_atomic(path: Path, text: str) -> None:
+    ''' write to a temporary file in the target directory and rename it, so that concurrent readers never see partial
+    content.
+    '''
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.replace(tmp, str(path))
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load_module(path: Path, name: str) -> Either[str, ModuleType]:
+    ''' execute the module at `path` without registering it in `sys.modules`, so that a generated module in the cache
+    directory cannot shadow a module of the package with the same name.
+    '''
+    def load() -> ModuleType:
+        spec = importlib.util.spec_from_file_location(name, str(path))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    return Try(load)
+
+__all__ = ('cache_dir', 'version_tag', 'GrammarStamp', 'write_atomic', 'load_module')
@@ -0,0 +1,274 @@
+''' incremental reparsing of changed statements.
+the last parse result of each key, usually identifying a buffer and the start line of the parsed text, is kept along
+with its text. when the same rule is parsed again for a different text, the changed range is determined from the
+common prefix and suffix of both texts, compared line by line. if it lies strictly inside a statement, i.e. in a slot
+of a parent rule that `ParserBase.statement_slots` maps to a statement rule, only that statement is parsed again,
+starting at its first character in the new text. the result is spliced into a copy of the previous tree, with all
+positions and lines after the statement shifted to the new text.
+
+a full parse is performed whenever the splice would be ambiguous:
+* there is no previous result for the key and rule, or its root is not a rule node
+* the change touches the first or last character of every enclosing statement, or there is none
+* the reparsed statement doesn't end where the changed statement ends in the new text, which means that the
+  change affects the structure around it
+
+since the statement is parsed with the rest of the new text following it, lookaheads see the same text as in a full
+parse. copying the tree is linear in the number of nodes, but does not involve the parser.
+'''
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Tuple, Hashable, Dict, Optional, Any, Sequence, List as TList
+
+from amino import Either, Right, Left, Map, List, LazyList, L, _
+
+from tubbs.logging import Logging
+from tubbs.tatsu.ast import AstElem, AstMap, AstList, AstToken, AstInternal
+from tubbs.tatsu.lines import Line, LineTable, line_table
+from tubbs.tatsu.budget import ParseAborted
+
+Slots = Map[Tuple[str, str], str]
+Edit = Tuple[int, int, int]
+
+
+def _common(a: Sequence[Any], b: Sequence[Any]) -> int:
+    return len(os.path.commonprefix([a, b]))
+
+
+def _line(lines: TList[str], index: int) -> str:
+    return lines[index] if -len(lines) <= index < len(lines) else ''
+
+
+def text_edit(old: str, new: str) -> Edit:
+    ''' the start of the changed range and its end in `old` and in `new`.
+    whole lines are compared first, characters only inside the first and last differing lines. since line breaks only
+    occur at the ends of lines, the result is the same as that of comparing the texts character by character.
+    '''
+    old_lines, new_lines = old.splitlines(True), new.splitlines(True)
+    head = _common(old_lines, new_lines)
+    prefix = sum(map(len, old_lines[:head]))
+    start = prefix + _common(_line(old_lines, head), _line(new_lines, head))
+    tail = _common(old_lines[::-1], new_lines[::-1])
+    suffix = (
+        sum(map(len, old_lines[len(old_lines) - tail:])) +
+        _common(_line(old_lines, -1 - tail)[::-1], _line(new_lines, -1 - tail)[::-1])
+    )
+    common = min(suffix, min(len(old), len(new)) - start)
+    return start, len(old) - common, len(new) - common
+
+
+class SpliceBuffer:
+    ''' the text of a spliced parse result, providing the attributes of a tatsu buffer that the AST uses
+    '''
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self._lines = text.splitlines(True)
+        self.ignorecase = False
+
+
+def _sub(ast: AstElem) -> TList[Tuple[str, AstElem]]:
+    return (
+        list(dict.items(ast.data))
+        if isinstance(ast, AstMap) else
+        [('', a) for a in ast.data.drain]
+        if isinstance(ast, AstList) else
+        []
+    )
+
+
+def find_statement(ast: AstMap, start: int, end: int, slots: Slots) -> Optional[Tuple[AstElem, str]]:
+    ''' the innermost statement and its rule that contains the range from `start` to `end` without touching its first
+    or last character
+    '''
+    found = None
+    node = ast
+    while True:
+        parent_rule = node.rule
+        child = None
+        for key, sub in _sub(node):
+            if sub.pos <= start and end <= sub.endpos:
+                child = sub
+                rule = dict.get(slots, (parent_rule, key))
+                if rule is not None and sub.pos < start and end < sub.endpos:
+                    found = sub, rule
+                break
+        if child is None:
+            return found
+        node = child
+
+
+class Relocation:
+    ''' copies an AST into a `SpliceBuffer`, translating positions with `pos` and line numbers with `lnum`.
+    `replace` maps the ids of nodes to the copies that are used in their place.
+    '''
+
+    def __init__(self, buffer: SpliceBuffer, source: LineTable, pos: Callable[[int], int], lnum: Callable[[int], int],
+                 replace: Dict[int, AstElem]=None, first_ws: Optional[int]=None) -> None:
+        self.buffer = buffer
+        self.table = line_table(buffer)
+        self.source = source
+        self.pos = pos
+        self.lnum = lnum
+        self.replace = dict() if replace is None else replace
+        self.first_ws = first_ws
+
+    def line(self, line: Line) -> Line:
+        if line.start >= self.source.size:
+            end = self.table.size
+            return self.table.line(end + 1 if line.lnum >= self.source.count else end)
+        return self.table.at(self.lnum(line.lnum))
+
+    def token(self, token: AstToken) -> AstToken:
+        pos = self.pos(token.pos)
+        ws = self.first_ws if self.first_ws is not None and token.pos == 0 else token.ws_count
+        return AstToken(token.raw, pos, self.table.line(pos), token._rule, ws)
+
+    def inode(self, ast: AstElem, sub: TList[AstElem]) -> AstElem:
+        if isinstance(ast, AstMap):
+            info = ast.info
+            if info is not None:
+                pos, endpos = self.pos(info.pos), self.pos(info.endpos)
+                info = info._replace(buffer=self.buffer, pos=pos, endpos=endpos, line=self.table.line(pos).lnum,
+                                     endline=self.table.line(endpos).lnum)
+            keys = list(dict.keys(ast.data))
+            return AstMap(AstInternal(dict(zip(keys, sub)), info))
+        return type(ast)(LazyList(List.wrap(sub)), ast._rule, self.line(ast._line))
+
+    def __call__(self, ast: AstElem) -> AstElem:
+        done = []  # type: TList[AstElem]
+        stack = [(ast, False)]  # type: TList[Tuple[AstElem, bool]]
+        while stack:
+            node, visited = stack.pop()
+            replaced = self.replace.get(id(node))
+            if replaced is not None:
+                done.append(replaced)
+            elif isinstance(node, AstToken):
+                done.append(self.token(node))
+            elif visited:
+                count = len(_sub(node))
+                sub = done[len(done) - count:]
+                del done[len(done) - count:]
+                done.append(self.inode(node, sub))
+            else:
+                stack.append((node, True))
+                stack.extend((a, False) for key, a in reversed(_sub(node)))
+        return done[0]
+
+
+class IncrementalStats:
+
+    def __init__(self) -> None:
+        self.spliced = 0
+        self.full = 0
+
+    def __str__(self) -> str:
+        return f'IncrementalStats(spliced={self.spliced}, full={self.full})'
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class IncrementalParser(Logging):
+    ''' keeps the last parse result for up to `max_entries` keys, the least recently used being dropped first.
+    a parser with `max_entries == 0` or without statement slots is disabled.
+    '''
+
+    def __init__(self, parse: Callable[..., Either[str, AstElem]], slots: Slots, max_entries: int=0) -> None:
+        self._parse = parse
+        self.slots = slots
+        self.max_entries = max_entries
+        self.stats = IncrementalStats()
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and not self.slots.empty
+
+    def configure(self, max_entries: int) -> None:
+        with self._lock:
+            self.max_entries = max_entries
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key: Tuple[Hashable, str], text: str, ast: AstElem) -> None:
+        with self._lock:
+            self._entries[key] = text, ast
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def parse(self, key: Hashable, text: str, rule: str, full: Callable[[], Either[str, AstElem]],
+              cancelled: Callable[[], bool]=None) -> Either[str, AstElem]:
+        entry_key = key, rule
+        with self._lock:
+            entry = self._entries.get(entry_key)
+        if entry is not None and entry[0] == text:
+            return Right(entry[1])
+        spliced = Left('no previous parse') if entry is None else self.splice(entry[0], entry[1], text, cancelled)
+        if spliced.is_left and isinstance(spliced.value, ParseAborted):
+            return spliced
+        if spliced.is_right:
+            self.stats.spliced += 1
+            result = spliced
+        else:
+            self.log.debug(f'full parse of `{rule}`: {spliced.value}')
+            self.stats.full += 1
+            result = full()
+        result.foreach(lambda ast: self._store(entry_key, text, ast))
+        return result
+
+    def splice(self, old: str, ast: AstElem, text: str, cancelled: Callable[[], bool]=None) -> Either[str, AstElem]:
+        if not isinstance(ast, AstMap) or ast.info is None:
+            return Left('root is not a rule node')
+        start, old_end, new_end = text_edit(old, text)
+        found = find_statement(ast, start, old_end, self.slots)
+        if found is None:
+            return Left('change is not inside of a statement')
+        stat, rule = found
+        delta = len(text) - len(old)
+        expected = stat.endpos + delta - stat.pos
+        def check(new: AstElem) -> Either[str, AstElem]:
+            return (
+                Right(new)
+                if new.pos == 0 and new.endpos == expected else
+                Left(f'reparsed `{rule}` has range {new.pos}-{new.endpos} instead of 0-{expected}')
+            )
+        return (
+            self._parse(text[stat.pos:], rule, cancelled=cancelled).lmap(L(self._reparse_error)(rule, _)) //
+            check /
+            (lambda new: self.relocate(ast, stat, new, text, delta))
+        )
+
+    def _reparse_error(self, rule: str, err: Any) -> Any:
+        ''' an exhausted parse budget or a cancelled parse aborts the request, instead of parsing the whole text after
+        the statement
+        '''
+        return err if isinstance(err, ParseAborted) else f'reparsing `{rule}` failed: {err}'
+
+    def relocate(self, ast: AstMap, stat: AstElem, new: AstElem, text: str, delta: int) -> AstElem:
+        buffer = SpliceBuffer(text)
+        source = line_table(ast.info.buffer)
+        first_line = source.line(stat.pos).lnum
+        line_delta = len(buffer._lines) - len(source.texts)
+        def new_pos(pos: int) -> int:
+            return pos if pos < 0 else pos + stat.pos
+        def new_lnum(lnum: int) -> int:
+            return lnum + first_line
+        new_source = LineTable(text[stat.pos:].splitlines(True))
+        relocated = Relocation(buffer, new_source, new_pos, new_lnum, first_ws=stat.ws_count)(new)
+        def old_pos(pos: int) -> int:
+            return pos if pos <= stat.pos else pos + delta
+        def old_lnum(lnum: int) -> int:
+            return lnum if lnum <= first_line else lnum + line_delta
+        return Relocation(buffer, source, old_pos, old_lnum, {id(stat): relocated})(ast)
+
+
+__all__ = ('IncrementalParser', 'IncrementalStats', 'SpliceBuffer', 'text_edit', 'find_statement')
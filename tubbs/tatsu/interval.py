@@ -0,0 +1,132 @@
+import threading
+from array import array
+from bisect import bisect_right
+from typing import Tuple, Dict, Iterable
+
+from amino import Maybe, Just, Nothing
+
+from tubbs.tatsu.ast import AstElem
+from tubbs.tatsu.flat import FlatAst, FlatNode
+from tubbs.tatsu.lines import LineTable, line_table
+
+
+class RuleIntervals:
+    ''' the text ranges of the nodes with one rule, sorted by start and, for equal starts, outer nodes first.
+    since the nodes of a tree are either nested or disjoint, each interval has at most one nearest enclosing interval,
+    stored in `enclosing`, and the outermost interval of its chain in `outer`.
+    '''
+
+    def __init__(self, flat: FlatAst, nodes: Iterable[int]) -> None:
+        starts, ends = flat.starts, flat.ends
+        order = sorted((i for i in nodes if 0 <= starts[i] < ends[i]), key=lambda i: (starts[i], -ends[i], i))
+        self.nodes = array('l', order)
+        self.starts = array('q', (starts[i] for i in order))
+        self.ends = array('q', (ends[i] for i in order))
+        self.enclosing = array('l', [-1] * len(order))
+        self.outer = array('l', range(len(order)))
+        stack = []  # type: list
+        for k in range(len(order)):
+            while stack and self.ends[stack[-1]] < self.ends[k]:
+                stack.pop()
+            if stack:
+                self.enclosing[k] = stack[-1]
+                self.outer[k] = self.outer[stack[-1]]
+            stack.append(k)
+
+    def innermost(self, offset: int) -> int:
+        ''' the position in `nodes` of the innermost interval containing `offset`, or -1.
+        the last interval starting at or before `offset` either contains it or is nested in the result.
+        '''
+        k = bisect_right(self.starts, offset) - 1
+        while k >= 0 and self.ends[k] <= offset:
+            k = self.enclosing[k]
+        return k
+
+
+class IntervalIndex:
+    ''' lookup of the nodes containing a text offset by rule in logarithmic time.
+    `line` is the buffer line of the start of the parsed text, used to translate buffer positions to offsets.
+    '''
+
+    def __init__(self, flat: FlatAst, table: LineTable, line: int=0) -> None:
+        self.flat = flat
+        self.table = table
+        self.line = line
+        self._rules = dict()  # type: Dict[str, RuleIntervals]
+
+    @staticmethod
+    def from_ast(ast: AstElem, line: int=0) -> Maybe['IntervalIndex']:
+        return (
+            Maybe.getattr(ast, 'info') /
+            (lambda info: IntervalIndex(FlatAst(ast), line_table(info.buffer), line))
+        )
+
+    def covers(self, ast: AstElem) -> bool:
+        ''' whether `ast` is a node of the indexed parse
+        '''
+        return Maybe.getattr(ast, 'info').exists(lambda a: line_table(a.buffer) is self.table)
+
+    def _intervals(self, rule: str) -> RuleIntervals:
+        intervals = self._rules.get(rule)
+        if intervals is None:
+            intervals = self._rules[rule] = RuleIntervals(self.flat, self.flat.with_rule(rule))
+        return intervals
+
+    def _containing(self, rules: Iterable[str], offset: int, outer: bool) -> Maybe[FlatNode]:
+        found = []
+        for rule in rules:
+            intervals = self._intervals(rule)
+            k = intervals.innermost(offset)
+            if k >= 0:
+                found.append(intervals.nodes[intervals.outer[k] if outer else k])
+        pick = min if outer else max
+        return Just(self.flat.node(pick(found))) if found else Nothing
+
+    def innermost(self, rules: Iterable[str], offset: int) -> Maybe[FlatNode]:
+        ''' all nodes containing an offset are on one path from the root, so the innermost one has the largest
+        preorder index.
+        '''
+        return self._containing(rules, offset, False)
+
+    def outermost(self, rules: Iterable[str], offset: int) -> Maybe[FlatNode]:
+        return self._containing(rules, offset, True)
+
+    def line_offset(self, lnum: int) -> Maybe[int]:
+        ''' offset of the first non-blank character of the buffer line `lnum` in the parsed text
+        '''
+        rel = lnum - self.line
+        return (
+            Just(self.table.starts[rel] + self.table.indents[rel])
+            if 0 <= rel < len(self.table.starts) else
+            Nothing
+        )
+
+
+class BufferIndexes:
+    ''' the interval index of the last successful parse in each buffer, valid until the buffer's changedtick moves.
+    '''
+
+    def __init__(self) -> None:
+        self._entries = dict()  # type: Dict[int, Tuple[int, IntervalIndex]]
+        self._lock = threading.Lock()
+
+    def store(self, buffer: int, changedtick: int, index: IntervalIndex) -> None:
+        with self._lock:
+            self._entries[buffer] = changedtick, index
+
+    def lookup(self, buffer: int, changedtick: int) -> Maybe[IntervalIndex]:
+        with self._lock:
+            entry = self._entries.get(buffer)
+            if entry is None:
+                return Nothing
+            tick, index = entry
+            if tick != changedtick:
+                del self._entries[buffer]
+                return Nothing
+            return Just(index)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+__all__ = ('RuleIntervals', 'IntervalIndex', 'BufferIndexes')
@@ -0,0 +1,137 @@
+from array import array
+from bisect import bisect_right
+from typing import Any, Tuple, List as TList
+
+from tatsu.infos import LineInfo
+
+from ribosome.record import Record, str_field, int_field
+
+from amino import List
+
+
+def indent_width(text: str) -> int:
+    ''' number of leading spaces, 0 if the line consists only of spaces
+    '''
+    stripped = text.lstrip(' ')
+    return len(text) - len(stripped) if stripped else 0
+
+
+class Line(Record):
+    text = str_field()
+    lnum = int_field()
+    start = int_field()
+    end = int_field()
+    length = int_field()
+    indent = int_field()
+
+    @staticmethod
+    def cons(text: str, lnum: int, start: int, end: int) -> 'Line':
+        return Line(text=text, lnum=lnum, start=start, end=end, length=end - start - 1, indent=indent_width(text))
+
+    @staticmethod
+    def from_line_info(info: LineInfo) -> 'Line':
+        return Line.cons(info.text, info.line, info.start, info.end)
+
+    @property
+    def show_text(self) -> str:
+        chomped = self.text.replace('\n', '')
+        return f'"{chomped}"'
+
+    @property
+    def _str_extra(self) -> List[Any]:
+        return List(self.lnum, self.start, self.length, self.end, self.show_text)
+
+    @property
+    def trim(self) -> str:
+        return self.text.strip()
+
+    @property
+    def range(self) -> Tuple[int, int]:
+        return self.start, self.end
+
+
+class LineTable:
+    ''' line offsets of a parser buffer, computed once per parse.
+    `line(pos)` looks up the line containing `pos` by bisecting the start offsets and returns the same `Line` instance
+    for every position on a line. the results are equal to `Line.from_line_info(buffer.line_info(pos))`, including the
+    empty pseudo lines that tatsu reports for positions at and past the end of the text.
+    '''
+
+    def __init__(self, lines: TList[str]) -> None:
+        self.texts = lines
+        self.starts = array('q')
+        offset = 0
+        for text in lines:
+            self.starts.append(offset)
+            offset += len(text)
+        self.size = offset
+        self.ends = array('q', (start + len(text) for start, text in zip(self.starts, lines)))
+        self.indents = array('l', (indent_width(text) for text in lines))
+        self._lines = [None] * len(lines)  # type: TList[Line]
+        self._tail = None  # type: Line
+        self._past = None  # type: Line
+
+    @property
+    def count(self) -> int:
+        ''' the line count as reported by tatsu, which includes an empty last line after a trailing newline
+        '''
+        n = len(self.texts)
+        trailing = n > 0 and self.texts[-1][-1:] in ('\r', '\n')
+        return n + 1 if trailing else max(n, 1)
+
+    def index(self, pos: int) -> int:
+        return bisect_right(self.starts, pos) - 1
+
+    def _line(self, lnum: int) -> Line:
+        line = self._lines[lnum]
+        if line is None:
+            start = self.starts[lnum]
+            line = Line(
+                text=self.texts[lnum],
+                lnum=lnum,
+                start=start,
+                end=self.ends[lnum],
+                length=self.ends[lnum] - start - 1,
+                indent=self.indents[lnum],
+            )
+            self._lines[lnum] = line
+        return line
+
+    def at(self, lnum: int) -> Line:
+        ''' the line with number `lnum`, which must be less than the number of lines in the text
+        '''
+        return self._line(lnum)
+
+    def _end_line(self) -> Line:
+        if self._tail is None:
+            lnum = max(len(self.texts) - 1, 0)
+            self._tail = Line.cons('', lnum, self.size, self.size)
+        return self._tail
+
+    def _past_end_line(self) -> Line:
+        if self._past is None:
+            self._past = Line.cons('', self.count, self.size, self.size)
+        return self._past
+
+    def line(self, pos: int) -> Line:
+        return (
+            self._line(self.index(pos))
+            if 0 <= pos < self.size else
+            self._end_line()
+            if pos == self.size else
+            self._past_end_line()
+            if pos > self.size else
+            self._end_line()
+        )
+
+
+def line_table(buffer: Any) -> LineTable:
+    ''' the line table of a tatsu buffer, created on first access and stored in the buffer
+    '''
+    table = getattr(buffer, '_tubbs_line_table', None)
+    if table is None:
+        table = LineTable(buffer._lines)
+        buffer._tubbs_line_table = table
+    return table
+
+__all__ = ('Line', 'LineTable', 'line_table', 'indent_width')
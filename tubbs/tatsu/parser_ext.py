@@ -1,5 +1,6 @@
+import time
 from functools import namedtuple
-from typing import Any, Callable, Union, cast
+from typing import Any, Callable, Union, Optional, cast
 
 from tatsu.exceptions import FailedKeywordSemantics, FailedPattern
 from tatsu.parsing import Parser as TatsuParser
@@ -15,7 +16,10 @@ from amino.func import dispatch
 from amino.list import flatten
 
 from tubbs.logging import Logging
-from tubbs.tatsu.ast import AstMap, AstToken, AstList, AstElem, Line, AstClosure
+from tubbs.tatsu.ast import AstMap, AstToken, AstList, AstElem, AstClosure
+from tubbs.tatsu.lines import Line, line_table
+from tubbs.tatsu.budget import BudgetExhausted, ParseCancelled, unlimited
+from tubbs.tatsu.profile import ParseProfile
 
 
 AstData = Union[str, list, AstList, AstMap, AstToken, closure, None]
@@ -135,11 +139,56 @@ class DataSemantics(Logging):
 
 
 class ParserExt(TatsuParser):
+    ''' if `profile` is set before a parse, the rule invocations are recorded in it.
+    if `cancelled` is set, it is called along with the budget's clock and aborts the parse once it returns `True`.
+    '''
+    budget = unlimited
+    profile = None  # type: Optional[ParseProfile]
+    cancelled = None  # type: Optional[Callable[[], bool]]
 
     def __init__(self, **kw: Any) -> None:
         super().__init__(**kw)
         self._pos_stack = [0]  # type: list
         self._last_ws = 0
+        self._start_budget()
+
+    def _reset(self, *a: Any, **kw: Any) -> None:
+        ''' called by tatsu at the start of each `parse`, which allows pooled instances to be reused.
+        '''
+        super()._reset(*a, **kw)
+        self._pos_stack = [0]
+        self._last_ws = 0
+        self._last_result = None
+        self._start_budget()
+        self._profile_children = []  # type: list
+        self._profile_active = dict()  # type: dict
+
+    def _release(self) -> None:
+        ''' drop the extension's state of the last parse, called by `release_state`
+        '''
+        self._pos_stack = [0]
+        self._last_result = None
+        self.profile = None
+        self.cancelled = None
+
+    def _start_budget(self) -> None:
+        self._budget_calls = 0
+        self._budget_start = time.monotonic()
+        self._budget_deadline = self.budget.deadline(self._budget_start)
+
+    def _check_budget(self, rule: str) -> None:
+        budget = self.budget
+        self._budget_calls += 1
+        calls = self._budget_calls
+        over_calls = budget.calls > 0 and calls > budget.calls
+        interval = calls % budget.clock_interval == 0
+        over_time = interval and budget.millis > 0 and time.monotonic() > self._budget_deadline
+        if over_calls or over_time:
+            elapsed = time.monotonic() - self._budget_start
+            raise BudgetExhausted(budget, rule, self._pos, line_table(self._buffer).line(self._pos), calls, elapsed)
+        cancelled = self.cancelled
+        if interval and cancelled is not None and cancelled():
+            raise ParseCancelled(rule, self._pos, line_table(self._buffer).line(self._pos), calls)
 
     @lazy
     def post_proc(self) -> PostProc:
@@ -162,7 +211,7 @@ class ParserExt(TatsuParser):
 
     @property
     def _line(self) -> Line:
-        return Line.from_line_info(self._buffer.line_info(self._last_pos))
+        return line_table(self._buffer).line(self._last_pos)
 
     def _take_ws(self) -> int:
         ws = self._last_ws
@@ -180,6 +229,51 @@ class ParserExt(TatsuParser):
             self._last_ws = ws
 
     def _call(self, info: Any) -> Any:
+        if self.budget.enabled or self.cancelled is not None:
+            self._check_budget(info.name)
+        return self._call_rule(info) if self.profile is None else self._profiled_call(self.profile, info)
+
+    def _profiled_call(self, profile: ParseProfile, info: Any) -> Any:
+        name = info.name
+        stats = profile.rule(name)
+        active = self._profile_active
+        active[name] = active.get(name, 0) + 1
+        self._profile_children.append(0.0)
+        start = time.perf_counter()
+        success = False
+        try:
+            result = self._call_rule(info)
+            success = True
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._profile_children.pop()
+            if self._profile_children:
+                self._profile_children[-1] += elapsed
+            active[name] -= 1
+            stats.calls += 1
+            if success:
+                stats.successes += 1
+            else:
+                stats.failures += 1
+            if active[name] == 0:
+                stats.total += elapsed
+            stats.own += elapsed - children
+
+    def _memo_for(self, key: Any) -> Any:
+        ''' memoized results are counted as memo hits, memoized failures, which include the guards of left recursive
+        rules, as memo failures
+        '''
+        memo = super()._memo_for(key)
+        if memo is not None and self.profile is not None:
+            stats = self.profile.rule(key.name)
+            if isinstance(memo, Exception):
+                stats.memo_failures += 1
+            else:
+                stats.memo_hits += 1
+        return memo
+
+    def _call_rule(self, info: Any) -> Any:
         try:
             self._pos_stack.append(self._pos)
             result = TatsuParser._call(self, info)
@@ -256,4 +350,16 @@ class ParserExt(TatsuParser):
     def _UnicodeOpchar_(self) -> str:
         return self._unicode_category('\p{Sm}|\p{So}')
 
-__all__ = ('ParserExt', 'DataSemantics')
+
+def release_state(parser: TatsuParser) -> None:
+    ''' drop the state of the last parse, i.e. the buffer with the text, the node stacks and the memo cache, so that an
+    idle pooled instance doesn't keep them alive. the DSL parsers are plain tatsu parsers without the extension.
+    '''
+    parser._initialize_caches()
+    parser._buffer = None
+    parser._furthest_exception = None
+    parser.semantics = None
+    if isinstance(parser, ParserExt):
+        parser._release()
+
+__all__ = ('ParserExt', 'DataSemantics', 'release_state')
@@ -0,0 +1,76 @@
+import threading
+from typing import Callable, TypeVar
+
+from amino import Either, Right
+
+from tubbs.logging import Logging
+from tubbs.tatsu.parser_ext import ParserExt, release_state
+
+A = TypeVar('A')
+
+
+class PoolStats:
+
+    def __init__(self) -> None:
+        self.created = 0
+        self.reused = 0
+
+    @property
+    def acquired(self) -> int:
+        return self.created + self.reused
+
+    def __str__(self) -> str:
+        return f'PoolStats(created={self.created}, reused={self.reused})'
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class ParserPool(Logging):
+    ''' keeps idle parser instances around so that consecutive parses don't construct a new instance each time.
+    tatsu resets its caches and buffer at the start of every `parse`, so an instance is ready for reuse as soon as the
+    previous parse has returned. the state of that parse is dropped on release, so that idle instances don't retain
+    the text and nodes of the last parse.
+    '''
+
+    def __init__(self, create: Callable[[], Either[str, ParserExt]], size: int) -> None:
+        self.create = create
+        self.size = size
+        self.stats = PoolStats()
+        self._idle = []  # type: list
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Either[str, ParserExt]:
+        with self._lock:
+            if self._idle:
+                self.stats.reused += 1
+                return Right(self._idle.pop())
+            self.stats.created += 1
+        return self.create()
+
+    def release(self, parser: ParserExt) -> None:
+        release_state(parser)
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(parser)
+
+    def use(self, f: Callable[[ParserExt], Either[str, A]]) -> Either[str, A]:
+        def run(parser: ParserExt) -> Either[str, A]:
+            try:
+                return f(parser)
+            finally:
+                self.release(parser)
+        return self.acquire() // run
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle = []
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def __str__(self) -> str:
+        return f'ParserPool({self.idle}/{self.size}, {self.stats})'
+
+__all__ = ('PoolStats', 'ParserPool')
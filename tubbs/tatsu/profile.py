@@ -0,0 +1,104 @@
+''' per-rule statistics of the parser's rule invocations.
+each parse records into its own `ParseProfile`, which is merged into the accumulated profile of the `ParserBase` after
+the parse, so that pooled parsers can run concurrently.
+the cumulative time of a rule is only counted for its outermost invocation, so that recursive rules don't count the
+same time repeatedly. the self time excludes the time spent in nested rule invocations.
+invocations answered from tatsu's memo cache are counted as memo hits if the memoized result was a success, and as
+memo failures otherwise.
+'''
+import json
+import threading
+from typing import Dict
+
+from amino import List
+
+
+class RuleProfile:
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.memo_hits = 0
+        self.memo_failures = 0
+        self.total = 0.0
+        self.own = 0.0
+
+    def merge(self, other: 'RuleProfile') -> None:
+        self.calls += other.calls
+        self.successes += other.successes
+        self.failures += other.failures
+        self.memo_hits += other.memo_hits
+        self.memo_failures += other.memo_failures
+        self.total += other.total
+        self.own += other.own
+
+    @property
+    def data(self) -> dict:
+        return dict(rule=self.name, calls=self.calls, successes=self.successes, failures=self.failures,
+                    memo_hits=self.memo_hits, memo_failures=self.memo_failures, total=self.total, own=self.own)
+
+    def __str__(self) -> str:
+        return f'RuleProfile({self.name}, calls={self.calls}, total={self.total:.6f}, own={self.own:.6f})'
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+sort_keys = List('own', 'total', 'calls', 'successes', 'failures', 'memo_hits', 'memo_failures')
+
+
+class ParseProfile:
+
+    def __init__(self) -> None:
+        self.rules = dict()  # type: Dict[str, RuleProfile]
+        self.parses = 0
+        self._lock = threading.Lock()
+
+    def rule(self, name: str) -> RuleProfile:
+        ''' the statistics of `name`, not synchronized, for recording a single parse
+        '''
+        profile = self.rules.get(name)
+        if profile is None:
+            profile = self.rules[name] = RuleProfile(name)
+        return profile
+
+    def merge(self, other: 'ParseProfile') -> None:
+        with self._lock:
+            self.parses += 1
+            for name, profile in other.rules.items():
+                self.rule(name).merge(profile)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.rules = dict()
+            self.parses = 0
+
+    def sorted(self, key: str='own') -> List[RuleProfile]:
+        ''' the rules in descending order of `key`, which is one of `sort_keys`
+        '''
+        with self._lock:
+            rules = List.wrap(self.rules.values())
+        return rules.sort_by(lambda a: getattr(a, key), reverse=True)
+
+    def table(self, key: str='own', limit: int=0) -> List[str]:
+        rules = self.sorted(key)
+        shown = rules.take(limit) if limit > 0 else rules
+        header = (f'{"rule":<32} {"calls":>9} {"success":>9} {"failure":>9} {"memo hit":>9} {"memo fail":>9} ' +
+                  f'{"total ms":>10} {"self ms":>10}')
+        def row(a: RuleProfile) -> str:
+            return (f'{a.name:<32} {a.calls:>9} {a.successes:>9} {a.failures:>9} {a.memo_hits:>9} ' +
+                    f'{a.memo_failures:>9} {a.total * 1e3:>10.2f} {a.own * 1e3:>10.2f}')
+        return shown.map(row).cons(header).cat(f'{self.parses} parses, {rules.length} rules')
+
+    def json(self, key: str='own') -> str:
+        return json.dumps(dict(parses=self.parses, rules=list(self.sorted(key).map(lambda a: a.data))), indent=2)
+
+    def __str__(self) -> str:
+        return f'ParseProfile(parses={self.parses}, rules={len(self.rules)})'
+
+    def __repr__(self) -> str:
+        return str(self)
+
+__all__ = ('RuleProfile', 'ParseProfile', 'sort_keys')
@@ -17,6 +17,15 @@ class Parser(LangParser):
     def left_recursion(self) -> bool:
         return False
 
+    @property
+    def statement_slots(self) -> Map:
+        return Map({
+            ('templateStats', 'head'): 'templateStat',
+            ('templateStatsTail', 'stat'): 'templateStat',
+            ('blockBody', 'head'): 'blockStat',
+            ('blockRest', 'stat'): 'blockStat',
+        })
+
 
 def parse(text: str, rule: str):
     return Parser().parse(text, rule)
@@ -0,0 +1,53 @@
+import time
+import threading
+from typing import Callable, Tuple
+
+from amino import List, Map, Either, Right
+
+from tubbs.logging import Logging
+from tubbs.tatsu.base import Parsers, ParserBase
+
+dsl_parsers = List('breaker_dsl', 'indenter_dsl')
+
+samples = Map(
+    scala=('def foo(a: Int) = a', 'def'),
+    breaker_dsl=('before:((1.0 @ multi_line_block) | 0.3)', 'top'),
+    indenter_dsl=('here:sibling_indent | from_here', 'top'),
+)  # type: Map[str, Tuple[str, str]]
+
+
+class ParserWarmup(Logging):
+    ''' load parsers in a background thread and parse a small sample with each of them, so that the first request in
+    the editor finds the generated module imported, the parser class built and an instance in the pool.
+    the loaded parsers are passed to `done`.
+    '''
+
+    def __init__(self, names: List[str], done: Callable[[Parsers], None]) -> None:
+        self.names = names.distinct
+        self.done = done
+
+    def load(self) -> Parsers:
+        def load(z: Parsers, name: str) -> Parsers:
+            return z.load(name).leffect(lambda err: self.log.debug(f'warmup: {err}')) | z
+        return self.names.fold_left(Parsers())(load)
+
+    def warm(self, parser: ParserBase) -> Either[str, ParserBase]:
+        sample = samples.lift(parser.name)
+        return (
+            sample.map2(parser.parse) |
+            (lambda: parser.pool.use(Right))
+        ).replace(parser)
+
+    def run(self) -> None:
+        start = time.monotonic()
+        parsers = self.load()
+        parsers.parsers.v.foreach(self.warm)
+        self.log.debug(f'warmed up parsers {parsers.parsers.k.join_comma} in {time.monotonic() - start:.3f}s')
+        self.done(parsers)
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.run, name='tubbs-warmup', daemon=True)
+        thread.start()
+        return thread
+
+__all__ = ('ParserWarmup', 'dsl_parsers')
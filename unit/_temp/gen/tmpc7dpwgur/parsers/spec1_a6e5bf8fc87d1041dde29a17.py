@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# CAVEAT UTILITOR
+#
+# This file was automatically generated by TatSu.
+#
+#    https://pypi.python.org/pypi/tatsu/
+#
+# Any changes you make to it will be overwritten the next time
+# the file is generated.
+
+
+from __future__ import print_function, division, absolute_import, unicode_literals
+
+import sys
+
+from tatsu.buffering import Buffer
+from tatsu.parsing import Parser
+from tatsu.parsing import tatsumasu
+from tatsu.util import re, generic_main  # noqa
+
+
+KEYWORDS = {}  # type: ignore
+
+
+class Spec1Buffer(Buffer):
+    def __init__(
+        self,
+        text,
+        whitespace=None,
+        nameguard=None,
+        comments_re=None,
+        eol_comments_re=None,
+        ignorecase=None,
+        namechars='',
+        **kwargs
+    ):
+        super(Spec1Buffer, self).__init__(
+            text,
+            whitespace=whitespace,
+            nameguard=nameguard,
+            comments_re=comments_re,
+            eol_comments_re=eol_comments_re,
+            ignorecase=ignorecase,
+            namechars=namechars,
+            **kwargs
+        )
+
+
+class Spec1Parser(Parser):
+    def __init__(
+        self,
+        whitespace=None,
+        nameguard=None,
+        comments_re=None,
+        eol_comments_re=None,
+        ignorecase=None,
+        left_recursion=True,
+        parseinfo=True,
+        keywords=None,
+        namechars='',
+        buffer_class=Spec1Buffer,
+        **kwargs
+    ):
+        if keywords is None:
+            keywords = KEYWORDS
+        super(Spec1Parser, self).__init__(
+            whitespace=whitespace,
+            nameguard=nameguard,
+            comments_re=comments_re,
+            eol_comments_re=eol_comments_re,
+            ignorecase=ignorecase,
+            left_recursion=left_recursion,
+            parseinfo=parseinfo,
+            keywords=keywords,
+            namechars=namechars,
+            buffer_class=buffer_class,
+            **kwargs
+        )
+
+    @tatsumasu('token')
+    def _id_(self):  # noqa
+        self._pattern(r'[a-z]+')
+
+    @tatsumasu('token')
+    def _tk_(self):  # noqa
+        self._token('tok')
+
+    @tatsumasu()
+    def _ids_(self):  # noqa
+        self._tk_()
+        self.name_last_node('tk')
+        self._id_()
+        self.name_last_node('l')
+        self._id_()
+        self.name_last_node('r')
+        self.ast._define(
+            ['l', 'r', 'tk'],
+            []
+        )
+
+    @tatsumasu()
+    def _arg_(self):  # noqa
+        self._token(',')
+        self._id_()
+
+    @tatsumasu()
+    def _args_(self):  # noqa
+        self._id_()
+
+        def block0():
+            self._arg_()
+        self._closure(block0)
+
+    @tatsumasu()
+    def _call_(self):  # noqa
+        self._tk_()
+        self.name_last_node('tk')
+        self._token('(')
+        self.name_last_node('lp')
+        self._id_()
+        self.name_last_node('first')
+
+        def block4():
+            self._arg_()
+        self._closure(block4)
+        self.name_last_node('rest')
+        self._token(')')
+        self.name_last_node('rp')
+        self.ast._define(
+            ['first', 'lp', 'rest', 'rp', 'tk'],
+            []
+        )
+
+    @tatsumasu()
+    def _pos_(self):  # noqa
+
+        def block0():
+            self._id_()
+            self.name_last_node('id')
+        self._positive_closure(block0)
+        with self._optional():
+            self._tk_()
+        self.ast._define(
+            ['id'],
+            []
+        )
+
+    @tatsumasu()
+    def _poswrap_(self):  # noqa
+        self._tk_()
+        self.name_last_node('tk')
+        self._token(':')
+        with self._optional():
+            self._pos_()
+            self.name_last_node('clos')
+        self.ast._define(
+            ['clos', 'tk'],
+            []
+        )
+
+    @tatsumasu()
+    def _ws_(self):  # noqa
+        self._tk_()
+        self.name_last_node('tk')
+        self._token(':')
+        with self._optional():
+            self._args_()
+            self.name_last_node('args')
+        self.ast._define(
+            ['args', 'tk'],
+            []
+        )
+
+    @tatsumasu()
+    def _list_(self):  # noqa
+        self._tk_()
+        self._token(':')
+        with self._optional():
+            self._pos_()
+
+    @tatsumasu()
+    def _stats_(self):  # noqa
+        self._token('{')
+        self.name_last_node('lb')
+        self._call_()
+        self.name_last_node('head')
+
+        def block3():
+            self._pattern(r'\n')
+            self._call_()
+        self._closure(block3)
+        self.name_last_node('tail')
+        self._token('}')
+        self.name_last_node('rb')
+        self.ast._define(
+            ['head', 'lb', 'rb', 'tail'],
+            []
+        )
+
+    @tatsumasu()
+    def _memo_(self):  # noqa
+        with self._choice():
+            with self._option():
+                self._tk_()
+                self._token('x')
+            with self._option():
+                self._tk_()
+            with self._option():
+                self._id_()
+                self._token('x')
+            with self._option():
+                self._id_()
+                self._token('y')
+            self._error('no available options')
+
+
+class Spec1Semantics(object):
+    def id(self, ast):  # noqa
+        return ast
+
+    def tk(self, ast):  # noqa
+        return ast
+
+    def ids(self, ast):  # noqa
+        return ast
+
+    def arg(self, ast):  # noqa
+        return ast
+
+    def args(self, ast):  # noqa
+        return ast
+
+    def call(self, ast):  # noqa
+        return ast
+
+    def pos(self, ast):  # noqa
+        return ast
+
+    def poswrap(self, ast):  # noqa
+        return ast
+
+    def ws(self, ast):  # noqa
+        return ast
+
+    def list(self, ast):  # noqa
+        return ast
+
+    def stats(self, ast):  # noqa
+        return ast
+
+    def memo(self, ast):  # noqa
+        return ast
+
+
+def main(filename, start='id', **kwargs):
+    if not filename or filename == '-':
+        text = sys.stdin.read()
+    else:
+        with open(filename) as f:
+            text = f.read()
+    parser = Spec1Parser()
+    return parser.parse(text, start=start, filename=filename, **kwargs)
+
+
+if __name__ == '__main__':
+    import json
+    from tatsu.util import asjson
+
+    ast = generic_main(main, Spec1Parser, name='Spec1')
+    print('AST:')
+    print(ast)
+    print()
+    print('JSON:')
+    print(json.dumps(asjson(ast), indent=2))
+    print()
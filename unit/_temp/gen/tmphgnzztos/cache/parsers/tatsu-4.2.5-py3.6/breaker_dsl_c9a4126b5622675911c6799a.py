@@ -13,6 +13,8 @@
 
 from __future__ import print_function, division, absolute_import, unicode_literals
 
+import sys
+
 from tatsu.buffering import Buffer
 from tatsu.parsing import Parser
 from tatsu.parsing import tatsumasu
@@ -30,7 +32,7 @@ class BreakerDslBuffer(Buffer):
     def __init__(
         self,
         text,
-        whitespace=' ',
+        whitespace=re.compile(' '),
         nameguard=None,
         comments_re=None,
         eol_comments_re=None,
@@ -53,7 +55,7 @@ class BreakerDslBuffer(Buffer):
 class BreakerDslParser(Parser):
     def __init__(
         self,
-        whitespace=' ',
+        whitespace=re.compile(' '),
         nameguard=None,
         comments_re=None,
         eol_comments_re=None,
@@ -431,11 +433,14 @@ class BreakerDslSemantics(object):
         return ast
 
 
-def main(filename, startrule, **kwargs):
-    with open(filename) as f:
-        text = f.read()
+def main(filename, start='or', **kwargs):
+    if not filename or filename == '-':
+        text = sys.stdin.read()
+    else:
+        with open(filename) as f:
+            text = f.read()
     parser = BreakerDslParser()
-    return parser.parse(text, startrule, filename=filename, **kwargs)
+    return parser.parse(text, start=start, filename=filename, **kwargs)
 
 
 if __name__ == '__main__':
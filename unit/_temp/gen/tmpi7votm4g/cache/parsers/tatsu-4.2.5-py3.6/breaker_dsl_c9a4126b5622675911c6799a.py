@@ -13,6 +13,8 @@
 
 from __future__ import print_function, division, absolute_import, unicode_literals
 
+import sys
+
 from tatsu.buffering import Buffer
 from tatsu.parsing import Parser
 from tatsu.parsing import tatsumasu
@@ -26,11 +28,11 @@ KEYWORDS = {
 }  # type: ignore
 
 
-class IndenterDslBuffer(Buffer):
+class BreakerDslBuffer(Buffer):
     def __init__(
         self,
         text,
-        whitespace=' ',
+        whitespace=re.compile(' '),
         nameguard=None,
         comments_re=None,
         eol_comments_re=None,
@@ -38,7 +40,7 @@ class IndenterDslBuffer(Buffer):
         namechars='',
         **kwargs
     ):
-        super(IndenterDslBuffer, self).__init__(
+        super(BreakerDslBuffer, self).__init__(
             text,
             whitespace=whitespace,
             nameguard=nameguard,
@@ -50,10 +52,10 @@ class IndenterDslBuffer(Buffer):
         )
 
 
-class IndenterDslParser(Parser):
+class BreakerDslParser(Parser):
     def __init__(
         self,
-        whitespace=' ',
+        whitespace=re.compile(' '),
         nameguard=None,
         comments_re=None,
         eol_comments_re=None,
@@ -62,12 +64,12 @@ class IndenterDslParser(Parser):
         parseinfo=True,
         keywords=None,
         namechars='',
-        buffer_class=IndenterDslBuffer,
+        buffer_class=BreakerDslBuffer,
         **kwargs
     ):
         if keywords is None:
             keywords = KEYWORDS
-        super(IndenterDslParser, self).__init__(
+        super(BreakerDslParser, self).__init__(
             whitespace=whitespace,
             nameguard=nameguard,
             comments_re=comments_re,
@@ -126,27 +128,15 @@ class IndenterDslParser(Parser):
         self._token(':')
 
     @tatsumasu()
-    def _here_(self):  # noqa
-        self._token('here')
-
-    @tatsumasu()
-    def _fromHere_(self):  # noqa
-        self._token('from_here')
+    def _before_(self):  # noqa
+        self._token('before')
 
     @tatsumasu()
     def _after_(self):  # noqa
         self._token('after')
 
-    @tatsumasu()
-    def _children_(self):  # noqa
-        self._token('children')
-
-    @tatsumasu()
-    def _skip_(self):  # noqa
-        self._token('skip')
-
-    @tatsumasu('int')
-    def _int_(self):  # noqa
+    @tatsumasu('float')
+    def _float_(self):  # noqa
         self._pattern(r'\d+\.\d+')
 
     @tatsumasu('Name')
@@ -272,102 +262,83 @@ class IndenterDslParser(Parser):
         self.name_last_node('@')
         self._rpar_()
 
-    @tatsumasu('Amount')
-    def _amount_(self):  # noqa
-        self._int_()
+    @tatsumasu('Prio')
+    def _prio_(self):  # noqa
+        self._float_()
         self.name_last_node('value')
         self.ast._define(
             ['value'],
             []
         )
 
-    @tatsumasu('AmountCond')
-    def _amountCound_(self):  # noqa
-        self._amount_()
-        self.name_last_node('amount')
+    @tatsumasu('PrioCond')
+    def _prioCond_(self):  # noqa
+        self._prio_()
+        self.name_last_node('prio')
         self._at_()
         self._expr_()
         self.name_last_node('expr')
         self.ast._define(
-            ['amount', 'expr'],
+            ['expr', 'prio'],
             []
         )
 
     @tatsumasu()
-    def _rangeExpr_(self):  # noqa
+    def _expr_(self):  # noqa
         with self._choice():
             with self._option():
-                self._here_()
+                self._prioCond_()
             with self._option():
-                self._fromHere_()
+                self._parensExpr_()
             with self._option():
-                self._after_()
+                self._compoundExpr_()
+            with self._option():
+                self._cond_()
             with self._option():
-                self._children_()
+                self._condStrict_()
             with self._option():
-                self._skip_()
+                self._prio_()
             self._error('no available options')
 
-    @tatsumasu('Range')
-    def _range_(self):  # noqa
-        self._rangeExpr_()
-        self.name_last_node('value')
-        self.ast._define(
-            ['value'],
-            []
-        )
+    @tatsumasu()
+    def _side_(self):  # noqa
+        with self._choice():
+            with self._option():
+                self._before_()
+            with self._option():
+                self._after_()
+            self._error('no available options')
 
-    @tatsumasu('RangeCond')
-    def _rangeCond_(self):  # noqa
-        self._range_()
-        self.name_last_node('range')
+    @tatsumasu('Side')
+    def _sideExpr_(self):  # noqa
+        self._side_()
+        self.name_last_node('side')
         self._colon_()
         self._expr_()
         self.name_last_node('expr')
         self.ast._define(
-            ['expr', 'range'],
+            ['expr', 'side'],
             []
         )
 
-    @tatsumasu()
-    def _topExpr_(self):  # noqa
-        with self._choice():
-            with self._option():
-                self._parensExpr_()
-            with self._option():
-                self._compoundExpr_()
-            with self._option():
-                self._amountCound_()
-            with self._option():
-                self._rangeCond_()
-            with self._option():
-                self._range_()
-            self._error('no available options')
-
     @tatsumasu('Top')
     def _top_(self):  # noqa
-        self._topExpr_()
-        self.name_last_node('expr')
+
+        def sep0():
+            with self._group():
+                self._plus_()
+
+        def block0():
+            self._sideExpr_()
+            self.name_last_node('sides')
+        self._positive_gather(block0, sep0)
         self.ast._define(
-            ['expr'],
+            ['sides'],
             []
         )
 
-    @tatsumasu()
-    def _expr_(self):  # noqa
-        with self._choice():
-            with self._option():
-                self._topExpr_()
-            with self._option():
-                self._cond_()
-            with self._option():
-                self._condStrict_()
-            with self._option():
-                self._amount_()
-            self._error('no available options')
-
 
-class IndenterDslSemantics(object):
+class BreakerDslSemantics(object):
     def or_(self, ast):  # noqa
         return ast
 
@@ -401,22 +372,13 @@ class IndenterDslSemantics(object):
     def colon(self, ast):  # noqa
         return ast
 
-    def here(self, ast):  # noqa
-        return ast
-
-    def fromHere(self, ast):  # noqa
+    def before(self, ast):  # noqa
         return ast
 
     def after(self, ast):  # noqa
         return ast
 
-    def children(self, ast):  # noqa
-        return ast
-
-    def skip(self, ast):  # noqa
-        return ast
-
-    def int(self, ast):  # noqa
+    def float(self, ast):  # noqa
         return ast
 
     def name(self, ast):  # noqa
@@ -452,43 +414,40 @@ class IndenterDslSemantics(object):
     def parensExpr(self, ast):  # noqa
         return ast
 
-    def amount(self, ast):  # noqa
-        return ast
-
-    def amountCound(self, ast):  # noqa
+    def prio(self, ast):  # noqa
         return ast
 
-    def rangeExpr(self, ast):  # noqa
+    def prioCond(self, ast):  # noqa
         return ast
 
-    def range(self, ast):  # noqa
+    def expr(self, ast):  # noqa
         return ast
 
-    def rangeCond(self, ast):  # noqa
+    def side(self, ast):  # noqa
         return ast
 
-    def topExpr(self, ast):  # noqa
+    def sideExpr(self, ast):  # noqa
         return ast
 
     def top(self, ast):  # noqa
         return ast
 
-    def expr(self, ast):  # noqa
-        return ast
-
 
-def main(filename, startrule, **kwargs):
-    with open(filename) as f:
-        text = f.read()
-    parser = IndenterDslParser()
-    return parser.parse(text, startrule, filename=filename, **kwargs)
+def main(filename, start='or', **kwargs):
+    if not filename or filename == '-':
+        text = sys.stdin.read()
+    else:
+        with open(filename) as f:
+            text = f.read()
+    parser = BreakerDslParser()
+    return parser.parse(text, start=start, filename=filename, **kwargs)
 
 
 if __name__ == '__main__':
     import json
     from tatsu.util import asjson
 
-    ast = generic_main(main, IndenterDslParser, name='IndenterDsl')
+    ast = generic_main(main, BreakerDslParser, name='BreakerDsl')
     print('AST:')
     print(ast)
     print()
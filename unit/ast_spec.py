@@ -3,7 +3,7 @@ from amino.test.path import fixture_path
 
 from kallikrein import Expectation, k, unsafe_k
 from kallikrein.matchers.either import be_right
-from kallikrein.matchers import contain
+from kallikrein.matchers import contain, equal
 from kallikrein.expectable import Expectable
 from amino import _, Either, Path, __
 
@@ -43,6 +43,7 @@ class AstSpec:
     positive closure $positive_closure
     pre-token whitespace $whitespace
     line number attribute $lines
+    rose tree children in text order with parents and unique ids, cached per AST $rose_tree
     '''
 
     def setup(self) -> None:
@@ -106,4 +107,18 @@ class AstSpec:
             k(ast.s.tail[1].first.e.map(_.lnum)).must(contain(1))
         )
 
+    def rose_tree(self) -> Expectation:
+        data = 'tok(foo, bar, zam)'
+        ast = self.ast(data, 'call')
+        tree = ast_rose_tree(ast)
+        sub = tree.sub.drain
+        positions = sub.map(_.pos)
+        return (
+            (k(positions) == positions.sort_by(lambda a: a)) &
+            k(sub.forall(lambda a: a.parent is tree)).must(equal(True)) &
+            k(ast_rose_tree(ast) is tree).must(equal(True)) &
+            k(sub.map(_.ident).distinct.length).must(equal(sub.length)) &
+            k(sub.map(_.data).distinct.length).must(equal(sub.length))
+        )
+
 __all__ = ('AstSpec',)
@@ -0,0 +1,92 @@
+from kallikrein import k, Expectation
+from kallikrein.matchers import equal
+
+from amino import List, Either, Right
+
+from tubbs.buffer_mirror import BufferMirror, MirrorSource
+
+buffer = 1
+
+
+class RpcSource(MirrorSource):
+    ''' stands in for nvim, sending change events to the mirror like an attached buffer
+    '''
+
+    def __init__(self, mirror: BufferMirror, lines: List[str]) -> None:
+        self.mirror = mirror
+        self.lines = list(lines)
+        self.tick = 1
+        self.fetched = 0
+        self.ticks = 0
+
+    def attach(self, buffer: int) -> Either[str, bool]:
+        self.mirror.lines_event(buffer, self.tick, 0, -1, List.wrap(self.lines))
+        return Right(True)
+
+    def content(self, buffer: int) -> Either[str, List[str]]:
+        self.fetched += 1
+        return Right(List.wrap(self.lines))
+
+    def changedtick(self, buffer: int) -> Either[str, int]:
+        self.ticks += 1
+        return Right(self.tick)
+
+    def change(self, first: int, last: int, data: List[str]) -> None:
+        self.lines[first:last] = data
+        self.tick += 1
+        self.mirror.lines_event(buffer, self.tick, first, last, data)
+
+    def reload(self, first: int, last: int, data: List[str]) -> None:
+        self.lines[first:last] = data
+        self.tick += 1
+        self.mirror.lines_event(buffer, None, first, last, data)
+
+
+class BufferMirrorSpec:
+    '''in-process copy of buffer lines
+    apply change events to the copy $apply
+    resynchronize after a reload $resync
+    ignore events that are contained in a resynchronized copy $stale
+    '''
+
+    def source(self) -> RpcSource:
+        return RpcSource(BufferMirror(), List('a', 'b', 'c', 'd'))
+
+    def apply(self) -> Expectation:
+        source = self.source()
+        source.mirror.lines(buffer, source)
+        source.change(1, 2, List('x', 'y'))
+        source.change(0, 1, List())
+        source.change(4, 4, List('e'))
+        lines = source.mirror.lines(buffer, source)
+        return (
+            k(lines).must(equal(Right(List('x', 'y', 'c', 'd', 'e')))) &
+            k(source.fetched).must(equal(0)) &
+            k(source.ticks).must(equal(0)) &
+            k(source.mirror.stats.local).must(equal(2))
+        )
+
+    def resync(self) -> Expectation:
+        source = self.source()
+        source.mirror.lines(buffer, source)
+        source.reload(0, 1, List('z'))
+        lines = source.mirror.lines(buffer, source)
+        source.change(1, 2, List('y'))
+        return (
+            k(lines).must(equal(Right(List('z', 'b', 'c', 'd')))) &
+            k(source.mirror.lines(buffer, source)).must(equal(Right(List('z', 'y', 'c', 'd')))) &
+            k(source.fetched).must(equal(1))
+        )
+
+    def stale(self) -> Expectation:
+        source = self.source()
+        source.mirror.lines(buffer, source)
+        source.reload(0, 0, List('z'))
+        source.mirror.lines(buffer, source)
+        source.mirror.lines_event(buffer, source.tick, 0, 0, List('z'))
+        return (
+            k(source.mirror.lines(buffer, source)).must(equal(Right(List('z', 'a', 'b', 'c', 'd')))) &
+            k(source.fetched).must(equal(1))
+        )
+
+__all__ = ('BufferMirrorSpec',)
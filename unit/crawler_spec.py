@@ -0,0 +1,74 @@
+from typing import Hashable, Callable, Tuple
+
+from kallikrein import k, Expectation
+from kallikrein.matchers import equal
+
+from amino import List, Nothing, Just, Either, Maybe
+
+from tubbs.tatsu.scala import Parser
+from tubbs.tatsu.ast import AstElem
+from tubbs.formatter.crawler import Crawler
+from tubbs.hints.base import HintMatch
+
+tail = List('val x = 1', 'val y = 2', 'val z = 3', 'val w = 4')
+
+single = tail.cons('def f = 1')
+
+chain = List('def f = a', '  .b', '  .c', '  .d') + tail
+
+block = List('def f = {', '  a', '  b', '  c', '}') + tail
+
+
+class RecordingParser(Parser):
+    ''' records the line counts of the parsed texts
+    '''
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.sizes = List()
+
+    def parse(self, text: str, rule: str, key: Hashable=None, cancelled: Callable[[], bool]=None
+              ) -> Either[str, AstElem]:
+        self.sizes = self.sizes.cat(len(text.splitlines()))
+        return super().parse(text, rule, key, cancelled)
+
+
+class CrawlerSpec:
+    '''parse windows of the crawler
+    parse once if the match ends inside of the first window $inside
+    double the window if the match reaches into its last line $last_line
+    start with the end line of the hint $end_line
+    parse the rest of the buffer with a window of 0 $whole
+    extend the window if the rule fails to parse $failure
+    '''
+
+    def setup(self) -> None:
+        self.parser = RecordingParser()
+        self.parser.gen()
+
+    def crawl(self, content: List[str], window: int, end_line: Maybe[int]=Nothing) -> Tuple[List[int], Tuple[int, int]]:
+        match = HintMatch(line=0, end_line=end_line, rules=List('def'))
+        ast = Crawler(content, 0, self.parser, Nothing, window=window)._parse_window('def', match).get_or_raise
+        return self.parser.sizes, (ast.start_line.lnum, ast.end_line.lnum)
+
+    def inside(self) -> Expectation:
+        return k(self.crawl(single, 3)).must(equal((List(3), (0, 0))))
+
+    def last_line(self) -> Expectation:
+        return k(self.crawl(chain, 2)).must(equal((List(2, 4, 8), (0, 3))))
+
+    def end_line(self) -> Expectation:
+        return k(self.crawl(block, 2, Just(5))).must(equal((List(6), (0, 4))))
+
+    def whole(self) -> Expectation:
+        return k(self.crawl(block, 0)).must(equal((List(9), (0, 4))))
+
+    def failure(self) -> Expectation:
+        small = self.parser.parse(block.take(4).join_lines, 'def')
+        self.parser.sizes = List()
+        return (
+            k(small.is_left).must(equal(True)) &
+            k(self.crawl(block, 2)).must(equal((List(2, 4, 8), (0, 4))))
+        )
+
+__all__ = ('CrawlerSpec',)
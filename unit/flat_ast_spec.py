@@ -0,0 +1,67 @@
+from kallikrein import k, Expectation
+from kallikrein.matchers import equal
+from kallikrein.matchers.either import be_right
+
+from amino import List, _
+from amino.lazy import lazy
+
+from tubbs.tatsu.scala import Parser
+from tubbs.tatsu.ast import ast_rose_tree, RoseAstTree
+from tubbs.tatsu.flat import FlatAst
+
+code = '''def foo(a: Int) = {
+  val b = a match {
+    case 1 => { bar(a) }
+  }
+  b
+}'''
+
+
+def preorder(node: RoseAstTree) -> List[RoseAstTree]:
+    return node.sub.drain.flat_map(preorder).cons(node)
+
+
+class FlatAstSpec:
+    '''array-backed AST
+    same node layout as the rose tree $layout
+    ancestor with rule $parent_with_rule
+    ancestry and direct children $contains
+    '''
+
+    @lazy
+    def parser(self) -> Parser:
+        parser = Parser()
+        parser.gen()
+        return parser
+
+    @lazy
+    def flat(self) -> FlatAst:
+        return self.parser.parse_flat(code, 'def').get_or_raise
+
+    def layout(self) -> Expectation:
+        tree = preorder(ast_rose_tree(self.flat.root.ast))
+        flat = preorder(self.flat.root)
+        desc = lambda a: (a.data.key, a.rule, a.pos, a.endpos)
+        return k(flat / desc).must(equal(tree / desc))
+
+    def parent_with_rule(self) -> Expectation:
+        call = next(a for a in range(self.flat.size) if self.flat.elems[a].text == 'bar(a)')
+        node = self.flat.node(call)
+        nearest = node.ancestors.filter(lambda a: a.rule == 'caseClause')[0].index
+        return (
+            k(node.parent_with_rule(List('caseClause'), 100).map(_.index)).must(be_right(nearest)) &
+            k(node.parent_with_rule(List('def')).is_left).must(equal(True))
+        )
+
+    def contains(self) -> Expectation:
+        root = self.flat.root
+        child = root.sub[0]
+        leaf = root.descendants[-1]
+        return (
+            k(root.is_ancestor_of(leaf)).must(equal(True)) &
+            k(leaf.is_ancestor_of(root)).must(equal(False)) &
+            k(root.contains(child)).must(equal(True)) &
+            k(child.parent is root).must(equal(True))
+        )
+
+__all__ = ('FlatAstSpec',)
@@ -0,0 +1,89 @@
+from itertools import product
+
+from kallikrein import k, Expectation
+from kallikrein.matchers import equal
+from kallikrein.matchers.either import be_right, be_left
+
+from amino import List, Either, Right, _
+
+from tubbs.tatsu.scala import Parser
+from tubbs.tatsu.ast import ast_rose_tree
+from tubbs.formatter.breaker.cond import BreakCond, PredCond, NoBreak, CondBreak
+from tubbs.formatter.breaker.conds import inv
+from tubbs.formatter.breaker.state import BreakState
+from tubbs.formatter.breaker.info import Skip
+from tubbs.formatter.scala.breaker import Breaker
+
+from unit.format.scala_spec import fun
+
+
+def flag(index: int) -> BreakCond:
+    return PredCond(f'flag {index}', lambda state: state[index])
+
+
+conds = List(
+    (flag(0).prio(1.0) | inv(0.3)).before,
+    (flag(0).prio(0.1) | flag(1).prio(1.0) | inv(0.8)).after,
+    (flag(0) & flag(1) & flag(2)).prio(0.3).before,
+    ((flag(0) | flag(1)).prio(0.5) | flag(2).prio(0.7)).before,
+    (flag(0).prio(1.0) | inv(0.3)).prio(0.5).before,
+    flag(0).prio(1.0),
+    flag(1).before | NoBreak(),
+    (flag(0).prio(1.0) | inv(0.2)).before + (flag(1).prio(0.4) | NoBreak()).after,
+)
+
+
+def interpreted(cond: BreakCond, state: tuple) -> Either[str, List[tuple]]:
+    return (
+        cond.infos(state)
+        .filter_not(lambda a: isinstance(a, Skip))
+        .traverse(_.info, Either)
+    )
+
+
+class BreakCompileSpec:
+    '''compilation of break conditions to closures
+    agree with the interpreter for all predicate outcomes $synthetic
+    agree with the interpreter for the scala rules $scala
+    leave conditions that cannot be compiled to the interpreter $fallback
+    '''
+
+    def synthetic(self) -> Expectation:
+        def check(cond: BreakCond) -> bool:
+            compiled = cond.compiled.get_or_raise
+            def agree(state: tuple) -> bool:
+                result = compiled(state)
+                expected = interpreted(cond, state)
+                return (
+                    expected == Right(List.wrap(result))
+                    if result is not None else
+                    expected.is_left
+                )
+            return all(agree(state) for state in product((True, False), repeat=3))
+        return k(conds.map(check)).must(equal(conds.map(lambda a: True)))
+
+    def scala(self) -> Expectation:
+        parser = Parser()
+        parser.gen()
+        ast = parser.parse(fun, 'def').get_or_raise
+        breaker = Breaker(37)
+        cond_breaks = breaker.breaks(ast_rose_tree(ast)).value.get_or_raise.conds
+        def check(cb: CondBreak) -> bool:
+            state = BreakState(cb.node, List())
+            return cb.brk(List(), 0, len(fun)) == cb.interpret(state)
+        return (
+            k(cond_breaks.forall(lambda a: a.cond.compiled.is_right)).must(equal(True)) &
+            k(cond_breaks.forall(check)).must(equal(True))
+        )
+
+    def fallback(self) -> Expectation:
+        class Custom(NoBreak):
+            @property
+            def decision(self) -> Either:
+                return BreakCond.decision.fget(self)
+        return (
+            k(Custom().compiled).must(be_left) &
+            k(inv(0.5).before.compiled).must(be_right)
+        )
+
+__all__ = ('BreakCompileSpec',)
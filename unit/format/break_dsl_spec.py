@@ -2,14 +2,17 @@ from typing import Callable, Any
 
 from tubbs.tatsu.breaker_dsl import Parser
 from tubbs.formatter.breaker.dsl import parse_break_expr
+from tubbs.formatter.breaker.main import DictBreaker
+from tubbs.formatter.breaker.conds import parent_rule
 from tubbs.formatter.breaker.state import BreakState
 from tubbs.formatter.breaker.cond import (pred_cond_f, BreakCondSet, BreakCondPos, BreakCondOr, BreakCondPrio,
                                           PredCond)
 
 from kallikrein import k, Expectation
-from kallikrein.matchers.either import be_right
+from kallikrein.matchers.either import be_right, be_left
+from kallikrein.matchers import equal
 from kallikrein.matchers.typed import have_type
-from kallikrein.matchers.maybe import be_just
+from kallikrein.matchers.maybe import be_just, be_nothing
 
 from amino import Map, Boolean, _, __, List
 
@@ -23,6 +26,9 @@ class BreakDslSpec:
     '''Break config DSL
     single priority $prio
     set of compound expressions $set
+    compile a rule map once per rules and conds $compile
+    don't share the compiled rules of condition objects $objects
+    report invalid rules $invalid
     '''
 
     def setup(self) -> None:
@@ -36,10 +42,11 @@ class BreakDslSpec:
 
     def set(self) -> Expectation:
         expr = 'before:((1.1 @ condition(param, _.capitalize)) | 0.5 @ (boo & zoo)) + after:(0.2)'
-        res = parse_break_expr(self.parser, expr, Map(condition=condition, boo=condition, zoo=condition))
+        parsed = parse_break_expr(self.parser, expr, Map(condition=condition, boo=condition, zoo=condition))
+        res = parsed | None
         state = BreakState(None, List())
         return (
-            k(res).must(have_type(BreakCondSet)) &
+            k(parsed).must(be_right(have_type(BreakCondSet))) &
             k(res.conds.head).must(be_just(have_type(BreakCondPos))) &
             k(res.conds.head / _.cond).must(be_just(have_type(BreakCondOr))) &
             k(res.conds.head / _.cond.left).must(be_just(have_type(BreakCondPrio))) &
@@ -47,4 +54,32 @@ class BreakDslSpec:
             k(res.conds.head / __.cond.left.cond.f(state)).must(be_just(True))
         )
 
+    def compile(self) -> Expectation:
+        rules = Map(param='before:(1.1 @ condition(param, _.capitalize))', block='after:0.5')
+        conds = Map(condition=condition)
+        breaker = DictBreaker(self.parser, rules, conds, 80)
+        again = DictBreaker(self.parser, Map(rules), conds, 80)
+        return (
+            k(breaker.compiled / __.k.sort()).must(be_right(List('block', 'param'))) &
+            k(breaker.handler('block') / (lambda a: a())).must(be_just(have_type(BreakCondSet))) &
+            k(again.compiled is breaker.compiled).must(equal(True))
+        )
+
+    def objects(self) -> Expectation:
+        case = parent_rule('case')
+        other = parent_rule('def')
+        breaker = DictBreaker(self.parser, Map(param=case), Map(), 80)
+        again = DictBreaker(self.parser, Map(param=other), Map(), 80)
+        return (
+            k(breaker.handler('param') / (lambda a: a() is case)).must(be_just(True)) &
+            k(again.handler('param') / (lambda a: a() is other)).must(be_just(True))
+        )
+
+    def invalid(self) -> Expectation:
+        breaker = DictBreaker(self.parser, Map(param='before:(1.1 @ missing)'), Map(), 80)
+        return (
+            k(breaker.compiled).must(be_left) &
+            k(breaker.handler('param')).must(be_nothing)
+        )
+
 __all__ = ('BreakDslSpec',)
@@ -1,3 +1,5 @@
+from typing import Callable
+
 from tubbs.tatsu.scala import Parser
 from tubbs.tatsu.breaker_dsl import Parser as BreakParser
 from tubbs.tatsu.indenter_dsl import Parser as IndentParser
@@ -16,7 +18,7 @@ from kallikrein import k
 import kallikrein.matchers.either  # NOQA
 from kallikrein.matchers.eval import eval_to
 from kallikrein.matchers.lines import have_lines
-from kallikrein.matchers.either import be_right
+from kallikrein.matchers.either import be_right, be_left
 
 from amino import List, Just, _, Map, __
 from amino.test.path import load_fixture
@@ -95,6 +97,7 @@ class FormattingFacadeSpec:
 
     broken apply expression with case clauses $broken_apply
     multiple nested blocks on a single line $nested_blocks
+    skip the formatters and abort parsing when cancelled $cancelled
     '''
 
     def setup(self) -> None:
@@ -109,9 +112,9 @@ class FormattingFacadeSpec:
         self.indent_parser = IndentParser()
         self.indent_parser.gen()
 
-    def facade(self, formatters: List[Formatter]) -> FormattingFacade:
+    def facade(self, formatters: List[Formatter], cancelled: Callable[[], bool]=None) -> FormattingFacade:
         hints = Hints()
-        return FormattingFacade(self.parser, formatters, Just(hints))
+        return FormattingFacade(self.parser, formatters, Just(hints), cancelled=cancelled)
 
     @property
     def default_formatters(self) -> List[Formatter]:
@@ -176,4 +179,13 @@ class FormattingFacadeSpec:
     def nested_blocks(self) -> Expectation:
         return self.format_at(self.default_formatters, List(nested_blocks), (0, 1), nested_blocks_target)
 
+    def cancelled(self) -> Expectation:
+        lines = List(nested_blocks)
+        rule, rng = self.default_facade.parsable_range(lines, (0, 1)).get_or_raise
+        facade = self.facade(self.default_formatters, lambda: True)
+        return (
+            k(facade.format(lines, (0, 1))).must(eval_to(be_left)) &
+            k(facade.format_range(rule, lines, rng) / _.lines).must(eval_to(have_lines(nested_blocks)))
+        )
+
 __all__ = ('FormattingFacadeSpec',)
@@ -0,0 +1,92 @@
+from kallikrein import k, Expectation
+from kallikrein.matchers import equal
+
+from amino import List
+
+from tubbs.tatsu.scala import Parser
+from tubbs.formatter.breaker.optimal import optimal_positions, CostWeights
+from tubbs.formatter.scala.breaker import Breaker
+
+from unit.format.scala_spec import fun, lookbehind, lookbehind_target
+
+call = 'foo(aaaa, bbbb, cccc, dddd, eeee)'
+commas = List.wrap((i + 1, 0.5) for i, c in enumerate(call) if c == ',')
+
+chain = 'def f = a.map { x => foo(x) }.filter { y => bar(y) }'
+
+chain_target = List(
+    'def f = a.map {',
+    'x =>',
+    'foo(x)',
+    '}.filter { y => bar(y) }',
+)
+
+
+class OptimalBreakSpec:
+    '''line breaking by dynamic programming
+    don't break a line that fits $fit
+    split a line into balanced parts $balance
+    always use forced breaks $forced
+    only consider segments within the lookback window, which must not be empty $window
+    break a scala function without losing text $scala
+    reject an unknown engine $engine
+    break closing braces that depend on applied breaks $braces
+    '''
+
+    def fit(self) -> Expectation:
+        return k(optimal_positions(call, commas, 40)).must(equal([]))
+
+    def balance(self) -> Expectation:
+        return (
+            k(optimal_positions(call, commas, 20)).must(equal([15])) &
+            k(optimal_positions(call, commas, 10)).must(equal([9, 15, 21, 27]))
+        )
+
+    def forced(self) -> Expectation:
+        return k(optimal_positions(call, commas.cons((4, 1.0)), 40)).must(equal([4]))
+
+    def window(self) -> Expectation:
+        def weights(window: int) -> str:
+            try:
+                return str(CostWeights(window=window).window)
+            except ValueError as e:
+                return str(e)
+        return (
+            k(optimal_positions(call, commas, 40, CostWeights(window=1))).must(equal([9, 15, 21, 27])) &
+            k(weights(0)).must(equal('invalid lookback window `0`, must be at least 1'))
+        )
+
+    def scala(self) -> Expectation:
+        parser = Parser()
+        parser.gen()
+        ast = parser.parse(fun, 'def').get_or_raise
+        lines = Breaker(37, 'optimal').format(ast).value.get_or_raise
+        def strip(text: str) -> str:
+            return ''.join(text.split())
+        return (
+            k(strip(lines.mk_string(''))).must(equal(strip(fun))) &
+            k(lines.length > 1).must(equal(True))
+        )
+
+    def engine(self) -> Expectation:
+        def create(engine: str) -> str:
+            try:
+                return Breaker(80, engine).engine
+            except ValueError as e:
+                return str(e)
+        return (
+            k(create('optimal')).must(equal('optimal')) &
+            k(create('optimal ')).must(equal('invalid break engine `optimal `, must be one of greedy, optimal'))
+        )
+
+    def braces(self) -> Expectation:
+        parser = Parser()
+        parser.gen()
+        def format(text: str, textwidth: int) -> List[str]:
+            return Breaker(textwidth, 'optimal').format(parser.parse(text, 'def').get_or_raise).value.get_or_raise
+        return (
+            k(format(lookbehind, 12)).must(equal(lookbehind_target)) &
+            k(format(chain, 30)).must(equal(chain_target))
+        )
+
+__all__ = ('OptimalBreakSpec',)
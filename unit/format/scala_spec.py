@@ -13,6 +13,8 @@ from tubbs.tatsu.scala import Parser
 from tubbs.tatsu.ast import AstMap, RoseAstTree, ast_rose_tree, AstList, AstElem
 from tubbs.formatter.scala.breaker import Breaker
 from tubbs.formatter.scala.indenter import Indenter
+from tubbs.formatter.breaker.state import BreakState
+from tubbs.formatter.breaker.conds import multi_line_body
 
 from unit._support.ast import be_token
 
@@ -63,6 +65,9 @@ class ScalaFormatSpec:
     tree boundary nodes $boundary_nodes
     indent broken function lines $indent_broken
     break conditionally on previous breaks $break_lookbehind
+    reuse memoized handler lookups in a later request $handler_memo
+    cache break conditions while breaking lines $break_cache
+    memoize multi line subtrees $multi_line_memo
     '''
 
     @lazy
@@ -147,4 +152,43 @@ class ScalaFormatSpec:
         broken = breaker.format(self.parse(lookbehind)).value
         return k(broken).must(contain(lookbehind_target))
 
+    def handler_memo(self) -> Expectation:
+        first = Breaker(37).format(self.fun_ast).value
+        breaker = Breaker(37)
+        memo = breaker.handler_memo
+        misses, hits = memo.misses, memo.hits
+        second = breaker.format(self.fun_ast).value
+        return (
+            k(second).must(equal(first)) &
+            k(memo.misses).must(equal(misses)) &
+            k(memo.hits > hits).must(equal(True)) &
+            k(Indenter(2).handler_memo is memo).must(equal(False))
+        )
+
+    def break_cache(self) -> Expectation:
+        breaker = Breaker(37)
+        breaks = breaker.breaks(ast_rose_tree(self.fun_ast)).value.get_or_raise
+        broken = breaker.apply_breaks(self.fun_ast, breaks)
+        return (
+            k(broken.join_lines).must(equal(broken_fun)) &
+            k(breaks.cache.hits > 0).must(equal(True)) &
+            k(len(breaks.cache.static) > 0).must(equal(True))
+        )
+
+    def multi_line_memo(self) -> Expectation:
+        tree = ast_rose_tree(self.fun_ast)
+        nodes = List()
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            nodes = nodes.cat(node)
+            stack.extend(node.sub)
+        shared = BreakState(tree, List())
+        def fresh(node: RoseAstTree) -> bool:
+            return multi_line_body(BreakState(node, List()), node)
+        return (
+            k(nodes.map(lambda a: multi_line_body(shared, a))).must(equal(nodes.map(fresh))) &
+            k(len(shared.multi_line_bodies)).must(equal(nodes.length))
+        )
+
 __all__ = ('ScalaFormatSpec',)
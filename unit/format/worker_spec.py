@@ -0,0 +1,93 @@
+import threading
+from typing import Callable
+
+from kallikrein import k, Expectation
+from kallikrein.matchers import equal
+
+from amino import Either, Right
+
+from tubbs.formatter.worker import FormatWorker
+from tubbs.tatsu.scala import Parser
+from tubbs.tatsu.budget import ParseCancelled
+
+from unit.parse_budget_spec import long_text
+
+
+class FormatWorkerSpec:
+    '''formatting jobs on a worker thread
+    pass the result of a job to its callback $done
+    cancel a running job and skip queued jobs when a newer job is submitted $supersede
+    keep jobs for other buffers $buffers
+    abort the parse of a cancelled job $parse
+    '''
+
+    def done(self) -> Expectation:
+        worker = FormatWorker()
+        results = []
+        worker.submit(1, lambda cancelled: Right(5), lambda gen, result: results.append((gen, result)))
+        worker.join()
+        return k(results).must(equal([(1, Right(5))]))
+
+    def supersede(self) -> Expectation:
+        worker = FormatWorker()
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+        checks = []
+        def blocking(cancelled: Callable[[], bool]) -> Either[str, int]:
+            started.set()
+            release.wait()
+            checks.append(cancelled())
+            return Right(1)
+        def done(gen: int, result: Either[str, int]) -> None:
+            results.append((gen, result))
+        worker.submit(1, blocking, done)
+        started.wait()
+        worker.submit(1, lambda cancelled: Right(2), done)
+        worker.submit(1, lambda cancelled: Right(3), done)
+        release.set()
+        worker.join()
+        return (
+            k(results).must(equal([(3, Right(3))])) &
+            k(checks).must(equal([True])) &
+            k((worker.stats.dropped, worker.stats.skipped, worker.stats.done)).must(equal((1, 1, 1)))
+        )
+
+    def buffers(self) -> Expectation:
+        worker = FormatWorker()
+        results = []
+        def done(gen: int, result: Either[str, int]) -> None:
+            results.append(result)
+        worker.submit(1, lambda cancelled: Right(1), done)
+        worker.submit(2, lambda cancelled: Right(2), done)
+        worker.join()
+        return k(results).must(equal([Right(1), Right(2)]))
+
+    def parse(self) -> Expectation:
+        parser = Parser()
+        parser.gen()
+        worker = FormatWorker()
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+        def job(cancelled: Callable[[], bool]) -> Either[str, int]:
+            def check() -> bool:
+                if not started.is_set():
+                    started.set()
+                    release.wait()
+                return cancelled()
+            result = parser.parse(long_text, 'def', cancelled=check)
+            results.append(result)
+            return result
+        worker.submit(1, job, lambda gen, result: None)
+        started.wait()
+        worker.cancel(1)
+        release.set()
+        worker.join()
+        return (
+            k(len(results)).must(equal(1)) &
+            k(isinstance(results[0].value, ParseCancelled)).must(equal(True)) &
+            k(worker.stats.dropped).must(equal(1))
+        )
+
+__all__ = ('FormatWorkerSpec',)
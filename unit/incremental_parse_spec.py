@@ -0,0 +1,98 @@
+from typing import Tuple
+
+from kallikrein import k, Expectation
+from kallikrein.matchers import equal
+
+from amino import List, Nothing
+
+from tubbs.tatsu.scala import Parser
+from tubbs.tatsu.ast import AstElem, AstMap, AstList, AstToken
+from tubbs.tatsu.incremental import text_edit
+from tubbs.formatter.crawler import Crawler
+from tubbs.hints.base import HintMatch
+
+text = '''def fun = {
+  val a = foo(1, 2)
+  val b = bar(3)
+  b
+}'''
+
+inner_change = text.replace('foo(1, 2)', 'foo(1,\n  2, 345)')
+
+boundary_change = text.replace('bar(3)', 'bar(3) + 1')
+
+chained = List.lines(text + '\n  .qux(4)')
+
+chained_change = List.lines(text.replace('foo(1, 2)', 'foo(1, 23)') + '\n  .qux(4)')
+
+
+def tokens(ast: AstElem) -> List[Tuple[str, int, int, int]]:
+    result = List()
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, AstToken):
+            result = result.cat((node.raw, node.pos, node.line.lnum, node.ws_count))
+        elif isinstance(node, AstMap):
+            stack.extend(dict.values(node.data))
+        elif isinstance(node, AstList):
+            stack.extend(node.data.drain)
+    return result.sort_by(lambda a: a[1])
+
+
+class IncrementalParseSpec:
+    '''incremental reparsing of changed statements
+    determine the changed range of two texts $edit
+    reparse only a statement that changed inside $splice
+    parse the whole text if a change touches the end of a statement $boundary
+    splice each crawler window separately $windows
+    '''
+
+    def parser(self) -> Parser:
+        parser = Parser()
+        parser.gen()
+        return parser.configure_incremental(1)
+
+    def edit(self) -> Expectation:
+        return (
+            k(text_edit('abc', 'abXc')).must(equal((2, 2, 3))) &
+            k(text_edit('abc', 'abc')).must(equal((3, 3, 3))) &
+            k(text_edit('a\nbc\nd\n', 'a\nbXc\nd\n')).must(equal((3, 3, 4))) &
+            k(text_edit('a\nb\n', 'a\nb\nb\n')).must(equal((4, 4, 6)))
+        )
+
+    def splice(self) -> Expectation:
+        parser = self.parser()
+        parser.parse(text, 'def', 1).get_or_raise
+        spliced = parser.parse(inner_change, 'def', 1).get_or_raise
+        full = Parser().parse(inner_change, 'def').get_or_raise
+        return (
+            k(parser.incremental_stats.spliced).must(equal(1)) &
+            k(tokens(spliced)).must(equal(tokens(full))) &
+            k(spliced.lines).must(equal(full.lines)) &
+            k(spliced.end_line.lnum).must(equal(full.end_line.lnum))
+        )
+
+    def boundary(self) -> Expectation:
+        parser = self.parser()
+        parser.parse(text, 'def', 1).get_or_raise
+        result = parser.parse(boundary_change, 'def', 1).get_or_raise
+        return (
+            k(parser.incremental_stats.spliced).must(equal(0)) &
+            k(parser.incremental_stats.full).must(equal(2)) &
+            k(result.lines).must(equal(List.lines(boundary_change)))
+        )
+
+    def windows(self) -> Expectation:
+        parser = self.parser().configure_incremental(4)
+        match = HintMatch(line=0, rules=List('def'))
+        def crawl(content: List[str]) -> AstElem:
+            return Crawler(content, 0, parser, Nothing, window=5, key=1)._parse_window('def', match).get_or_raise
+        crawl(chained)
+        result = crawl(chained_change)
+        return (
+            k(parser.incremental_stats.spliced).must(equal(2)) &
+            k(result.lines).must(equal(chained_change.take(5)))
+        )
+
+__all__ = ('IncrementalParseSpec',)
@@ -0,0 +1,68 @@
+from kallikrein import k, Expectation
+from kallikrein.matchers import equal
+from kallikrein.matchers.maybe import be_just
+
+from amino import List, Just, Nothing, Maybe, _, __
+from amino.lazy import lazy
+
+from tubbs.tatsu.scala import Parser
+from tubbs.tatsu.interval import IntervalIndex
+from tubbs.formatter.crawler import Crawler, StartMatch
+from tubbs.hints.scala import Hints
+
+code = List(
+    'def foo(a: Int) = {',
+    '  def bar(b: Int) = {',
+    '    b',
+    '  }',
+    '  bar(a)',
+    '}',
+)
+
+object_code = List(
+    'object Foo {',
+    '  def bar(b: Int) = {',
+    '    b',
+    '  }',
+    '  def baz = 1',
+    '}',
+)
+
+
+class IntervalIndexSpec:
+    '''interval index over the nodes of a parse
+    innermost and outermost node with a rule containing an offset $containing
+    select a nested def from the index of a previous parse $select
+    '''
+
+    @lazy
+    def parser(self) -> Parser:
+        parser = Parser()
+        parser.gen()
+        return parser
+
+    def crawl(self, line: int, index: Maybe[IntervalIndex]) -> StartMatch:
+        return Crawler(object_code, line, self.parser, Just(Hints())).find_and_parse('def', index=index).get_or_raise
+
+    def containing(self) -> Expectation:
+        text = code.join_lines
+        ast = self.parser.parse(text, 'templateStatDef').get_or_raise
+        index = IntervalIndex.from_ast(ast)
+        offset = text.index('b\n')
+        rules = List('templateStatDef', 'blockStatDef')
+        return (
+            k(index // __.innermost(rules, offset) / _.pos).must(be_just(text.index('def bar'))) &
+            k(index // __.outermost(rules, offset) / _.pos).must(be_just(0))
+        )
+
+    def select(self) -> Expectation:
+        ast = self.parser.parse(object_code.join_lines, 'compilationUnit').get_or_raise
+        index = IntervalIndex.from_ast(ast)
+        indexed = self.crawl(2, index)
+        parsed = self.crawl(2, Nothing)
+        return (
+            k(indexed.range1).must(equal(parsed.range1)) &
+            k(index.exists(lambda a: a.covers(indexed.ast))).must(equal(True))
+        )
+
+__all__ = ('IntervalIndexSpec',)
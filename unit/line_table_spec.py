@@ -0,0 +1,35 @@
+from kallikrein import k, Expectation
+from kallikrein.matchers import equal
+
+from tatsu.buffering import Buffer
+
+from amino import List
+
+from tubbs.tatsu.lines import Line, line_table
+
+text = '''def foo(a: Int) = {
+  val b = a
+
+    b
+}
+'''
+
+
+class LineTableSpec:
+    '''precomputed line table of a parser buffer
+    match tatsu's line info for every position $line_info
+    return the same line object for positions on a line $interned
+    '''
+
+    def line_info(self) -> Expectation:
+        buffer = Buffer(text)
+        table = line_table(buffer)
+        positions = List.range(len(text) + 3)
+        expected = positions.map(lambda a: Line.from_line_info(buffer.line_info(a)))
+        return k(positions.map(table.line)).must(equal(expected))
+
+    def interned(self) -> Expectation:
+        table = line_table(Buffer(text))
+        return k(table.line(20) is table.line(30)).must(equal(True))
+
+__all__ = ('LineTableSpec',)
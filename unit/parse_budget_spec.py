@@ -0,0 +1,58 @@
+from kallikrein import k, Expectation
+from kallikrein.matchers import equal
+
+from amino import List
+
+from tubbs.tatsu.scala import Parser
+from tubbs.tatsu.budget import BudgetExhausted
+
+text = '''def fun = {
+  val a = foo(1, 2)
+  b
+}'''
+
+long_text = (List.range(2000).map(lambda i: f'  val a{i} = foo(a, {i})').cons('def fun = {') + List('}')).join_lines
+
+
+class ParseBudgetSpec:
+    '''parse budget
+    abort after a number of rule invocations $calls
+    abort after a number of milliseconds $millis
+    parse without budget $unbounded
+    reuse the pooled parser after an aborted parse $reuse
+    '''
+
+    def parser(self, millis: int, calls: int) -> Parser:
+        parser = Parser()
+        parser.gen()
+        return parser.configure_budget(millis, calls)
+
+    def calls(self) -> Expectation:
+        result = self.parser(0, 10).parse(text, 'def')
+        err = result.value
+        return (
+            k(isinstance(err, BudgetExhausted)).must(equal(True)) &
+            k(err.calls).must(equal(11)) &
+            k(f'`{err.rule}`' in str(err)).must(equal(True))
+        )
+
+    def millis(self) -> Expectation:
+        result = self.parser(1, 0).parse(long_text, 'def')
+        return (
+            k(isinstance(result.value, BudgetExhausted)).must(equal(True)) &
+            k(result.value.elapsed >= 0.001).must(equal(True))
+        )
+
+    def unbounded(self) -> Expectation:
+        return k(self.parser(0, 0).parse(text, 'def').is_right).must(equal(True))
+
+    def reuse(self) -> Expectation:
+        parser = self.parser(0, 10)
+        parser.parse(text, 'def')
+        result = parser.configure_budget(0, 0).parse(text, 'def')
+        return (
+            k(result.is_right).must(equal(True)) &
+            k(parser.pool_stats.created).must(equal(1))
+        )
+
+__all__ = ('ParseBudgetSpec',)
@@ -0,0 +1,59 @@
+from kallikrein import k, Expectation
+from kallikrein.matchers.maybe import be_just
+from kallikrein.matchers.either import be_right
+from kallikrein.matchers import equal
+
+from amino import Right
+
+from tubbs.tatsu.cache import ParseCache
+
+
+class ParseCacheSpec:
+    '''LRU parse result cache
+    return the cached result for the same text and rule $hit
+    evict the least recently used entry by count $evict_count
+    evict by estimated size $evict_size
+    parse without storing when disabled $disabled
+    '''
+
+    def hit(self) -> Expectation:
+        cache = ParseCache(2)
+        calls = []
+        def parse() -> Right:
+            calls.append(1)
+            return Right('ast')
+        first = cache.get_or_parse('text', 'rule', parse)
+        second = cache.get_or_parse('text', 'rule', parse)
+        return (
+            k(first).must(be_right('ast')) &
+            k(second).must(be_right('ast')) &
+            (k(len(calls)) == 1) &
+            (k(cache.stats.hits) == 1) &
+            (k(cache.stats.misses) == 1)
+        )
+
+    def evict_count(self) -> Expectation:
+        cache = ParseCache(2)
+        k1, k2, k3 = cache.key('a', 'r'), cache.key('b', 'r'), cache.key('c', 'r')
+        cache.store(k1, 'a', 1)
+        cache.store(k2, 'b', 1)
+        cache.lookup(k1)
+        cache.store(k3, 'c', 1)
+        return (
+            k(cache.lookup(k1)).must(be_just('a')) &
+            k(cache.lookup(k2).is_just).must(equal(False)) &
+            (k(cache.stats.evictions) == 1)
+        )
+
+    def evict_size(self) -> Expectation:
+        cache = ParseCache(10, 100)
+        cache.store(cache.key('a', 'r'), 'a', 60)
+        cache.store(cache.key('b', 'r'), 'b', 60)
+        return (k(len(cache)) == 1) & (k(cache.size) == 60)
+
+    def disabled(self) -> Expectation:
+        cache = ParseCache()
+        cache.get_or_parse('text', 'rule', lambda: Right('ast'))
+        return (k(len(cache)) == 0) & (k(cache.stats.misses) == 0)
+
+__all__ = ('ParseCacheSpec',)
@@ -0,0 +1,78 @@
+import json
+
+from kallikrein import k, Expectation
+from kallikrein.matchers import equal
+
+from amino import List
+
+from tubbs.tatsu.scala import Parser
+
+from unit.ast_spec import Parser as SpecParser
+
+text = '''def fun = {
+  val a = foo(1, 2)
+  b
+}'''
+
+
+class ParseProfileSpec:
+    '''per-rule parse profile
+    count the invocations of each rule $calls
+    partition the time of the root rule into self times $own
+    count memoized successes and failures separately $memo
+    sort the rules in the json dump $json
+    don't record without profiling $disabled
+    '''
+
+    def parser(self) -> Parser:
+        parser = Parser()
+        parser.gen()
+        return parser.configure_profile(True)
+
+    def calls(self) -> Expectation:
+        parser = self.parser()
+        parser.parse(text, 'def').get_or_raise
+        once = parser.profile.rules['def'].calls
+        parser.parse(text, 'def').get_or_raise
+        rules = List.wrap(parser.profile.rules.values())
+        return (
+            k(parser.profile.parses).must(equal(2)) &
+            k(parser.profile.rules['def'].calls).must(equal(2 * once)) &
+            k(rules.forall(lambda a: a.successes + a.failures == a.calls)).must(equal(True))
+        )
+
+    def own(self) -> Expectation:
+        parser = self.parser()
+        parser.parse(text, 'def').get_or_raise
+        profile = parser.profile
+        own = sum(a.own for a in profile.rules.values())
+        return k(abs(own - profile.rules['def'].total) < 1e-6).must(equal(True))
+
+    def memo(self) -> Expectation:
+        parser = SpecParser()
+        parser.gen()
+        parser.configure_profile(True).parse('foo y', 'memo').get_or_raise
+        rules = parser.profile.rules
+        return (
+            k((rules['tk'].memo_hits, rules['tk'].memo_failures)).must(equal((0, 1))) &
+            k((rules['id'].memo_hits, rules['id'].memo_failures)).must(equal((1, 0)))
+        )
+
+    def json(self) -> Expectation:
+        parser = self.parser()
+        parser.parse(text, 'def').get_or_raise
+        data = json.loads(parser.profile.json('calls'))
+        calls = List.wrap(data['rules']).map(lambda a: a['calls'])
+        return (
+            k(calls).must(equal(calls.sort_by(lambda a: a, reverse=True))) &
+            k(parser.profile.table(limit=3).length).must(equal(5))
+        )
+
+    def disabled(self) -> Expectation:
+        parser = self.parser().configure_profile(False)
+        return (
+            k(parser.parse(text, 'def').is_right).must(equal(True)) &
+            k(parser.profile is None).must(equal(True))
+        )
+
+__all__ = ('ParseProfileSpec',)
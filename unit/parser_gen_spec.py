@@ -0,0 +1,147 @@
+import os
+import sys
+import shutil
+import tempfile
+import py_compile
+import importlib.util
+
+from kallikrein import k, Expectation
+from kallikrein.matchers import equal
+from kallikrein.matchers.either import be_right
+from kallikrein.matchers.maybe import be_just
+
+from amino import Path, Nothing
+from amino.test import temp_dir
+from amino.test.path import fixture_path
+
+from tubbs.tatsu.base import LangParser
+from tubbs.tatsu.gen import GrammarStamp, write_atomic, file_digest, version_tag, cache_env_var
+from tubbs.tatsu.build import main
+
+
+class Parser(LangParser):
+
+    def __init__(self, base: Path) -> None:
+        self.base = base
+
+    @property
+    def module_base(self) -> str:
+        return 'unit._temp.gen'
+
+    @property
+    def parsers_path(self) -> Path:
+        return self.base / 'parsers'
+
+    @property
+    def grammar_path(self) -> Path:
+        return self.base / 'grammar'
+
+    @property
+    def name(self) -> str:
+        return 'spec1'
+
+    @property
+    def left_recursion(self) -> bool:
+        return False
+
+
+def pyc(path: Path) -> Path:
+    return Path(importlib.util.cache_from_source(str(path)))
+
+
+class ParserGenSpec:
+    '''generated parser modules
+    regenerate the module when the grammar changed and prune the old one $regenerate
+    don't register the module in `sys.modules` $private
+    rehash the grammar only when its stat changed $stamp
+    write files atomically $atomic
+    generate and compile the shipped parsers with `tubbs-build-parsers` $build
+    '''
+
+    def setup(self) -> None:
+        self.base = Path(tempfile.mkdtemp(dir=str(temp_dir('gen'))))
+        self.grammar = self.base / 'grammar' / 'spec1.ebnf'
+        self.grammar.parent.mkdir()
+        shutil.copy(str(fixture_path('parser', 'spec1.ebnf')), str(self.grammar))
+        self.parser = Parser(self.base)
+
+    def regenerate(self) -> Expectation:
+        self.parser.gen()
+        old = self.parser.parser_path
+        first = self.parser.parse('tok a b', 'ids')
+        py_compile.compile(str(old), doraise=True)
+        compiled = pyc(old).is_file()
+        with self.grammar.open('a') as f:
+            f.write('\nextra = tk:tk id;\n')
+        self.parser.gen()
+        new = self.parser.parser_path
+        return (
+            k(first).must(be_right) &
+            k(compiled).must(equal(True)) &
+            k(new == old).must(equal(False)) &
+            k((old.exists(), pyc(old).exists(), new.is_file())).must(equal((False, False, True))) &
+            k(self.parser.parse('tok a', 'extra')).must(be_right)
+        )
+
+    def private(self) -> Expectation:
+        self.parser.gen()
+        return (
+            k(self.parser.parser_type).must(be_right) &
+            k(self.parser.module_name in sys.modules).must(equal(False))
+        )
+
+    def stamp(self) -> Expectation:
+        stamp = GrammarStamp(self.grammar, self.base / 'spec1.stamp')
+        digest = stamp.digest
+        initial = file_digest(self.grammar)
+        stored = stamp.stored
+        key = stamp.stamp.read_text().rsplit(' ', 1)[0]
+        stamp.stamp.write_text(f'{key} cached')
+        cached = stamp.digest
+        with self.grammar.open('a') as f:
+            f.write('\n')
+        return (
+            k(digest).must(equal(initial)) &
+            k(stored).must(be_just(digest)) &
+            k(cached).must(equal('cached')) &
+            k(stamp.stored).must(equal(Nothing)) &
+            k(stamp.digest).must(equal(file_digest(self.grammar)))
+        )
+
+    def atomic(self) -> Expectation:
+        target = self.base / 'out' / 'file'
+        write_atomic(target, 'first')
+        write_atomic(target, 'second')
+        blocked = self.base / 'out' / 'dir'
+        blocked.mkdir()
+        try:
+            write_atomic(blocked, 'text')
+            failed = False
+        except OSError:
+            failed = True
+        return (
+            k(target.read_text()).must(equal('second')) &
+            k(failed).must(equal(True)) &
+            k(sorted(a.name for a in target.parent.iterdir())).must(equal(['dir', 'file']))
+        )
+
+    def build(self) -> Expectation:
+        cache = self.base / 'cache'
+        previous = os.environ.get(cache_env_var)
+        os.environ[cache_env_var] = str(cache)
+        try:
+            code = main(['breaker_dsl'])
+            missing = main(['nonexistent'])
+        finally:
+            if previous is None:
+                del os.environ[cache_env_var]
+            else:
+                os.environ[cache_env_var] = previous
+        modules = list((cache / 'parsers' / version_tag()).glob('breaker_dsl_*.py'))
+        return (
+            k((code, missing)).must(equal((0, 1))) &
+            k(len(modules)).must(equal(1)) &
+            k(modules and pyc(Path(modules[0])).is_file()).must(equal(True))
+        )
+
+__all__ = ('ParserGenSpec',)
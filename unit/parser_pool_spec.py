@@ -0,0 +1,46 @@
+from kallikrein import k, Expectation
+from kallikrein.matchers import equal
+from kallikrein.matchers.either import be_right
+
+from amino.lazy import lazy
+
+from tubbs.tatsu.scala import Parser
+
+code = 'def foo(a: Int) = a'
+
+
+class ParserPoolSpec:
+    '''parser instance pool
+    reuse an instance for consecutive parses $reuse
+    parse with a recycled instance $recycled
+    drop the state of the last parse on release $release
+    '''
+
+    @lazy
+    def parser(self) -> Parser:
+        parser = Parser()
+        parser.gen()
+        return parser
+
+    def reuse(self) -> Expectation:
+        self.parser.parse(code, 'def')
+        self.parser.parse(code, 'def')
+        self.parser.parse(code, 'def')
+        stats = self.parser.pool_stats
+        return (k(stats.created) == 1) & (k(stats.reused) == 2)
+
+    def recycled(self) -> Expectation:
+        first = self.parser.parse(code, 'def')
+        second = self.parser.parse(code, 'def')
+        return (
+            k(first).must(be_right) &
+            k(second.map(lambda a: a.text)).must(be_right(first.value.text))
+        )
+
+    def release(self) -> Expectation:
+        self.parser.parse(code, 'def')
+        idle = self.parser.pool._idle[0]
+        state = idle._buffer, idle._last_result, idle._memos, idle.last_node
+        return k(state).must(equal((None, None, dict(), None)))
+
+__all__ = ('ParserPoolSpec',)
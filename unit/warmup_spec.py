@@ -0,0 +1,40 @@
+from kallikrein import k, Expectation
+from kallikrein.matchers.either import be_right
+from kallikrein.matchers import equal
+
+from amino import List
+
+from tubbs.tatsu.warmup import ParserWarmup
+from tubbs.tatsu.base import Parsers
+
+
+class ParserWarmupSpec:
+    '''background parser warmup
+    load parsers and leave an instance in the pool $pooled
+    skip unknown parsers $unknown
+    keep existing parsers when merging $merge
+    '''
+
+    def warmup(self, names: List[str]) -> Parsers:
+        result = []
+        ParserWarmup(names, result.append).start().join()
+        return result[0]
+
+    def pooled(self) -> Expectation:
+        parsers = self.warmup(List('scala', 'breaker_dsl'))
+        return (
+            k(parsers.parser('scala').map(lambda a: a.pool.idle)).must(be_right(1)) &
+            k(parsers.parser('breaker_dsl').map(lambda a: a.pool_stats.created)).must(be_right(1))
+        )
+
+    def unknown(self) -> Expectation:
+        parsers = self.warmup(List('nonexistent', 'indenter_dsl'))
+        return k(parsers.parsers.k) == List('indenter_dsl')
+
+    def merge(self) -> Expectation:
+        existing = Parsers().load('scala').get_or_raise
+        merged = existing.merge(self.warmup(List('scala')))
+        same = merged.parser('scala').value is existing.parser('scala').value
+        return k(same).must(equal(True))
+
+__all__ = ('ParserWarmupSpec',)